@@ -23,11 +23,12 @@ $DEPLOY_MODE = $Mode
 $TARGET_DIR = $TargetDir
 
 # 需要部署的文件类型
-$DEPLOY_EXTENSIONS = @("html", "css", "js", "json", "xml", "txt", "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "pdf")
+$DEPLOY_EXTENSIONS = @("html", "css", "js", "json", "xml", "txt", "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "pdf", "gz", "br")
 
 # 需要排除的目录和文件模式
 $EXCLUDE_PATTERNS = @(
     "__pycache__",
+    ".build",
     "*.pyc",
     "*.md",
     "*.py",
@@ -36,6 +37,7 @@ $EXCLUDE_PATTERNS = @(
     "*.bat",
     "*.ps1",
     "*.csv",
+    "seo-overrides.json",
     "Operation",
     "*.bak",
     "*.tmp",
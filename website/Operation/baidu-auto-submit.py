@@ -4,6 +4,11 @@
 百度自动提交脚本
 从 sitemap.xml 读取所有 URL，自动提交到百度
 建议每天运行一次，提交新页面
+
+使用方法:
+  python baidu-auto-submit.py            # 提交从未提交过的 URL
+  python baidu-auto-submit.py --all      # 重新提交所有 URL
+  python baidu-auto-submit.py --changed  # 提交上次提交后内容有变化的页面（由构建脚本记录在 website/.build）
 """
 
 import os
@@ -23,6 +28,13 @@ _script_dir = os.path.dirname(os.path.abspath(__file__))
 SITEMAP_FILE = os.path.join(_script_dir, "sitemap.xml")
 SUBMIT_LOG = os.path.join(_script_dir, "baidu-submit-log.txt")
 
+# 构建脚本（website/sitebuild）记录的内容变更
+_website_dir = os.path.dirname(_script_dir)
+sys.path.insert(0, _website_dir)
+from sitebuild.changes import mark_submitted, pending_urls
+
+BUILD_DIR = os.path.join(_website_dir, ".build")
+
 def extract_urls_from_sitemap(sitemap_path):
     """从 sitemap.xml 提取所有 URL"""
     urls = []
@@ -116,24 +128,36 @@ def main():
     
     # 检查参数
     force_all = '--all' in sys.argv or '-a' in sys.argv
+    changed_only = '--changed' in sys.argv or '-c' in sys.argv
     
-    # 从 sitemap 读取 URL
-    if not os.path.exists(SITEMAP_FILE):
-        print(f"❌ 未找到 sitemap.xml: {SITEMAP_FILE}")
-        sys.exit(1)
-    
-    print(f"从 {SITEMAP_FILE} 读取 URL...")
-    all_urls = extract_urls_from_sitemap(SITEMAP_FILE)
-    
-    if not all_urls:
-        print("❌ 未能从 sitemap.xml 提取到 URL")
-        sys.exit(1)
-    
-    print(f"找到 {len(all_urls)} 个 URL")
-    print()
+    if changed_only:
+        all_urls = []
+    else:
+        # 从 sitemap 读取 URL
+        if not os.path.exists(SITEMAP_FILE):
+            print(f"❌ 未找到 sitemap.xml: {SITEMAP_FILE}")
+            sys.exit(1)
+        
+        print(f"从 {SITEMAP_FILE} 读取 URL...")
+        all_urls = extract_urls_from_sitemap(SITEMAP_FILE)
+        
+        if not all_urls:
+            print("❌ 未能从 sitemap.xml 提取到 URL")
+            sys.exit(1)
+        
+        print(f"找到 {len(all_urls)} 个 URL")
+        print()
     
     # 决定提交哪些 URL
-    if force_all:
+    if changed_only:
+        # 只提交内容真正变化过的页面（构建脚本按内容哈希记录）
+        urls_to_submit = pending_urls(BUILD_DIR, 'baidu')
+        if not urls_to_submit:
+            print("✓ 上次提交后没有内容变化的页面")
+            return
+        print("模式: 仅提交内容有变化的 URL (--changed)")
+        print(f"待提交: {len(urls_to_submit)} 个")
+    elif force_all:
         urls_to_submit = all_urls
         print("模式: 提交所有 URL (--all)")
     else:
@@ -171,6 +195,8 @@ def main():
             result = submit_urls_to_baidu(batch)
             print(result)
             save_submit_log(batch, result)
+            if changed_only and result.startswith("✓"):
+                mark_submitted(BUILD_DIR, 'baidu', batch)
             if i < len(batches):
                 print("等待 1 秒后继续...")
                 import time
@@ -181,6 +207,8 @@ def main():
         result = submit_urls_to_baidu(urls_to_submit)
         print(result)
         save_submit_log(urls_to_submit, result)
+        if changed_only and result.startswith("✓"):
+            mark_submitted(BUILD_DIR, 'baidu', urls_to_submit)
     
     print()
     print("=" * 80)
@@ -8,10 +8,12 @@ IndexNow API 提交工具
   python indexnow-submit.py              # 提交重要页面（5个）
   python indexnow-submit.py --all        # 提交所有页面（从 sitemap.xml 读取）
   python indexnow-submit.py --all --yes  # 自动提交所有页面（非交互模式）
+  python indexnow-submit.py --changed    # 只提交上次提交后内容有变化的页面（由构建脚本记录）
   python indexnow-submit.py URL1 URL2 ...  # 仅提交指定的完整 URL（用于 meta 更新后通知 Bing）
   
 参数说明:
   --all, -a    : 从 sitemap.xml 读取所有 URL 并提交
+  --changed, -c: 从 website/.build/changes.json 读取内容有变化的 URL，提交成功后记录，下次不再重复提交
   --yes, -y    : 非交互模式，自动确认提交
   URL1 URL2... : 要提交的完整 URL（需以 https:// 开头），用于只通知部分页面更新
 """
@@ -20,10 +22,18 @@ import requests
 import json
 import os
 import re
+import sys
 import time
 from pathlib import Path
 from urllib.parse import urlparse
 
+# 构建脚本（website/sitebuild）记录的内容变更
+_website_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _website_dir)
+from sitebuild.changes import mark_submitted, pending_urls
+
+BUILD_DIR = os.path.join(_website_dir, '.build')
+
 BASE_URL = 'https://www.xintuxiangce.top'
 INDEXNOW_API = 'https://api.indexnow.org/IndexNow'
 SITEMAP_FILE = 'sitemap.xml'
@@ -182,8 +192,6 @@ def get_important_urls():
     return urls
 
 def main():
-    import sys
-    
     print("=" * 60)
     print("IndexNow API 提交工具")
     print("=" * 60)
@@ -195,6 +203,7 @@ def main():
     # 检查命令行参数
     use_all = '--all' in sys.argv or '-a' in sys.argv
     auto_confirm = '--yes' in sys.argv or '-y' in sys.argv
+    use_changed = '--changed' in sys.argv or '-c' in sys.argv
     # 从命令行提取以 https:// 开头的 URL（仅提交指定页面）
     arg_urls = [a for a in sys.argv[1:] if a.startswith('https://') and a not in ('--all', '-a', '--yes', '-y')]
     
@@ -202,6 +211,12 @@ def main():
     if arg_urls:
         print("📋 模式: 仅提交命令行指定的 URL")
         urls = arg_urls
+    elif use_changed:
+        print("📋 模式: 仅提交内容有变化的页面（从构建记录读取）")
+        urls = pending_urls(BUILD_DIR, 'indexnow')
+        if not urls:
+            print("✓ 上次提交后没有内容变化的页面")
+            return
     elif use_all:
         print("📋 模式: 提交所有 URL（从 sitemap.xml 读取）")
         urls = get_urls_from_sitemap()
@@ -242,6 +257,8 @@ def main():
     success = submit_urls(urls)
     
     if success:
+        if use_changed and not arg_urls:
+            mark_submitted(BUILD_DIR, 'indexnow', urls)
         print("\n" + "=" * 60)
         print("提交完成！")
         print("=" * 60)
@@ -264,6 +281,7 @@ def main():
         print("  python indexnow-submit.py          # 提交重要页面")
         print("  python indexnow-submit.py --all    # 提交所有页面（从 sitemap.xml）")
         print("  python indexnow-submit.py --all --yes  # 自动提交所有页面")
+        print("  python indexnow-submit.py --changed    # 只提交内容有变化的页面")
 
 if __name__ == '__main__':
     main()
@@ -6,10 +6,12 @@
 import os
 import sys
 import json
-import glob
-import re
 from pathlib import Path
 
+# 发布目录（dist/releases.json）的读写与下载服务共用
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from download_service import catalog
+
 try:
     from qiniu import Auth, put_file, BucketManager
     from qiniu import put_data
@@ -47,88 +49,32 @@ def upload_file(q, bucket_name, local_file, remote_key):
         print(f"✗ 上传异常: {remote_key} - {str(e)}")
         return False
 
-def extract_date_from_filename(filename):
-    """从文件名中提取日期信息用于排序
-    
-    支持格式：
-    - xtxc202511111206.zip -> 202511111206
-    - xtxcsetup202511021528.zip -> 202511021528
-    - xuxc202510311010.apk -> 202510311010
-    """
-    # 匹配文件名中的日期时间格式：YYYYMMDDHHMM 或 YYYYMMDD
-    # 查找8位或12位数字（日期或日期+时间）
-    match = re.search(r'(\d{8})(\d{4})?', filename)
-    if match:
-        date_str = match.group(1)
-        time_str = match.group(2) if match.group(2) else '0000'
-        return int(date_str + time_str)
-    return 0
+# 上传到CDN的下载类型（Mac 版本还在开发中，不上传）
+UPLOAD_TYPES = ('portable', 'setup', 'android')
 
 def get_files_to_upload(base_dir, config):
-    """获取需要上传的文件列表"""
-    files = []
-    base_path = config.get('base_path', 'dist')
+    """从发布目录 dist/releases.json 获取需要上传的文件（每种下载类型的最新安装包）"""
+    releases = catalog.load_catalog(base_dir)
+    if catalog.is_stale(base_dir, releases):
+        print(f"⚠ 发布目录不存在或已过期，重新扫描: {os.path.join(base_dir, catalog.CATALOG_FILE)}")
+        try:
+            releases = catalog.publish(base_dir)
+        except OSError as e:
+            print(f"⚠ 发布目录写入失败（本次只在内存中使用）: {e}")
+            releases = catalog.build_catalog(base_dir, previous=releases)
     
-    # 定义要上传的目录和文件类型
-    upload_patterns = [
-        {
-            'local_dir': os.path.join(base_dir, 'pc', 'portable'),
-            'remote_prefix': 'pc/portable',
-            'extensions': ['.zip']
-        },
-        {
-            'local_dir': os.path.join(base_dir, 'pc', 'setup'),
-            'remote_prefix': 'pc/setup',
-            'extensions': ['.exe', '.zip']
-        },
-        {
-            'local_dir': os.path.join(base_dir, 'android'),
-            'remote_prefix': 'android',
-            'extensions': ['.apk']
-        }
-    ]
-    
-    for pattern in upload_patterns:
-        local_dir = pattern['local_dir']
-        if not os.path.exists(local_dir):
-            print(f"⚠ 目录不存在: {local_dir}")
+    files = []
+    for file_type in UPLOAD_TYPES:
+        release = releases['releases'].get(file_type)
+        if not release:
+            print(f"⚠ 没有找到安装包: {os.path.join(base_dir, catalog.FILE_DIRS[file_type])}")
             continue
-        
-        for ext in pattern['extensions']:
-            file_pattern = os.path.join(local_dir, f'*{ext}')
-            found_files = glob.glob(file_pattern)
-            
-            if not found_files:
-                continue
-            
-            # 优先按文件名中的日期排序，如果无法提取日期则按修改时间排序
-            def sort_key(filepath):
-                filename = os.path.basename(filepath)
-                date_value = extract_date_from_filename(filename)
-                if date_value > 0:
-                    # 如果能从文件名提取日期，使用日期排序（大的在前，即最新的在前）
-                    return (1, date_value)  # 1表示优先级高
-                else:
-                    # 如果无法提取日期，使用修改时间排序
-                    return (0, os.path.getmtime(filepath))  # 0表示优先级低
-            
-            found_files.sort(key=sort_key, reverse=True)
-            
-            # 只选择最新的文件（每个扩展名只上传一个最新文件）
-            latest_file = found_files[0]
-            filename = os.path.basename(latest_file)
-            remote_key = f"{pattern['remote_prefix']}/{filename}"
-            files.append({
-                'local': latest_file,
-                'remote': remote_key,
-                'size': os.path.getsize(latest_file)
-            })
-            
-            # 如果有多个文件，提示哪些被跳过
-            if len(found_files) > 1:
-                skipped = [os.path.basename(f) for f in found_files[1:]]
-                print(f"⚠ {local_dir}: 找到 {len(found_files)} 个文件，只上传最新的: {filename}")
-                print(f"  跳过的文件: {', '.join(skipped)}")
+        files.append({
+            'local': os.path.join(base_dir, *release['path'].split('/')),
+            'remote': release['cdn_key'],
+            'size': release['size'],
+            'sha256': release['sha256'],
+        })
     
     return files
 
@@ -172,7 +118,7 @@ def main():
     for f in files:
         size_mb = f['size'] / (1024 * 1024)
         total_size += f['size']
-        print(f"  - {f['remote']} ({size_mb:.2f} MB)")
+        print(f"  - {f['remote']} ({size_mb:.2f} MB, sha256 {f['sha256'][:12]})")
     
     total_size_mb = total_size / (1024 * 1024)
     print(f"\n总大小: {total_size_mb:.2f} MB")
@@ -0,0 +1,65 @@
+-- 发送构建时生成的预压缩副本（.br / .gz）
+-- 文件位置：/etc/lighttpd/xintuxiangce-precompressed.lua（由 xintuxiangce-precompressed.conf 引用）
+--
+-- 请求 styles.css 且 Accept-Encoding 含 br/gzip、同目录下存在 styles.css.br / styles.css.gz 时，
+-- 改为发送压缩副本，并设置 Content-Encoding、原文件的 Content-Type 和 Vary: Accept-Encoding。
+-- 以 / 结尾的URL（例如首页 /）按目录下的 index.html 处理：存在 index.html.br / .gz 时直接发送副本，
+-- 否则不修改，仍由 mod_indexfile 找 index.html。
+-- Accept-Encoding 中 q=0 的编码视为不接受（例如 "br;q=0, gzip" 只发送 gzip 副本）。
+-- 副本不存在（没有运行 build-site.py / precompress.py）时照常发送原文件，不会返回404。
+-- 使用 lighttpd 1.4 的 lighty.env / lighty.request / lighty.header 接口。
+
+local types = {
+  html = "text/html; charset=utf-8",
+  css  = "text/css; charset=utf-8",
+  js   = "application/javascript; charset=utf-8",
+  json = "application/json; charset=utf-8",
+  xml  = "application/xml; charset=utf-8",
+  svg  = "image/svg+xml",
+  txt  = "text/plain; charset=utf-8",
+}
+
+-- Accept-Encoding 中接受的编码：{ br = true, gzip = true, ... }（q=0 的不算）
+local function accepted_encodings(header)
+  local result = {}
+  for item in header:lower():gmatch("[^,]+") do
+    local name = item:match("^%s*([%w%-]+)")
+    local q = tonumber(item:match(";%s*q%s*=%s*([%d%.]+)") or "1")
+    if name and q and q > 0 then result[name] = true end
+  end
+  return result
+end
+
+local path = lighty.env["physical.path"]
+if not path then return 0 end
+-- 目录（以 / 结尾）：这时 mod_indexfile 还没有运行，按 index.html 查找副本
+if path:sub(-1) == "/" then
+  path = path .. "index.html"
+elseif (lighty.env["uri.path"] or ""):sub(-1) == "/" then
+  path = path .. "/index.html"
+end
+local ext = path:match("%.([%w]+)$")
+local content_type = ext and types[ext:lower()]
+if not content_type then return 0 end
+
+-- 可压缩的文件都按 Accept-Encoding 区分缓存（CDN、浏览器）
+lighty.header["Vary"] = "Accept-Encoding"
+
+-- 断点续传的请求发送原文件
+if lighty.request["Range"] then return 0 end
+
+local accept = accepted_encodings(lighty.request["Accept-Encoding"] or "")
+local candidates = {}
+if accept["br"] then table.insert(candidates, { ".br", "br" }) end
+if accept["gzip"] then table.insert(candidates, { ".gz", "gzip" }) end
+
+for _, candidate in ipairs(candidates) do
+  local st = lighty.stat(path .. candidate[1])
+  if st and st["is_file"] then
+    lighty.env["physical.path"] = path .. candidate[1]
+    lighty.header["Content-Encoding"] = candidate[2]
+    lighty.header["Content-Type"] = content_type
+    return 0
+  end
+end
+return 0
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网站构建性能基准
+生成合成的指南/日记语料（默认 100、1000、10000 篇），测量各阶段和完整构建的耗时，结果保存为JSON。
+
+使用方法：
+   运行全部规模：python benchmark-build.py
+   只运行小规模（修改代码后快速检查）：python benchmark-build.py --sizes 100 1000
+   与之前的结果对比：python benchmark-build.py --sizes 1000 --compare .build/benchmarks/<之前的结果>.json
+   只对比两个结果文件：python benchmark-build.py --compare 旧.json 新.json
+
+详细说明见 sitebuild/benchmark.py
+"""
+
+from sitebuild.benchmark import main
+
+if __name__ == '__main__':
+    main()
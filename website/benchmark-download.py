@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+源站下载性能基准
+比较CDN不可用、回退到源站时几种发送安装包的方式（按块复制 8 KB / 256 KB、os.sendfile、X-Sendfile）
+的吞吐量和下载服务每发送 1 GB 消耗的CPU时间，结果保存为JSON。
+
+使用方法：
+   python3 benchmark-download.py
+   较小的文件、4个客户端同时下载：python3 benchmark-download.py --size-mb 64 --concurrency 4
+   只比较两种方式：python3 benchmark-download.py --modes copy-8k sendfile
+
+详细说明见 download_service/benchmark.py
+"""
+
+from download_service.benchmark import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网站构建脚本
+一次运行生成所有集合（使用指南、芯图日记）的详情页并更新 sitemap.xml，
+所有集合在同一个进程中加载，共用进程池、Markdown缓存和sitemap写入。
+
+使用方法：
+   增量生成全部：python build-site.py
+   全量生成全部：python build-site.py --full
+   只生成指定集合：python build-site.py guides
+   监听模式（保存后自动重新生成受影响的页面，Ctrl+C 退出）：python build-site.py --watch
+   性能分析（各阶段和每个页面的耗时、内存分配，最慢的页面）：python build-site.py --full --profile [--profile-output build.prof]
+"""
+
+from sitebuild.engine import main
+
+if __name__ == '__main__':
+    main(title='网站构建脚本')
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检查单遍扫描的 Markdown 转换器（sitebuild.markdown）与旧版多轮正则转换器输出是否一致
+对 diary/ 和 guides/ 下的每个 .md 文件分别用新旧转换器生成HTML并逐字比较
+
+说明：
+1. 旧版恢复代码块占位符时会丢失代码内容（只输出 <pre><code></code></pre>），
+   比较前会把新版输出中的代码块内容清空
+2. 正文中本身出现旧版占位符文本（如 __H2_TAG__）的文件，旧版输出会被破坏，跳过比较
+3. 新版用 class（md-table / md-img）代替表格和图片上重复的内联样式，
+   比较前把旧版输出中的内联样式换成对应的 class
+
+使用方法：
+   python check-markdown.py
+   python check-markdown.py --verbose   # 显示第一处差异
+"""
+
+import argparse
+import difflib
+import glob
+import re
+import sys
+import time
+
+from sitebuild.markdown import markdown_to_html
+
+# 旧版转换器使用的图片路径模式
+IMAGE_PATH_MODE = 'absolute'
+
+MARKDOWN_DIRS = ['diary', 'guides']
+
+# 旧版输出的内联样式 -> 新版的写法
+LEGACY_STYLE_REPLACEMENTS = [
+    ('<table style="border-collapse: collapse; width: 100%; margin: 20px 0; border: 1px solid #ddd;">',
+     '<table class="md-table">'),
+    ('<tr style="background-color: #f2f2f2;">', '<tr>'),
+    ('<th style="border: 1px solid #ddd; padding: 8px; text-align: left;">', '<th>'),
+    ('<td style="border: 1px solid #ddd; padding: 8px;">', '<td>'),
+    (' style="max-width: 100%; height: auto; margin: 20px 0; border-radius: 8px;">', ' class="md-img">'),
+]
+
+# 旧版转换器内部使用的占位符
+LEGACY_SENTINEL_PATTERN = re.compile(r'__(?:H[123]|IMG|QUOTE|TABLE)_TAG__|__CODE_BLOCK_\d+__')
+
+def legacy_markdown_to_html(markdown_text, html_relative_path=''):
+    """旧版Markdown到HTML转换（多轮正则替换，原样保留作为对照基准）
+    
+    Args:
+        markdown_text: Markdown文本
+        html_relative_path: HTML文件相对于网站根目录的路径（如 'diary/'），用于转换绝对路径为相对路径
+    """
+    html = markdown_text
+    
+    # 先处理代码块（避免被其他规则误匹配）
+    code_blocks = []
+    def save_code_block(match):
+        code_blocks.append(match.group(0))
+        return f'__CODE_BLOCK_{len(code_blocks)-1}__'
+    html = re.sub(r'```(\w+)?\n(.*?)```', save_code_block, html, flags=re.DOTALL)
+    
+    # 先处理表格（必须在其他规则之前，避免被误处理）
+    def process_table(match):
+        table_content = match.group(0)
+        # 移除末尾的换行符，避免影响后续处理
+        table_content = table_content.rstrip('\n')
+        lines = [line.strip() for line in table_content.split('\n') if line.strip()]
+        
+        if len(lines) < 2:
+            return table_content
+        
+        # 处理每一行，移除引用块前缀
+        processed_lines = []
+        for line in lines:
+            # 移除引用块前缀 > 
+            if line.startswith('> '):
+                line = line[2:].strip()
+            processed_lines.append(line)
+        
+        # 第一行是表头
+        header_line = processed_lines[0]
+        # 第二行是分隔符，跳过
+        # 从第三行开始是数据行
+        
+        # 提取表头单元格（Markdown表格格式：| col1 | col2 |，分割后第一个和最后一个可能是空字符串）
+        header_cells = [cell.strip() for cell in header_line.split('|')]
+        # 过滤掉空字符串
+        header_cells = [cell for cell in header_cells if cell]
+        
+        if not header_cells:
+            return table_content
+        
+        # 生成表头HTML
+        header_html = '<thead><tr style="background-color: #f2f2f2;">' + ''.join([f'<th style="border: 1px solid #ddd; padding: 8px; text-align: left;">{cell}</th>' for cell in header_cells]) + '</tr></thead>'
+        
+        # 生成表体HTML
+        body_html = '<tbody>'
+        for line in processed_lines[2:]:  # 跳过表头和分隔符
+            # 提取单元格（Markdown表格格式：| col1 | col2 |，分割后第一个和最后一个可能是空字符串）
+            cells = [cell.strip() for cell in line.split('|')]
+            # 过滤掉空字符串
+            cells = [cell for cell in cells if cell]
+            if cells:
+                # 如果列数不匹配，补齐或截断
+                while len(cells) < len(header_cells):
+                    cells.append('')
+                cells = cells[:len(header_cells)]
+                body_html += '<tr>' + ''.join([f'<td style="border: 1px solid #ddd; padding: 8px;">{cell}</td>' for cell in cells]) + '</tr>'
+        body_html += '</tbody>'
+        
+        return f'__TABLE_TAG__<table style="border-collapse: collapse; width: 100%; margin: 20px 0; border: 1px solid #ddd;">{header_html}{body_html}</table>__TABLE_TAG__\n'
+    
+    # 匹配表格：以 | 开头和结尾的行，至少3行（表头、分隔符、至少一行数据）
+    # 支持引用块内的表格（每行可能以 > 开头）
+    # 使用更精确的正则表达式，确保只匹配表格本身，不匹配后面的内容
+    # 表格必须以 | 开头的行开始，遇到非表格行（不以 | 开头）时停止
+    html = re.sub(r'(?:^> )?\|.+\|\s*\n(?:^> )?\|[:\-| ]+\|\s*\n(?:(?:^> )?\|.+\|\s*\n?)+', process_table, html, flags=re.MULTILINE)
+    
+    # 粗体
+    html = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html)
+    
+    # 行内代码
+    html = re.sub(r'`(.*?)`', r'<code>\1</code>', html)
+    
+    # 图片（必须在链接之前处理，因为图片语法类似但以!开头）
+    # 处理图片：根据IMAGE_PATH_MODE决定使用相对路径还是绝对路径
+    def process_image(match):
+        alt_text = match.group(1)
+        img_path = match.group(2)
+        
+        # 根据配置决定路径模式
+        if IMAGE_PATH_MODE == 'relative' and html_relative_path:
+            # 相对路径模式：用于本地预览
+            if img_path.startswith('/'):
+                # 计算需要向上几级目录
+                depth = html_relative_path.count('/') + html_relative_path.count('\\')
+                if depth > 0:
+                    # 移除开头的 /，添加相对路径前缀
+                    img_path = '../' * depth + img_path[1:]
+        else:
+            # 绝对路径模式：用于服务器部署（默认）
+            # 确保路径以 / 开头（绝对路径）
+            if not img_path.startswith('/') and not img_path.startswith('http'):
+                img_path = '/' + img_path
+        
+        return f'__IMG_TAG__<img src="{img_path}" alt="{alt_text}" style="max-width: 100%; height: auto; margin: 20px 0; border-radius: 8px;">__IMG_TAG__'
+    
+    html = re.sub(r'!\[(.*?)\]\((.*?)\)', process_image, html)
+    
+    # 链接
+    html = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html)
+    
+    # 引用块（需要排除表格行）
+    def process_quote(match):
+        content = match.group(1)
+        # 如果这行是表格的一部分，不处理
+        if content.strip().startswith('|') and '|' in content:
+            return match.group(0)
+        return f'__QUOTE_TAG__<blockquote>{content}</blockquote>__QUOTE_TAG__'
+    html = re.sub(r'^> (.*)$', process_quote, html, flags=re.MULTILINE)
+    
+    # 标题（必须在列表之前处理）
+    # 注意：标题处理需要在表格处理之后，但要确保能匹配表格后面的标题
+    # 使用更精确的正则表达式，确保只匹配真正的标题行（不以表格标记开头）
+    def process_h3(match):
+        line = match.group(0)
+        # 如果这行包含表格标记，不处理（避免重复处理）
+        if '__TABLE_TAG__' in line:
+            return line
+        return f'__H3_TAG__<h3>{match.group(1)}</h3>__H3_TAG__'
+    
+    def process_h2(match):
+        line = match.group(0)
+        # 如果这行包含表格标记，不处理（避免重复处理）
+        if '__TABLE_TAG__' in line:
+            return line
+        return f'__H2_TAG__<h2>{match.group(1)}</h2>__H2_TAG__'
+    
+    def process_h1(match):
+        line = match.group(0)
+        # 如果这行包含表格标记，不处理（避免重复处理）
+        if '__TABLE_TAG__' in line:
+            return line
+        return f'__H1_TAG__<h1>{match.group(1)}</h1>__H1_TAG__'
+    
+    html = re.sub(r'^### (.*)$', process_h3, html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.*)$', process_h2, html, flags=re.MULTILINE)
+    html = re.sub(r'^# (.*)$', process_h1, html, flags=re.MULTILINE)
+    
+    # 恢复代码块
+    for i, code_block in enumerate(code_blocks):
+        # 提取代码块内容（去掉```标记）
+        parts = code_block.split('```')
+        if len(parts) >= 3:
+            code_content = parts[2] if len(parts) > 2 else parts[1] if len(parts) > 1 else ''
+            html = html.replace(f'__CODE_BLOCK_{i}__', f'<pre><code>{code_content}</code></pre>')
+        else:
+            html = html.replace(f'__CODE_BLOCK_{i}__', f'<pre><code>{code_block}</code></pre>')
+    
+    # 处理表格（必须在段落处理之前）
+    def process_table_block(lines, start_idx):
+        """处理表格块，返回(表格HTML, 结束索引)"""
+        if start_idx >= len(lines):
+            return None, start_idx
+        
+        # 检查是否是表格行（以 | 开头和结尾）
+        table_lines = []
+        i = start_idx
+        in_quote = False
+        
+        while i < len(lines):
+            line = lines[i]
+            original_line = line
+            line_stripped = line.strip()
+            
+            # 检查是否在引用块中
+            if line_stripped.startswith('> '):
+                in_quote = True
+                # 移除 > 前缀和后面的空格
+                line_content = line_stripped[2:].strip()
+            else:
+                in_quote = False
+                line_content = line_stripped
+            
+            # 检查是否是表格行（必须以 | 开头）
+            if line_content.startswith('|') and line_content.count('|') >= 2:
+                table_lines.append((line_content, in_quote))
+                i += 1
+            elif i == start_idx:
+                # 第一行不是表格，直接返回
+                return None, start_idx
+            else:
+                # 遇到非表格行，停止
+                break
+        
+        if len(table_lines) < 2:  # 至少需要表头和分隔符
+            return None, start_idx
+        
+        # 解析表格
+        header_line, header_in_quote = table_lines[0]
+        separator_line, _ = table_lines[1] if len(table_lines) > 1 else ('', False)
+        data_lines = [line for line, _ in table_lines[2:]] if len(table_lines) > 2 else []
+        
+        # 提取表头单元格（Markdown表格格式：| col1 | col2 |，分割后第一个和最后一个可能是空字符串）
+        header_cells = [cell.strip() for cell in header_line.split('|')]
+        # 过滤掉空字符串
+        header_cells = [cell for cell in header_cells if cell]
+        
+        if not header_cells:
+            return None, start_idx
+        
+        # 生成表头HTML
+        header_html = '<thead><tr style="background-color: #f2f2f2;">' + ''.join([f'<th style="border: 1px solid #ddd; padding: 8px; text-align: left;">{cell}</th>' for cell in header_cells]) + '</tr></thead>'
+        
+        # 生成表体HTML
+        body_html = '<tbody>'
+        for data_line_tuple in table_lines[2:]:
+            data_line, in_quote = data_line_tuple
+            # 提取单元格（Markdown表格格式：| col1 | col2 |，分割后第一个和最后一个可能是空字符串）
+            cells = [cell.strip() for cell in data_line.split('|')]
+            # 过滤掉空字符串
+            cells = [cell for cell in cells if cell]
+            if cells:
+                # 如果列数不匹配，补齐或截断
+                while len(cells) < len(header_cells):
+                    cells.append('')
+                cells = cells[:len(header_cells)]
+                body_html += '<tr>' + ''.join([f'<td style="border: 1px solid #ddd; padding: 8px;">{cell}</td>' for cell in cells]) + '</tr>'
+        body_html += '</tbody>'
+        
+        table_html = f'<table style="border-collapse: collapse; width: 100%; margin: 20px 0; border: 1px solid #ddd;">{header_html}{body_html}</table>'
+        return table_html, i
+    
+    # 列表和段落处理
+    lines = html.split('\n')
+    in_list = False
+    result = []
+    i = 0
+    
+    while i < len(lines):
+        line = lines[i]
+        line_stripped = line.strip()
+        
+        # 跳过空行
+        if not line_stripped:
+            if in_list:
+                result.append('</ul>')
+                in_list = False
+            i += 1
+            continue
+        
+        # 检查是否是表格
+        table_html, table_end_idx = process_table_block(lines, i)
+        if table_html:
+            if in_list:
+                result.append('</ul>')
+                in_list = False
+            result.append(table_html)
+            i = table_end_idx
+            continue
+        
+        # 处理列表项
+        if line_stripped.startswith('- '):
+            if not in_list:
+                result.append('<ul>')
+                in_list = True
+            content = line_stripped[2:].strip()
+            result.append(f'<li>{content}</li>')
+        else:
+            # 结束列表
+            if in_list:
+                result.append('</ul>')
+                in_list = False
+            
+            # 检查是否是块级元素（已标记的）
+            if '__H1_TAG__' in line or '__H2_TAG__' in line or '__H3_TAG__' in line:
+                line = line.replace('__H1_TAG__', '').replace('__H2_TAG__', '').replace('__H3_TAG__', '')
+                result.append(line)
+            elif '__IMG_TAG__' in line:
+                line = line.replace('__IMG_TAG__', '')
+                result.append(line)
+            elif '__QUOTE_TAG__' in line:
+                line = line.replace('__QUOTE_TAG__', '')
+                result.append(line)
+            elif '__TABLE_TAG__' in line:
+                line = line.replace('__TABLE_TAG__', '')
+                result.append(line)
+            elif line_stripped.startswith('<pre>') or line_stripped.startswith('<blockquote>') or line_stripped.startswith('<table>'):
+                result.append(line)
+            elif line_stripped.startswith('|') and '|' in line_stripped:
+                # 可能是表格行，但没被正确识别，跳过（避免重复处理）
+                pass
+            else:
+                # 普通段落
+                result.append(f'<p>{line_stripped}</p>')
+        
+        i += 1
+    
+    if in_list:
+        result.append('</ul>')
+    
+    return '\n'.join(result)
+
+def strip_code_bodies(html):
+    """清空代码块内容（旧版转换器不输出代码内容）"""
+    return re.sub(r'<pre><code>.*?</code></pre>', '<pre><code></code></pre>', html, flags=re.DOTALL)
+
+def hoist_legacy_styles(html):
+    """把旧版输出中的内联样式换成新版的 class"""
+    for old, new in LEGACY_STYLE_REPLACEMENTS:
+        html = html.replace(old, new)
+    return html
+
+def load_markdown(filepath):
+    """读取Markdown并移除第一个h1标题（与详情页生成逻辑一致）"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return re.sub(r'^#\s+.*?\n', '', content, count=1, flags=re.MULTILINE)
+
+def main():
+    parser = argparse.ArgumentParser(description='Markdown转换器一致性检查')
+    parser.add_argument('--verbose', action='store_true', help='显示第一处差异')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("Markdown 转换器一致性检查")
+    print("=" * 60)
+    
+    files = []
+    for directory in MARKDOWN_DIRS:
+        files.extend(sorted(glob.glob(f'{directory}/*.md')))
+    
+    legacy_time = 0.0
+    new_time = 0.0
+    mismatched = []
+    skipped = []
+    
+    for filepath in files:
+        text = load_markdown(filepath)
+        if LEGACY_SENTINEL_PATTERN.search(text):
+            skipped.append(filepath)
+            print(f"⊘ {filepath}（正文包含旧版占位符文本，跳过）")
+            continue
+        
+        start = time.perf_counter()
+        expected = hoist_legacy_styles(legacy_markdown_to_html(text, html_relative_path='diary/'))
+        legacy_time += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        actual = markdown_to_html(text, html_relative_path='diary/', image_path_mode=IMAGE_PATH_MODE)
+        new_time += time.perf_counter() - start
+        
+        if strip_code_bodies(actual) == expected:
+            print(f"✓ {filepath}")
+            continue
+        
+        mismatched.append(filepath)
+        print(f"✗ {filepath}")
+        if args.verbose:
+            diff = difflib.unified_diff(expected.split('\n'), strip_code_bodies(actual).split('\n'),
+                                        'legacy', 'sitebuild', lineterm='', n=1)
+            for line in list(diff)[:12]:
+                print(f"    {line[:200]}")
+    
+    print()
+    print("=" * 60)
+    print(f"  文件总数: {len(files)}")
+    print(f"  跳过: {len(skipped)}")
+    print(f"  不一致: {len(mismatched)}")
+    print(f"  旧版耗时: {legacy_time * 1000:.1f} ms")
+    print(f"  新版耗时: {new_time * 1000:.1f} ms")
+    print("=" * 60)
+    
+    return 1 if mismatched else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,10 @@
 检查 sitemap.xml 是否包含所有网站链接
 """
 
-import re
 import os
 from pathlib import Path
-from xml.etree import ElementTree as ET
+
+from sitebuild.sitemap import read_sitemap
 
 BASE_URL = 'https://www.xintuxiangce.top'
 SITEMAP_FILE = 'sitemap.xml'
@@ -18,14 +18,8 @@ def get_sitemap_urls():
         print(f"错误: sitemap文件不存在 {SITEMAP_FILE}")
         return set()
     
-    urls = set()
-    with open(SITEMAP_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
-        # 使用正则表达式提取所有 <loc> 标签中的 URL
-        for match in re.finditer(r'<loc>(.*?)</loc>', content):
-            urls.add(match.group(1).strip())
-    
-    return urls
+    # URL很多时 sitemap.xml 会被拆分为 sitemap 索引 + 分片（见 sitebuild/sitemap.py），一并读取
+    return set(read_sitemap(SITEMAP_FILE))
 
 def get_website_html_files():
     """获取网站所有应该被索引的 HTML 文件"""
@@ -1,6 +1,7 @@
 /**
  * 公共组件加载器
- * 用于动态加载导航栏和底部栏组件
+ * 构建时导航栏和底部栏已直接写入页面（见 sitebuild/components.py），这里只做初始化；
+ * 页面中没有内联组件时（如未重新构建的页面）才动态加载组件
  */
 
 (function() {
@@ -19,6 +20,12 @@
         return html;
     }
 
+    // 组件的根元素（用于判断组件是否已在构建时内联）
+    const COMPONENT_SELECTORS = {
+        navbar: 'nav.navbar',
+        footer: 'footer.footer'
+    };
+
     // 加载组件
     function loadComponent(componentName, targetSelector, insertPosition = 'afterbegin') {
         const target = document.querySelector(targetSelector);
@@ -27,11 +34,17 @@
             return;
         }
 
-        const componentPath = getComponentPath() + componentName + '.html';
-        
-        // 添加时间戳和随机数防止缓存（双重保险）
-        const cacheBuster = '?v=' + Date.now() + '&r=' + Math.random().toString(36).substr(2, 9);
-        const fullPath = componentPath + cacheBuster;
+        // 构建时已内联的组件不再请求
+        const selector = COMPONENT_SELECTORS[componentName];
+        if (selector && document.querySelector(selector)) {
+            if (componentName === 'navbar') {
+                initMobileMenu();
+            }
+            return;
+        }
+
+        // 组件HTML由服务器按 ETag 验证缓存（不再每次附加随机参数强制重新下载）
+        const fullPath = getComponentPath() + componentName + '.html';
         
         console.log(`正在加载组件: ${componentName}, 路径: ${fullPath}`);
         
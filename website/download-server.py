@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+芯图相册下载服务（常驻进程）
+与 download.py / download-cdn.py 的处理逻辑相同（download_service/app.py），
+但解释器、模块、CDN配置和最新安装包常驻内存，每次下载请求不再启动Python。
+
+使用方法：
+   HTTP（lighttpd mod_proxy 转发，只需标准库）：python3 download-server.py --http 127.0.0.1:8081
+   FastCGI（lighttpd mod_fastcgi 转发，需要 pip install flup）：python3 download-server.py --fastcgi /run/xintuxiangce/download.sock
+   由 lighttpd 发送源站文件（lighttpd 中启用 x-sendfile）：python3 download-server.py --http 127.0.0.1:8081 --x-sendfile
+
+回退到源站时用 os.sendfile 发送安装包，加 --x-sendfile 时交给 lighttpd 发送（download_service/sendfile.py）；
+下载量在后台线程中汇总上报（download_service/stats.py），下载请求不等待统计接口。
+
+lighttpd 配置见 Operation/xintuxiangce-download.conf，systemd 服务见 Operation/xintuxiangce-download.service；
+已安装 gunicorn 时也可以直接运行：gunicorn -b 127.0.0.1:8081 download_service.wsgi:application
+"""
+
+import argparse
+import os
+import signal
+import sys
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from download_service import stats  # noqa: E402
+from download_service.app import make_application  # noqa: E402
+from download_service.sendfile import SendfileRequestHandler  # noqa: E402
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """每个请求一个线程：源站下载大文件时不阻塞其他请求"""
+    daemon_threads = True
+
+
+class QuietHandler(SendfileRequestHandler):
+    """源站下载用 os.sendfile 发送；只记录出错的请求（访问日志由 lighttpd 记录，拦截爬虫的 403 不记录）"""
+
+    def log_request(self, code='-', size='-'):
+        if str(code).startswith(('4', '5')) and str(code) != '403':
+            super().log_request(code, size)
+
+
+def serve_http(address, application):
+    host, _, port = address.rpartition(':')
+    server = make_server(host or '127.0.0.1', int(port), application,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"下载服务已启动: http://{host or '127.0.0.1'}:{port}/download.py（Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+
+
+def serve_fastcgi(socket_path, application):
+    try:
+        from flup.server.fcgi import WSGIServer as FastCGIServer
+    except ImportError:
+        print("错误: FastCGI 模式需要安装 flup")
+        print("安装命令: pip install flup")
+        print("或者使用 --http 模式（lighttpd mod_proxy 转发，只需标准库）")
+        sys.exit(1)
+    print(f"下载服务已启动: FastCGI {socket_path}")
+    FastCGIServer(application, bindAddress=socket_path, umask=0o007).run()
+
+
+def _terminate(signum, frame):
+    """systemctl stop / restart 发送 SIGTERM：按 Ctrl+C 处理，退出前上报剩余的下载量"""
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description='芯图相册下载服务（常驻进程）')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--http', metavar='地址:端口', default='127.0.0.1:8081',
+                       help='以HTTP方式监听（默认 127.0.0.1:8081，由 lighttpd mod_proxy 转发）')
+    group.add_argument('--fastcgi', metavar='套接字路径',
+                       help='以FastCGI方式监听 Unix 套接字（由 lighttpd mod_fastcgi 转发，需要 flup）')
+    parser.add_argument('--x-sendfile', action='store_true',
+                        help='回退到源站时只返回 X-Sendfile 响应头，由 lighttpd 发送文件（lighttpd 中需要启用 x-sendfile）')
+    args = parser.parse_args()
+
+    application = make_application(x_sendfile=args.x_sendfile)
+    # 下载量后台上报（下载请求只写本地记录）
+    flusher = stats.Flusher()
+    flusher.start()
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        if args.fastcgi:
+            serve_fastcgi(args.fastcgi, application)
+        else:
+            serve_http(args.http, application)
+    finally:
+        flusher.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上报下载量统计（download_service/stats.py）
+下载请求只把下载记录追加到本地文件；常驻的 download-server.py 会在后台自动上报，
+只用CGI（download.py）时用 cron 定时运行本脚本：
+   * * * * * lighttpd /usr/bin/python3 /var/www/xintuxiangce/website/download-stats-flush.py
+记录目录不可写时下载记录写在备用目录（临时目录下的 xintuxiangce-download-stats），本脚本一起上报。
+
+使用方法：
+   python3 download-stats-flush.py                上报一次（失败的保留到下次）
+   python3 download-stats-flush.py --status       只查看待上报的数量
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from download_service import stats  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上报下载量统计')
+    parser.add_argument('--spool-dir', default=stats.SPOOL_DIR, help=f'下载记录目录（默认 {stats.SPOOL_DIR}）')
+    parser.add_argument('--fallback-dir', default=stats.FALLBACK_SPOOL_DIR,
+                        help=f'备用记录目录（默认 {stats.FALLBACK_SPOOL_DIR}）')
+    parser.add_argument('--status', action='store_true', help='只显示待上报的数量，不上报')
+    args = parser.parse_args()
+
+    dirs = stats.spool_dirs(args.spool_dir, args.fallback_dir)
+    if not any(os.path.isdir(path) for path in dirs):
+        print(f"没有下载记录: {'、'.join(dirs)}")
+        return
+
+    if args.status:
+        counts = stats.status(args.spool_dir, args.fallback_dir)
+        if not counts:
+            print("✓ 没有待上报的下载量")
+        for download_type, count in sorted(counts.items()):
+            print(f"   {download_type:<9}{count}")
+        return
+
+    sent, complete = stats.flush(args.spool_dir, log=print, fallback_dir=args.fallback_dir)
+    if complete:
+        print(f"✓ 已上报 {sent} 次下载")
+    else:
+        print(f"⚠ 已上报 {sent} 次下载，其余的下次重试")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+下载服务公共模块
+download.py / download-cdn.py（CGI）和 download-server.py（常驻进程）共用
+"""
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+芯图相册下载服务（WSGI应用）
+download.py 原来作为CGI运行：每次点击下载都要启动Python解释器、导入模块、读取CDN配置并扫描安装包目录。
+这里把同样的处理流程做成常驻内存的WSGI应用：
+    type=portable/setup/android/mac → Mac提示页 / 400 / 404 → 拦截爬虫 → 跳转CDN → 回退到源站
+CDN配置在内存中缓存，配置文件修改时间变化后才重新读取；
+每种类型的最新安装包从发布目录 dist/releases.json 中查询（见 catalog.py），处理请求时不扫描目录；
+CDN上的文件是否可用查询缓存（见 cdnhealth.py），不再每次下载前发 HEAD 请求；
+下载量只追加到本地记录，由后台汇总上报（见 stats.py），下载请求不等待统计接口。
+
+部署方式：
+  - 常驻进程：download-server.py（lighttpd 通过 mod_proxy 或 FastCGI 转发，见 Operation/xintuxiangce-download.conf）
+  - WSGI服务器：gunicorn download_service.wsgi:application
+  - CGI（兼容旧部署）：download.py / download-cdn.py 用 wsgiref 的 CGIHandler 运行同一个应用
+"""
+
+import json
+import os
+import sys
+import tempfile
+from urllib.parse import parse_qs
+from wsgiref.util import FileWrapper
+
+from download_service import pages
+from download_service.catalog import FILE_DIRS, ReleaseCatalog
+from download_service.cdnhealth import CdnHealth
+from download_service.stats import SPOOL_DIR, DownloadCounter
+
+# download.py 的默认配置（download-cdn.py 的配置见 DOWNLOAD_CDN_OPTIONS）
+CDN_CONFIG_FILE = '/var/www/xintuxiangce/qiniu-config.json'
+BASE_DIR = '/var/www/xintuxiangce/website/dist'
+
+# 常见爬虫标识（User-Agent 包含任一关键词即视为爬虫）
+CRAWLER_KEYWORDS = (
+    'bot', 'crawler', 'spider', 'scraper',
+    'googlebot', 'bingbot', 'slurp', 'duckduckbot',
+    'baiduspider', 'yandexbot', 'sogou', 'exabot',
+    'facebot', 'ia_archiver', 'archive.org_bot',
+    'msnbot', 'ahrefsbot', 'semrushbot', 'dotbot',
+    'mj12bot', 'megaindex', 'blexbot', 'petalbot',
+    'curl', 'wget', 'python-requests', 'scrapy',
+    'http', 'java', 'go-http-client', 'okhttp',
+    'apache-httpclient', 'postman', 'insomnia',
+)
+
+# 服务器不支持 sendfile 时按块复制的大小
+CHUNK_SIZE = 256 * 1024
+# 交给 lighttpd 发送文件的响应头（lighttpd 也接受 X-LIGHTTPD-send-file）
+X_SENDFILE_HEADER = 'X-Sendfile'
+# CGI 和 gunicorn 下通过环境变量启用 X-Sendfile（lighttpd: setenv.add-environment = ( "XINTUXIANGCE_X_SENDFILE" => "1" )）
+X_SENDFILE_ENV = 'XINTUXIANGCE_X_SENDFILE'
+
+HTML_TYPE = ('Content-Type', 'text/html; charset=utf-8')
+
+
+def log(message):
+    """日志写到标准错误（CGI 下进入 lighttpd 的错误日志，常驻进程下进入服务日志）"""
+    print(f"# {message}", file=sys.stderr)
+
+
+def is_crawler(user_agent):
+    """User-Agent 是否来自爬虫（没有 User-Agent 的请求也视为爬虫）"""
+    user_agent = (user_agent or '').lower()
+    if not user_agent:
+        return True
+    return any(keyword in user_agent for keyword in CRAWLER_KEYWORDS)
+
+
+def get_download_type_for_stats(file_type):
+    """文件类型 -> 统计接口的下载类型（'android' / 'windows'，mac 等其他类型返回 None 不统计）"""
+    if file_type == 'android':
+        return 'android'
+    if file_type in ('portable', 'setup'):
+        return 'windows'
+    return None
+
+
+class CdnConfig:
+    """七牛CDN配置（qiniu-config.json），文件修改时间变化后重新读取"""
+
+    def __init__(self, path):
+        self.path = path
+        self.domain = None
+        self.enabled = False
+        self.fallback_to_source = True
+        self._signature = None
+
+    def refresh(self):
+        """按需重新读取配置，返回CDN是否可用（已启用且配置了域名）"""
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature != self._signature:
+            self._signature = signature
+            self._load(signature is not None)
+        return bool(self.enabled and self.domain)
+
+    def _load(self, exists):
+        self.domain, self.enabled, self.fallback_to_source = None, False, True
+        if not exists:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            self.domain = config.get('domain', '').rstrip('/')
+            self.enabled = config.get('cdn_enabled', False)
+            self.fallback_to_source = config.get('fallback_to_source', True)
+        except Exception as e:
+            log(f"CDN配置加载失败: {e}")
+
+
+class DownloadApp:
+    """下载服务：一个实例对应一套配置（download.py / download-cdn.py），可在多个线程中共用"""
+
+    def __init__(self, base_dir=BASE_DIR, config_file=CDN_CONFIG_FILE, block_crawlers=True,
+                 count_downloads=True, latest_by_date=True, background_checks=True, health_state_file=None,
+                 stats_spool_dir=SPOOL_DIR, x_sendfile=False):
+        self.base_dir = base_dir
+        self.cdn = CdnConfig(config_file)
+        # 是否拦截爬虫、是否统计下载量（download-cdn.py 两者都不做）
+        self.block_crawlers = block_crawlers
+        self.count_downloads = count_downloads
+        # 下载量只追加到本地记录，由 stats.Flusher / download-stats-flush.py 汇总上报
+        self.counter = DownloadCounter(stats_spool_dir, log)
+        # 回退到源站时由 lighttpd 发送文件（需要在 lighttpd 中启用 x-sendfile）
+        self.x_sendfile = x_sendfile
+        # 每种类型的最新安装包（dist/releases.json）
+        self.releases = ReleaseCatalog(base_dir, latest_by_date, log)
+        # CDN可用性缓存（CGI 下没有常驻进程，同步检查，结果保存在 health_state_file 中供后续请求使用）
+        self.cdn_health = CdnHealth(background=background_checks, state_file=health_state_file, log=log)
+
+    def count(self, file_type):
+        download_type = get_download_type_for_stats(file_type)
+        if self.count_downloads and download_type:
+            self.counter.record(download_type)
+
+    def warm_up(self):
+        """在后台检查各类型的最新安装包在CDN上是否可用，启动后第一个下载请求就能直接跳转CDN"""
+        if not self.cdn_health.background or not self.cdn.refresh():
+            return
+        for file_type in FILE_DIRS:
+            release = self.releases.latest(file_type)
+            if release and release['cdn_key']:
+                self.cdn_health.is_available(f"{self.cdn.domain}/{release['cdn_key']}", _release_key(release))
+
+    def __call__(self, environ, start_response):
+        params = parse_qs(environ.get('QUERY_STRING', ''))
+        file_type = params.get('type', ['portable'])[0].lower()
+        cdn_available = self.cdn.refresh()
+
+        # 如果是 Mac，返回正在开发中的提示
+        if file_type == 'mac':
+            return _html(start_response, '200 OK', pages.MAC_COMING_SOON)
+
+        if file_type not in FILE_DIRS:
+            return _html(start_response, '400 Bad Request', pages.INVALID_TYPE)
+
+        release = self.releases.latest(file_type)
+        if not release:
+            return _html(start_response, '404 Not Found', pages.not_found(file_type))
+
+        # 如果是爬虫，返回友好提示，不提供下载
+        if self.block_crawlers and is_crawler(environ.get('HTTP_USER_AGENT')):
+            return _html(start_response, '403 Forbidden', pages.CRAWLER_FORBIDDEN)
+
+        # 如果CDN可用，尝试从CDN下载
+        if cdn_available:
+            if release['cdn_key']:
+                cdn_url = f"{self.cdn.domain}/{release['cdn_key']}"
+                # 查询缓存的检查结果；还没有结果又不能回退到源站时，等待这一次检查
+                if self.cdn_health.is_available(cdn_url, _release_key(release), wait=not self.cdn.fallback_to_source):
+                    self.count(file_type)
+                    return _html(start_response, '302 Found', pages.redirect(cdn_url), [('Location', cdn_url)])
+                if not self.cdn.fallback_to_source:
+                    return _html(start_response, '503 Service Unavailable', pages.CDN_UNAVAILABLE)
+
+        # 回退到源站下载
+        self.count(file_type)
+        return self.serve_file(environ, start_response, release['full_path'], release['filename'])
+
+    def serve_file(self, environ, start_response, file_path, filename):
+        headers = [
+            ('Content-Type', 'application/octet-stream'),
+            ('Content-Disposition', f'attachment; filename="{filename}"'),
+            ('Cache-Control', 'no-cache, must-revalidate'),
+            ('Pragma', 'no-cache'),
+            ('Expires', '0'),
+        ]
+        if self.x_sendfile:
+            # lighttpd 收到响应头后自己发送文件（并设置 Content-Length），这里不读文件
+            if not os.path.isfile(file_path):
+                return _html(start_response, '500 Internal Server Error', pages.server_error(f"文件不存在: {filename}"))
+            start_response('200 OK', headers + [(X_SENDFILE_HEADER, os.path.abspath(file_path))])
+            return [b'']
+        try:
+            f = open(file_path, 'rb')
+            file_size = os.fstat(f.fileno()).st_size
+        except OSError as e:
+            return _html(start_response, '500 Internal Server Error', pages.server_error(e))
+        start_response('200 OK', headers[:2] + [('Content-Length', str(file_size))] + headers[2:])
+        # 服务器提供 wsgi.file_wrapper 时由服务器发送文件（sendfile.py 中的处理器用 os.sendfile）
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(f, CHUNK_SIZE)
+
+
+def _release_key(release):
+    """CDN检查结果按安装包缓存：发布目录中有哈希时用哈希，否则（发布目录过期）用大小和修改时间"""
+    return release['sha256'] or f"{release['size']}-{release['mtime_ns']}"
+
+
+def _html(start_response, status, body, headers=()):
+    data = body.encode('utf-8')
+    start_response(status, [HTML_TYPE, ('Content-Length', str(len(data))), *headers])
+    return [data]
+
+
+# CGI 下各进程共用的CDN状态文件（download.py / download-cdn.py 各一个）
+HEALTH_STATE_DIR = tempfile.gettempdir()
+
+# download-cdn.py 的配置：安装包在站点根目录的 dist 下，不拦截爬虫、不统计下载量，按修改时间选择最新文件
+DOWNLOAD_CDN_OPTIONS = {
+    'base_dir': '/var/www/xintuxiangce/dist',
+    'config_file': '/var/www/xintuxiangce/website/qiniu-config.json',
+    'block_crawlers': False,
+    'count_downloads': False,
+    'latest_by_date': False,
+}
+
+# 常驻进程中按请求路径选择应用
+ROUTES = {
+    'download.py': {},
+    'download-cdn.py': DOWNLOAD_CDN_OPTIONS,
+}
+
+
+def make_application(routes=None, **options):
+    """
+    按请求路径分发到对应的 DownloadApp（/download.py、/download-cdn.py，其他路径按 download.py 处理）
+    lighttpd 通过 mod_proxy 转发时路径在 PATH_INFO 中，通过 FastCGI 转发时在 SCRIPT_NAME 中
+    options: 所有路径共用的 DownloadApp 参数（例如 x_sendfile=True）
+    """
+    apps = {name: DownloadApp(**dict(route_options, **options)) for name, route_options in (routes or ROUTES).items()}
+    for app in apps.values():
+        app.warm_up()
+    default = apps.get('download.py') or next(iter(apps.values()))
+
+    def application(environ, start_response):
+        path = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+        app = apps.get(path.rsplit('/', 1)[-1], default)
+        return app(environ, start_response)
+
+    return application
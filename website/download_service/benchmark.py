@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+源站下载性能基准
+在临时目录中生成一个安装包（默认 256 MB），分别用以下方式启动下载服务（子进程，CDN不可用、回退到源站），
+客户端反复下载，记录吞吐量和下载服务进程每发送 1 GB 消耗的CPU时间：
+  - copy-8k：wsgiref 原有的按块复制，每块 8 KB（改造前 download.py 的方式）
+  - copy-256k：按块复制，每块 256 KB（没有 os.sendfile 的系统上的回退方式）
+  - sendfile：os.sendfile()，数据不经过Python（download-server.py 的默认方式）
+  - x-sendfile：只返回 X-Sendfile 响应头（实际由 lighttpd 发送文件，这里只测量Python一侧的开销）
+CPU时间从 /proc/<pid>/stat 读取，只在 Linux 上可用，其他系统只记录吞吐量。
+结果写入 .build/benchmarks/download-<时间>.json。
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+MODES = ('copy-8k', 'copy-256k', 'sendfile', 'x-sendfile')
+DEFAULT_SIZE_MB = 256
+DEFAULT_REPEAT = 5
+RESULTS_DIR = os.path.join('.build', 'benchmarks')
+PACKAGE_NAME = 'xtxc209901010000.zip'
+READ_SIZE = 1024 * 1024
+
+WEBSITE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_dist(root, size_mb):
+    """生成测试用的安装包目录（内容是重复的随机块，避免生成时间过长）"""
+    dist = os.path.join(root, 'dist')
+    package_dir = os.path.join(dist, 'pc', 'portable')
+    os.makedirs(package_dir)
+    block = os.urandom(1024 * 1024)
+    with open(os.path.join(package_dir, PACKAGE_NAME), 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return dist
+
+
+def serve(mode, dist, spool_dir):
+    """子进程：按 mode 启动下载服务，把端口号写到标准输出"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from download_service import app as app_module
+    from download_service.sendfile import SendfileRequestHandler
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietCopyHandler(WSGIRequestHandler):
+        def log_request(self, code='-', size='-'):
+            pass
+
+    class QuietSendfileHandler(SendfileRequestHandler):
+        def log_request(self, code='-', size='-'):
+            pass
+
+    if mode == 'copy-8k':
+        app_module.CHUNK_SIZE = 8192
+    application = app_module.DownloadApp(
+        base_dir=dist, config_file=os.path.join(dist, 'no-cdn.json'), count_downloads=False,
+        stats_spool_dir=spool_dir, x_sendfile=(mode == 'x-sendfile'))
+    handler = QuietSendfileHandler if mode in ('sendfile', 'x-sendfile') else QuietCopyHandler
+    server = make_server('127.0.0.1', 0, application, server_class=ThreadingWSGIServer, handler_class=handler)
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+def _cpu_seconds(pid):
+    """进程已消耗的CPU时间（用户态 + 内核态），不支持时返回 None"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _download(port):
+    """下载一次，返回 (收到的字节数, X-Sendfile 响应头)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request('GET', '/download.py?type=portable', headers={'User-Agent': 'Mozilla/5.0'})
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"下载失败: HTTP {response.status}")
+        buffer = bytearray(READ_SIZE)
+        view = memoryview(buffer)
+        received = 0
+        while True:
+            n = response.readinto(view)
+            if not n:
+                break
+            received += n
+        return received, response.getheader('X-Sendfile')
+    finally:
+        conn.close()
+
+
+def run_mode(mode, dist, spool_dir, repeat, concurrency):
+    proc = subprocess.Popen([sys.executable, '-m', 'download_service.benchmark', '--serve', mode, dist, spool_dir],
+                            cwd=WEBSITE_DIR, stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(proc.stdout.readline())
+        _download(port)  # 预热：导入模块、读取发布目录
+
+        results = []
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(repeat):
+                    results.append(_download(port))
+            except Exception as e:
+                errors.append(e)
+
+        cpu_before = _cpu_seconds(proc.pid)
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+        cpu_after = _cpu_seconds(proc.pid)
+        if errors:
+            raise errors[0]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    received = sum(size for size, _ in results)
+    file_size = os.path.getsize(os.path.join(dist, 'pc', 'portable', PACKAGE_NAME))
+    # x-sendfile 时服务只返回响应头，按 lighttpd 将要发送的文件大小计算
+    sent = received if mode != 'x-sendfile' else file_size * len(results)
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return {
+        'mode': mode,
+        'downloads': len(results),
+        'bytes': sent,
+        'seconds': seconds,
+        'throughput_mb_s': sent / 1024 / 1024 / seconds if seconds else None,
+        'cpu_seconds': cpu,
+        'cpu_seconds_per_gb': cpu / (sent / 1024 ** 3) if cpu is not None and sent else None,
+        'requests_per_second': len(results) / seconds if seconds else None,
+    }
+
+
+def print_results(results):
+    print()
+    for r in results:
+        cpu = f"{r['cpu_seconds_per_gb']:.3f} 秒/GB" if r['cpu_seconds_per_gb'] is not None else '-'
+        throughput = f"{r['throughput_mb_s']:.0f} MB/s" if r['mode'] != 'x-sendfile' else '(由 lighttpd 发送)'
+        print(f"   {r['mode']:<11}吞吐量 {throughput:<16}CPU {cpu:<14}{r['requests_per_second']:.1f} 请求/秒"
+              f"（{r['downloads']} 次下载）")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        serve(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description='源站下载性能基准（按块复制 / os.sendfile / X-Sendfile）')
+    parser.add_argument('--size-mb', type=int, default=DEFAULT_SIZE_MB, help=f'安装包大小（默认 {DEFAULT_SIZE_MB} MB）')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help=f'每个客户端下载的次数（默认 {DEFAULT_REPEAT}）')
+    parser.add_argument('--concurrency', type=int, default=1, help='同时下载的客户端数（默认 1）')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='要测量的方式（默认全部）')
+    parser.add_argument('--output', metavar='文件', help=f'结果文件（默认 {RESULTS_DIR}/download-<时间>.json）')
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("源站下载性能基准")
+    print("=" * 50)
+    if not hasattr(os, 'sendfile') and 'sendfile' in args.modes:
+        print("⚠ 当前系统没有 os.sendfile，sendfile 方式会回退为按块复制")
+
+    root = tempfile.mkdtemp(prefix='xtxc-download-bench-')
+    try:
+        print(f"生成 {args.size_mb} MB 的安装包...")
+        dist = make_dist(root, args.size_mb)
+        spool_dir = os.path.join(root, 'stats')
+        results = []
+        for mode in args.modes:
+            print(f"   {mode}: {args.concurrency} 个客户端 × {args.repeat} 次")
+            results.append(run_mode(mode, dist, spool_dir, args.repeat, args.concurrency))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print_results(results)
+
+    result = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'size_mb': args.size_mb,
+        'repeat': args.repeat,
+        'concurrency': args.concurrency,
+        'results': results,
+    }
+    output = args.output or os.path.join(WEBSITE_DIR, RESULTS_DIR, f"download-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 结果已保存: {output}")
+
+
+if __name__ == '__main__':
+    main()
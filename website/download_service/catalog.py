@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+安装包发布目录（dist/releases.json）
+记录每种下载类型的最新安装包：文件名、相对路径、大小、SHA-256、CDN上的路径（cdn_key），
+以及扫描时各目录的修改时间。发布新版本后运行一次：
+    python3 release-catalog.py                 （website/dist）
+    python3 release-catalog.py /path/to/dist   （其他目录，例如 download-cdn.py 使用的 dist）
+下载服务和 qiniu-upload.py 直接读取这个文件，处理下载请求时不再扫描目录、解析文件名、逐个读取修改时间。
+发布目录只由 release-catalog.py（和 qiniu-upload.py）写入，哈希也只在这时计算：
+下载服务只读取，文件不存在或已过期（目录修改时间变化，或安装包的大小、修改时间变化）时，
+只扫描请求的那一种类型，不计算哈希（sha256 为空），直到重新运行 release-catalog.py。
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+CATALOG_FILE = 'releases.json'
+CATALOG_VERSION = 1
+
+# 下载类型 -> 安装包目录（相对 dist）和CDN上的路径前缀
+FILE_DIRS = {
+    'portable': os.path.join('pc', 'portable'),
+    'setup': os.path.join('pc', 'setup'),
+    'android': 'android',
+    'mac': 'mac',
+}
+REMOTE_PREFIXES = {
+    'portable': 'pc/portable',
+    'setup': 'pc/setup',
+    'android': 'android',
+    'mac': 'mac',
+}
+
+# 安装包的扩展名（目录中的其他文件忽略）
+PACKAGE_EXTENSIONS = ('.zip', '.exe', '.apk', '.dmg', '.pkg')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def extract_date_from_filename(filename):
+    """从文件名中提取日期信息用于排序
+
+    支持格式：
+    - xtxc202511111206.zip -> 202511111206
+    - xtxcsetup202511021528.zip -> 202511021528
+    - xuxc202510311010.apk -> 202510311010
+    """
+    # 匹配文件名中的日期时间格式：YYYYMMDDHHMM 或 YYYYMMDD
+    match = re.search(r'(\d{8})(\d{4})?', filename)
+    if match:
+        date_str = match.group(1)
+        time_str = match.group(2) if match.group(2) else '0000'
+        return int(date_str + time_str)
+    return 0
+
+
+def get_latest_file(dir_path, by_date=True):
+    """
+    获取指定目录下最新的安装包
+    by_date: 优先按文件名中的日期排序，无法提取日期的文件按修改时间排在后面；False 时只按修改时间
+    """
+    if not os.path.exists(dir_path):
+        return None
+
+    files = glob.glob(os.path.join(dir_path, '*.*'))
+    files = [f for f in files if f.lower().endswith(PACKAGE_EXTENSIONS)]
+    if not files:
+        return None
+
+    if not by_date:
+        return max(files, key=os.path.getmtime)
+
+    def sort_key(filepath):
+        date_value = extract_date_from_filename(os.path.basename(filepath))
+        if date_value > 0:
+            return (1, date_value)
+        return (0, os.path.getmtime(filepath))
+
+    return max(files, key=sort_key)
+
+
+def get_remote_path(file_type, filename):
+    """获取CDN远程路径"""
+    prefix = REMOTE_PREFIXES.get(file_type)
+    return f'{prefix}/{filename}' if prefix else ''
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def scan_release(base_dir, file_type, by_date=True, previous=None, hash_files=True):
+    """
+    扫描一种下载类型的目录，返回最新安装包的记录（没有安装包时返回 None）
+    previous: 旧记录，文件名、大小、修改时间都没变时沿用其中的哈希
+    hash_files: False 时不计算新文件的哈希（sha256 为空，下载请求中使用）
+    """
+    latest = get_latest_file(os.path.join(base_dir, FILE_DIRS[file_type]), by_date)
+    if not latest:
+        return None
+    st = os.stat(latest)
+    filename = os.path.basename(latest)
+    if (previous and previous.get('filename') == filename and previous.get('size') == st.st_size
+            and previous.get('mtime_ns') == st.st_mtime_ns and previous.get('sha256')):
+        sha256 = previous['sha256']
+    elif hash_files:
+        sha256 = file_sha256(latest)
+    else:
+        sha256 = ''
+    return {
+        'filename': filename,
+        'path': os.path.relpath(latest, base_dir).replace(os.sep, '/'),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha256': sha256,
+        'cdn_key': get_remote_path(file_type, filename),
+    }
+
+
+def build_catalog(base_dir, by_date=True, previous=None):
+    """扫描所有下载类型，返回发布目录（previous 为旧的发布目录，用于沿用未变化文件的哈希）"""
+    old_releases = (previous or {}).get('releases', {})
+    catalog = {
+        'version': CATALOG_VERSION,
+        'by_date': by_date,
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'dirs': {},
+        'releases': {},
+    }
+    for file_type, sub_dir in FILE_DIRS.items():
+        # 先记录目录修改时间再扫描：扫描期间目录变化时，下次读取会发现不一致并重新扫描
+        catalog['dirs'][file_type] = _dir_mtime(os.path.join(base_dir, sub_dir))
+        release = scan_release(base_dir, file_type, by_date, old_releases.get(file_type))
+        if release:
+            catalog['releases'][file_type] = release
+    return catalog
+
+
+def load_catalog(base_dir):
+    """读取 dist/releases.json（不存在或格式不对时返回 None）"""
+    try:
+        with open(os.path.join(base_dir, CATALOG_FILE), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(catalog, dict) or catalog.get('version') != CATALOG_VERSION:
+        return None
+    return catalog
+
+
+def save_catalog(base_dir, catalog):
+    """写入 dist/releases.json（先写临时文件再替换，读取方不会读到写了一半的文件）"""
+    path = os.path.join(base_dir, CATALOG_FILE)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _release_unchanged(base_dir, release):
+    """记录中的安装包还在，且大小和修改时间没变（同名覆盖时目录修改时间不变，要检查文件本身）"""
+    if not release:
+        return True
+    try:
+        st = os.stat(os.path.join(base_dir, *release['path'].split('/')))
+    except OSError:
+        return False
+    return st.st_size == release.get('size') and st.st_mtime_ns == release.get('mtime_ns')
+
+
+def is_fresh(base_dir, catalog, file_type, by_date=True):
+    """发布目录中这种类型的记录是否仍然有效：排序方式相同、目录修改时间相同、安装包没有变化"""
+    if not catalog or catalog.get('by_date') != by_date:
+        return False
+    if _dir_mtime(os.path.join(base_dir, FILE_DIRS[file_type])) != catalog.get('dirs', {}).get(file_type):
+        return False
+    return _release_unchanged(base_dir, catalog.get('releases', {}).get(file_type))
+
+
+def is_stale(base_dir, catalog, by_date=True, file_types=None):
+    """发布目录是否过期（任一类型的记录失效）"""
+    return not all(is_fresh(base_dir, catalog, file_type, by_date) for file_type in file_types or FILE_DIRS)
+
+
+def publish(base_dir, by_date=True):
+    """重新扫描并写入发布目录，返回发布目录"""
+    catalog = build_catalog(base_dir, by_date, load_catalog(base_dir))
+    save_catalog(base_dir, catalog)
+    return catalog
+
+
+class ReleaseCatalog:
+    """
+    下载服务使用的发布目录（只读）：releases.json 的修改时间变化后重新读取，可在多个线程中共用
+    每次查询只 stat 发布目录文件、对应的安装包目录和安装包，不扫描目录、不计算哈希
+    """
+
+    def __init__(self, base_dir, by_date=True, log=None):
+        self.base_dir = base_dir
+        self.by_date = by_date
+        self.path = os.path.join(base_dir, CATALOG_FILE)
+        self._log = log or (lambda message: None)
+        self._catalog = None
+        self._signature = None
+        # 发布目录缺失或过期时扫描到的结果：下载类型 -> (目录修改时间, 记录)
+        self._scanned = {}
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def latest(self, file_type):
+        """最新安装包的记录（filename、path、size、mtime_ns、sha256、cdn_key），没有时返回 None"""
+        signature = self._file_signature()
+        if signature != self._signature:
+            catalog = load_catalog(self.base_dir) if signature else None
+            with self._lock:
+                self._catalog, self._signature = catalog, signature
+        catalog = self._catalog
+        if is_fresh(self.base_dir, catalog, file_type, self.by_date):
+            release = catalog['releases'].get(file_type)
+        else:
+            release = self._scan(file_type, catalog)
+        if not release:
+            return None
+        return dict(release, full_path=os.path.join(self.base_dir, *release['path'].split('/')))
+
+    def _scan(self, file_type, catalog):
+        """发布目录缺失或过期：只扫描这一种类型，不计算哈希；目录和安装包没有变化时沿用上次的结果"""
+        dir_mtime = _dir_mtime(os.path.join(self.base_dir, FILE_DIRS[file_type]))
+        cached = self._scanned.get(file_type)
+        if cached and cached[0] == dir_mtime and _release_unchanged(self.base_dir, cached[1]):
+            return cached[1]
+        previous = (catalog or {}).get('releases', {}).get(file_type)
+        release = scan_release(self.base_dir, file_type, self.by_date, previous, hash_files=False)
+        self._scanned[file_type] = (dir_mtime, release)
+        state = '不存在' if catalog is None else '已过期'
+        self._log(f"发布目录{state}，已扫描 {FILE_DIRS[file_type]}（请运行 release-catalog.py 更新 {self.path}）")
+        return release
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+CDN可用性缓存和熔断
+原来每次跳转CDN前都要同步发一次 HEAD 请求（超时5秒）：每次下载多一次到CDN的往返，
+CDN故障时每次点击都要卡5秒。现在检查结果按安装包缓存，处理下载请求时只查缓存：
+  - 每个安装包（CDN地址 + SHA-256，重新上传同名文件时哈希不同，重新检查）缓存检查结果，
+    可用的结果缓存 OK_TTL 秒，不可用的缓存 FAIL_TTL 秒；过期后先沿用旧结果，在后台线程中重新检查
+  - 熔断：连续 FAILURE_THRESHOLD 次检查出错（连接失败、超时、5xx）后熔断 OPEN_SECONDS 秒，
+    期间所有下载直接回退到源站，不再检查；之后进入半开状态，只放一个检查请求探测，成功则恢复，失败继续熔断
+  - 文件不存在（4xx，例如还没上传）只影响这个安装包，不计入熔断
+CGI 每次请求都是新进程，后台线程和内存缓存都用不上：这时使用 background=False 同步检查，
+并把状态保存在 state_file 中，多个进程共用。同步检查前对 state_file 旁边的锁文件（每个安装包一个，
+半开探测共用一个）加非阻塞的文件锁：同一时间只有一个进程在检查，其他进程不等待，按旧结果（或 None）处理，
+熔断期间没有请求等待。没有 fcntl 的系统（Windows）不加进程锁。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，不加进程锁
+    fcntl = None
+
+OK_TTL = 300
+FAIL_TTL = 30
+FAILURE_THRESHOLD = 3
+OPEN_SECONDS = 60
+CHECK_TIMEOUT = 5
+
+# 检查结果
+OK = 'ok'
+MISSING = 'missing'
+ERROR = 'error'
+
+
+def check_cdn_object(cdn_url, timeout=CHECK_TIMEOUT):
+    """用 HEAD 请求检查CDN上的文件，返回 OK / MISSING（4xx）/ ERROR（连接失败、超时、5xx）"""
+    try:
+        req = urllib.request.Request(cdn_url, method='HEAD')
+        req.add_header('User-Agent', 'Mozilla/5.0')
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return OK if response.status == 200 else MISSING
+    except urllib.error.HTTPError as e:
+        return MISSING if e.code < 500 else ERROR
+    except Exception:
+        return ERROR
+
+
+class CdnHealth:
+    """CDN可用性缓存，可在多个线程中共用"""
+
+    def __init__(self, background=True, state_file=None, check=check_cdn_object, log=None,
+                 ok_ttl=OK_TTL, fail_ttl=FAIL_TTL, failure_threshold=FAILURE_THRESHOLD,
+                 open_seconds=OPEN_SECONDS):
+        self.background = background
+        self.state_file = state_file
+        self.ok_ttl = ok_ttl
+        self.fail_ttl = fail_ttl
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._check = check
+        self._log = log or (lambda message: None)
+        # 安装包 -> {'result': OK/MISSING/ERROR, 'checked': 检查时间}
+        self._objects = {}
+        # 连续出错次数、熔断开始时间（未熔断时为 None）
+        self._failures = 0
+        self._opened = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._state_signature = None
+
+    def circuit(self, now=None):
+        """熔断状态：'closed'（正常）/ 'open'（熔断中）/ 'half-open'（熔断到期，等待探测）"""
+        if self._opened is None:
+            return 'closed'
+        if (now or time.time()) - self._opened < self.open_seconds:
+            return 'open'
+        return 'half-open'
+
+    def is_available(self, cdn_url, sha256='', wait=False):
+        """
+        CDN上的安装包是否可用：True / False，还没有检查结果时返回 None
+        background=True 时只查缓存，需要检查时交给后台线程，本次请求按旧结果（或 None）处理
+        background=False 时由拿到锁的请求同步检查并返回检查结果，其他请求按旧结果（或 None）处理
+        wait: 还没有检查结果时同步检查一次（不能回退到源站时使用）
+        """
+        self._load_state()
+        now = time.time()
+        state = self.circuit(now)
+        if state == 'open':
+            return False
+        key = f'{cdn_url}#{sha256}'
+        entry = self._objects.get(key)
+        if state == 'half-open':
+            # 熔断到期：只放一个检查请求探测，探测结束前仍回退到源站；同步探测时返回探测结果
+            self._schedule(key, cdn_url, probe=True)
+            if self.background or self.circuit() != 'closed':
+                return False
+            entry = self._objects.get(key)
+            return entry is not None and entry['result'] == OK
+        if entry is None and wait:
+            self._run_check(key, cdn_url)
+            entry = self._objects.get(key)
+        elif self._expired(entry, now):
+            self._schedule(key, cdn_url)
+            entry = self._objects.get(key, entry)
+        if entry is None:
+            return None
+        return entry['result'] == OK
+
+    def _expired(self, entry, now):
+        return entry is None or now - entry['checked'] >= (self.ok_ttl if entry['result'] == OK else self.fail_ttl)
+
+    def _schedule(self, key, cdn_url, probe=False):
+        with self._lock:
+            # 同一个安装包只有一个检查在进行；半开状态下整个CDN只放一个探测
+            if key in self._pending or (self._pending and self.circuit() == 'half-open'):
+                return
+            self._pending.add(key)
+        if self.background:
+            threading.Thread(target=self._run_check, args=(key, cdn_url, True), daemon=True).start()
+        else:
+            self._check_once(key, cdn_url, probe)
+
+    def _lock_path(self, name):
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:16]
+        return f'{self.state_file}.{digest}.lock'
+
+    def _check_once(self, key, cdn_url, probe):
+        """
+        同步检查（CGI）：先对锁文件加非阻塞锁，别的进程正在检查时直接返回；
+        拿到锁后重新读取 state_file，别的进程刚检查完时不再重复检查
+        """
+        if not self.state_file or not fcntl:
+            self._run_check(key, cdn_url, True)
+            return
+        try:
+            lock = open(self._lock_path('half-open' if probe else key), 'a')
+        except OSError:
+            self._run_check(key, cdn_url, True)
+            return
+        with lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                with self._lock:
+                    self._pending.discard(key)
+                return
+            self._load_state()
+            now = time.time()
+            needed = self.circuit(now) == 'half-open' if probe else (
+                self.circuit(now) == 'closed' and self._expired(self._objects.get(key), now))
+            if needed:
+                self._run_check(key, cdn_url, True)
+            else:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def _run_check(self, key, cdn_url, scheduled=False):
+        try:
+            result = self._check(cdn_url)
+            self._record(key, result)
+        finally:
+            if scheduled:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def _record(self, key, result):
+        now = time.time()
+        with self._lock:
+            self._objects[key] = {'result': result, 'checked': now}
+            if result == ERROR:
+                self._failures += 1
+                if self._opened is not None or self._failures >= self.failure_threshold:
+                    if self.circuit(now) != 'open':
+                        self._log(f"CDN连续 {self._failures} 次检查失败，熔断 {self.open_seconds} 秒，下载回退到源站")
+                    self._opened = now
+            else:
+                # CDN有响应（包括文件不存在），说明CDN本身正常
+                if self._opened is not None:
+                    self._log("CDN恢复，关闭熔断")
+                self._failures = 0
+                self._opened = None
+            self._save_state()
+
+    def _load_state(self):
+        """state_file 被其他进程更新后重新读取"""
+        if not self.state_file:
+            return
+        try:
+            st = os.stat(self.state_file)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return
+        if signature == self._state_signature:
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._objects = state.get('objects', {})
+            self._failures = state.get('failures', 0)
+            self._opened = state.get('opened')
+            self._state_signature = signature
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        now = time.time()
+        # 只保存还有用的结果（上传新版本后旧安装包的结果不再需要）
+        objects = {key: entry for key, entry in self._objects.items()
+                   if now - entry['checked'] < max(self.ok_ttl, self.fail_ttl) * 2}
+        tmp_path = f'{self.state_file}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'objects': objects, 'failures': self._failures, 'opened': self._opened}, f)
+            os.replace(tmp_path, self.state_file)
+            st = os.stat(self.state_file)
+            self._state_signature = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            self._log(f"CDN状态保存失败: {e}")
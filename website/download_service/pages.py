@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+下载服务返回的HTML页面（与原 download.py 的输出一致）
+"""
+
+MAC_COMING_SOON = """
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <title>正在开发中</title>
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    text-align: center;
+                    padding: 50px;
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    color: white;
+                }
+                .container {
+                    background: rgba(255, 255, 255, 0.1);
+                    padding: 40px;
+                    border-radius: 15px;
+                    backdrop-filter: blur(10px);
+                    max-width: 500px;
+                    margin: 0 auto;
+                }
+                h1 { margin-bottom: 20px; }
+                p { font-size: 18px; line-height: 1.6; }
+                a { color: white; text-decoration: none; }
+                a:hover { text-decoration: underline; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>🚧 Mac 版本正在开发中</h1>
+                <p>感谢您的关注！Mac 版本正在紧锣密鼓地开发中，预计很快将与您见面。</p>
+                <p>您可以先尝试使用便携版或联系我们的团队了解更多信息。</p>
+                <p style="margin-top: 30px;">
+                    <a href="/">&larr; 返回首页</a>
+                </p>
+            </div>
+        </body>
+        </html>
+        """
+
+CRAWLER_FORBIDDEN = """<html>
+<head>
+    <meta charset="UTF-8">
+    <title>访问受限</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            text-align: center;
+            padding: 50px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+        }
+        .container {
+            background: rgba(255, 255, 255, 0.1);
+            padding: 40px;
+            border-radius: 15px;
+            backdrop-filter: blur(10px);
+            max-width: 500px;
+            margin: 0 auto;
+        }
+        h1 { margin-bottom: 20px; }
+        p { font-size: 18px; line-height: 1.6; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🤖 访问受限</h1>
+        <p>抱歉，此下载链接仅对真实用户开放。</p>
+        <p>如果您是真实用户，请使用浏览器访问我们的网站进行下载。</p>
+    </div>
+</body>
+</html>"""
+
+INVALID_TYPE = "<h1>400 - 无效的下载类型</h1>"
+CDN_UNAVAILABLE = "<h1>503 - CDN服务暂时不可用</h1>"
+
+
+def not_found(file_type):
+    return f"<h1>404 - 未找到 {file_type} 版本文件</h1>"
+
+
+def server_error(message):
+    return f"<h1>500 - 服务器错误</h1><p>{message}</p>"
+
+
+def redirect(url):
+    return f"""<html>
+<head>
+    <meta http-equiv="refresh" content="0;url={url}">
+    <title>正在跳转...</title>
+</head>
+<body>
+    <p>正在跳转到下载地址...</p>
+    <p>如果未自动跳转，请<a href="{url}">点击这里</a></p>
+</body>
+</html>"""
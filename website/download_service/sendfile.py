@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+回退到源站时的零拷贝发送
+原来源站下载由Python以 8 KB 为单位 read()/write() 复制安装包，几百MB的文件要循环几万次，
+每个下载都占着一个线程（CGI 下是一个解释器进程）并消耗CPU。现在有两种方式把复制交给内核或 lighttpd：
+  - X-Sendfile：应用只返回 X-Sendfile 响应头，由 lighttpd 直接发送文件，Python 立即结束这个请求
+    （DownloadApp(x_sendfile=True)，需要在 lighttpd 中启用 x-sendfile，见 Operation/xintuxiangce-download.conf）
+  - os.sendfile：wsgiref 的处理器在遇到 wsgi.file_wrapper 时调用 sendfile()，
+    这里实现为以 SENDFILE_WINDOW 为单位调用 os.sendfile()，数据不经过Python；
+    download-server.py（HTTP）和 download.py / download-cdn.py（CGI）都使用
+没有 os.sendfile 的系统（Windows）或输出不是文件描述符时，仍由 wsgiref 按块复制。
+"""
+
+import io
+import os
+import select
+from wsgiref.handlers import CGIHandler
+from wsgiref.simple_server import ServerHandler, WSGIRequestHandler
+
+SENDFILE_WINDOW = 8 * 1024 * 1024
+
+
+def sendfile_all(out_fd, in_fd, offset, count):
+    """用 os.sendfile() 发送 in_fd 从 offset 开始的 count 字节，返回实际发送的字节数"""
+    sent_total = 0
+    while sent_total < count:
+        try:
+            sent = os.sendfile(out_fd, in_fd, offset + sent_total, min(SENDFILE_WINDOW, count - sent_total))
+        except BlockingIOError:
+            # 设置了超时的套接字是非阻塞的：等待可写后继续
+            select.select([], [out_fd], [])
+            continue
+        if sent == 0:
+            break
+        sent_total += sent
+    return sent_total
+
+
+class SendfileMixin:
+    """wsgiref 处理器的 sendfile()：用 os.sendfile() 发送 wsgi.file_wrapper 包装的文件"""
+
+    def sendfile(self):
+        if not hasattr(os, 'sendfile'):
+            return False
+        filelike = getattr(self.result, 'filelike', None)
+        try:
+            in_fd = filelike.fileno()
+            out_fd = self.stdout.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False
+        offset = os.lseek(in_fd, 0, os.SEEK_CUR)
+        count = os.fstat(in_fd).st_size - offset
+        if not self.headers_sent:
+            self.send_headers()
+        # 响应头可能还在缓冲区中，先写出再直接写文件描述符
+        self._flush()
+        self.bytes_sent += sendfile_all(out_fd, in_fd, offset, count)
+        return True
+
+
+class SendfileServerHandler(SendfileMixin, ServerHandler):
+    pass
+
+
+class SendfileRequestHandler(WSGIRequestHandler):
+    """与 wsgiref 的 WSGIRequestHandler 相同，只是用 handler_class 处理请求（默认支持 os.sendfile）"""
+
+    handler_class = SendfileServerHandler
+
+    def handle(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+
+        if not self.parse_request():
+            return
+
+        handler = self.handler_class(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=True,
+        )
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+
+class SendfileCGIHandler(SendfileMixin, CGIHandler):
+    """CGI 下直接把安装包 sendfile 到 lighttpd 的管道"""
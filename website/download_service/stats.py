@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+下载量统计：本地事件记录 + 后台批量上报
+原来在下载请求中同步调用统计接口（超时2秒），文件开始发送前要等接口返回，网络出错时这次下载就不计数了。
+现在下载请求只在本地记录文件末尾追加一行（一次 O_APPEND 写入，多个线程、多个CGI进程同时追加也不需要加锁），
+由单独的上报程序汇总后调用统计接口：
+  1. 把记录文件 events.log 改名为 batch-<时间>-<进程号>.log（之后的下载写入新的 events.log）
+  2. 按下载类型汇总所有 batch 文件，合并进 pending.json（待上报的数量）后删除 batch 文件；
+     pending.json 中记录已经合并的 batch 文件名，中途退出重新运行时不会重复计数
+  3. 逐个上报待上报的数量，每成功一次就更新 pending.json；失败时保留，下次按退避时间重试
+上报程序：download-server.py 启动时在后台线程中运行（Flusher）；只用CGI时用 cron 定时运行 download-stats-flush.py。
+记录目录不可写（没有创建或权限不对）时，下载记录写到临时目录中的备用目录（FALLBACK_SPOOL_DIR），不丢弃；
+上报程序同时汇总两个目录，各自有自己的 pending.json 和进程锁。
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，不加进程锁
+    fcntl = None
+
+STATS_API_URL = 'https://api.aifuture.net.cn/api/v1/stats/download-count/increment/public'
+# 下载服务（常驻进程和CGI）共用的记录目录，运行下载服务的用户需要有写权限
+SPOOL_DIR = '/var/www/xintuxiangce/download-stats'
+# SPOOL_DIR 不可写时的备用目录
+FALLBACK_SPOOL_DIR = os.path.join(tempfile.gettempdir(), 'xintuxiangce-download-stats')
+EVENTS_FILE = 'events.log'
+PENDING_FILE = 'pending.json'
+LOCK_FILE = 'flush.lock'
+
+SEND_TIMEOUT = 10
+FLUSH_INTERVAL = 10
+MAX_BACKOFF = 600
+# 改名后等待已经打开旧文件的写入完成
+ROTATE_GRACE = 0.5
+
+
+def log(message):
+    print(f"# {message}", file=sys.stderr)
+
+
+def spool_dirs(spool_dir=SPOOL_DIR, fallback_dir=FALLBACK_SPOOL_DIR):
+    """上报程序要汇总的记录目录：记录目录和备用目录"""
+    dirs = [spool_dir]
+    if fallback_dir and os.path.abspath(fallback_dir) != os.path.abspath(spool_dir):
+        dirs.append(fallback_dir)
+    return dirs
+
+
+def increment_download_count(download_type):
+    """调用下载量统计接口，成功返回 True"""
+    try:
+        req = urllib.request.Request(f"{STATS_API_URL}?download_type={download_type}", method='POST')
+        req.add_header('Content-Type', 'application/json')
+        req.add_header('User-Agent', 'XintuXiangce-Download/1.0')
+        with urllib.request.urlopen(req, timeout=SEND_TIMEOUT) as response:
+            if response.status == 200:
+                data = json.loads(response.read().decode('utf-8'))
+                if data.get('success'):
+                    return True
+            log(f"下载量统计失败: HTTP {response.status}")
+    except urllib.error.URLError as e:
+        log(f"下载量统计网络错误: {e}")
+    except Exception as e:
+        log(f"下载量统计异常: {e}")
+    return False
+
+
+class DownloadCounter:
+    """下载请求中使用：只追加一行本地记录，不访问网络；记录目录不可写时写到备用目录"""
+
+    def __init__(self, spool_dir=SPOOL_DIR, log=log, fallback_dir=FALLBACK_SPOOL_DIR):
+        self.spool_dir = spool_dir
+        self.path = os.path.join(spool_dir, EVENTS_FILE)
+        self._dirs = spool_dirs(spool_dir, fallback_dir)
+        self._log = log
+        self._ready = set()
+        self._warned = False
+
+    def _append(self, spool_dir, line):
+        if spool_dir not in self._ready:
+            os.makedirs(spool_dir, exist_ok=True)
+            self._ready.add(spool_dir)
+        fd = os.open(os.path.join(spool_dir, EVENTS_FILE), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o664)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def record(self, download_type):
+        line = f"{int(time.time())}\t{download_type}\n".encode('utf-8')
+        errors = []
+        for spool_dir in self._dirs:
+            try:
+                self._append(spool_dir, line)
+            except OSError as e:
+                errors.append(e)
+                continue
+            if errors and not self._warned:
+                self._warned = True
+                self._log(f"下载量记录目录不可写（{errors[0]}），改为写入备用目录 {spool_dir}")
+            return True
+        self._log(f"下载量记录失败（不影响下载）: {'; '.join(str(e) for e in errors)}")
+        return False
+
+
+def _load_pending(spool_dir):
+    try:
+        with open(os.path.join(spool_dir, PENDING_FILE), 'r', encoding='utf-8') as f:
+            pending = json.load(f)
+    except (OSError, ValueError):
+        pending = {}
+    return {'counts': pending.get('counts', {}), 'merged': pending.get('merged', [])}
+
+
+def _save_pending(spool_dir, pending):
+    path = os.path.join(spool_dir, PENDING_FILE)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(pending, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _count_batch(path):
+    counts = {}
+    with open(path, 'rb') as f:
+        for raw in f:
+            # 不完整的行（写入时进程被杀）忽略
+            if not raw.endswith(b'\n'):
+                continue
+            parts = raw.decode('utf-8', 'replace').rstrip('\n').split('\t')
+            if len(parts) == 2 and parts[1]:
+                counts[parts[1]] = counts.get(parts[1], 0) + 1
+    return counts
+
+
+def collect(spool_dir=SPOOL_DIR):
+    """把新的下载记录汇总进 pending.json，返回待上报的数量 {下载类型: 次数}"""
+    events = os.path.join(spool_dir, EVENTS_FILE)
+    if os.path.exists(events):
+        batch = os.path.join(spool_dir, f"batch-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}.log")
+        os.replace(events, batch)
+        time.sleep(ROTATE_GRACE)
+
+    pending = _load_pending(spool_dir)
+    batches = sorted(name for name in os.listdir(spool_dir) if name.startswith('batch-') and name.endswith('.log'))
+    new_batches = [name for name in batches if name not in pending['merged']]
+    for name in new_batches:
+        for download_type, count in _count_batch(os.path.join(spool_dir, name)).items():
+            pending['counts'][download_type] = pending['counts'].get(download_type, 0) + count
+    if new_batches:
+        # 先保存汇总结果（连同已合并的文件名）再删除 batch 文件
+        pending['merged'] = batches
+        _save_pending(spool_dir, pending)
+    for name in batches:
+        os.remove(os.path.join(spool_dir, name))
+    if batches:
+        pending['merged'] = []
+        _save_pending(spool_dir, pending)
+    return pending['counts']
+
+
+def status(spool_dir=SPOOL_DIR, fallback_dir=FALLBACK_SPOOL_DIR):
+    """待上报的数量，包括备用目录中的（只读取，不改名、不修改 pending.json）"""
+    counts = {}
+    for path in spool_dirs(spool_dir, fallback_dir):
+        if not os.path.isdir(path):
+            continue
+        for download_type, count in _status_dir(path).items():
+            counts[download_type] = counts.get(download_type, 0) + count
+    return counts
+
+
+def _status_dir(spool_dir):
+    pending = _load_pending(spool_dir)
+    counts = dict(pending['counts'])
+    names = [name for name in os.listdir(spool_dir)
+             if name == EVENTS_FILE or (name.startswith('batch-') and name.endswith('.log') and name not in pending['merged'])]
+    for name in names:
+        try:
+            batch_counts = _count_batch(os.path.join(spool_dir, name))
+        except OSError:  # 正在被上报程序改名或删除
+            continue
+        for download_type, count in batch_counts.items():
+            counts[download_type] = counts.get(download_type, 0) + count
+    return counts
+
+
+def flush(spool_dir=SPOOL_DIR, send=increment_download_count, log=log, fallback_dir=FALLBACK_SPOOL_DIR):
+    """
+    汇总并上报一次（记录目录和备用目录），返回 (上报成功的次数, 是否全部上报完)
+    同一时间只有一个进程在上报（进程锁），另一个进程正在上报时直接返回
+    """
+    total = 0
+    failed = False
+    for path in spool_dirs(spool_dir, fallback_dir):
+        if path != spool_dir and not os.path.isdir(path):
+            continue
+        try:
+            sent, complete = _flush_dir(path, send, log)
+        except OSError as e:
+            # 记录目录不可用时仍然上报备用目录中的记录
+            failed = True
+            log(f"下载量统计汇总失败（{path}）: {e}")
+            continue
+        total += sent
+        if not complete:
+            return total, False
+    return total, not failed
+
+
+def _flush_dir(spool_dir, send, log):
+    os.makedirs(spool_dir, exist_ok=True)
+    with open(os.path.join(spool_dir, LOCK_FILE), 'a') as lock:
+        if fcntl:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0, True
+        collect(spool_dir)
+        pending = _load_pending(spool_dir)
+        sent = {}
+        complete = True
+        for download_type in sorted(pending['counts']):
+            while pending['counts'][download_type] > 0:
+                if not send(download_type):
+                    complete = False
+                    break
+                pending['counts'][download_type] -= 1
+                sent[download_type] = sent.get(download_type, 0) + 1
+                _save_pending(spool_dir, pending)
+            if not complete:
+                break
+        pending['counts'] = {key: value for key, value in pending['counts'].items() if value > 0}
+        _save_pending(spool_dir, pending)
+    if sent:
+        log("下载量统计已上报: " + '，'.join(f"{key} {value}" for key, value in sorted(sent.items())))
+    if not complete:
+        log("下载量统计上报失败，稍后重试: " + '，'.join(f"{key} {value}" for key, value in sorted(pending['counts'].items())))
+    return sum(sent.values()), complete
+
+
+class Flusher(threading.Thread):
+    """常驻进程中的后台上报线程：每 FLUSH_INTERVAL 秒上报一次，失败后按指数退避重试"""
+
+    def __init__(self, spool_dir=SPOOL_DIR, interval=FLUSH_INTERVAL, send=increment_download_count, log=log,
+                 fallback_dir=FALLBACK_SPOOL_DIR):
+        super().__init__(name='download-stats-flusher', daemon=True)
+        self.spool_dir = spool_dir
+        self.fallback_dir = fallback_dir
+        self.interval = interval
+        self._send = send
+        self._log = log
+        self._stop_event = threading.Event()
+
+    def run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            try:
+                _, complete = flush(self.spool_dir, self._send, self._log, self.fallback_dir)
+            except OSError as e:
+                self._log(f"下载量统计汇总失败: {e}")
+                complete = False
+            delay = self.interval if complete else min(delay * 2, MAX_BACKOFF)
+
+    def stop(self):
+        """停止前再上报一次"""
+        self._stop_event.set()
+        try:
+            flush(self.spool_dir, self._send, self._log, self.fallback_dir)
+        except OSError as e:
+            self._log(f"下载量统计汇总失败: {e}")
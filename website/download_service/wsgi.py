@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+WSGI入口（gunicorn、uWSGI 等WSGI服务器使用）
+    gunicorn -b 127.0.0.1:8081 -w 2 download_service.wsgi:application
+"""
+
+import os
+
+from download_service import stats
+from download_service.app import X_SENDFILE_ENV, make_application
+
+application = make_application(x_sendfile=os.environ.get(X_SENDFILE_ENV) == '1')
+
+# 下载量后台上报（多个 worker 各启动一个，同一时间只有一个在上报）
+stats.Flusher().start()
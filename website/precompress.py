@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态文件预压缩脚本
+为所有HTML、CSS、JS、JSON、XML等文本文件生成最高压缩级别的 .gz 和 .br 副本（未变化的文件跳过）。
+build-site.py / update-guides.py / update-diary.py 生成页面后会自动执行这一步，
+手动修改了 styles.css、script.js 等文件后应重新运行 build-site.py（同时更新带哈希的资源副本和HTML中的引用），
+只需要重新压缩时可单独运行。
+
+使用方法：
+   python precompress.py
+   python precompress.py --jobs 4
+"""
+
+from sitebuild.compress import main
+from sitebuild.engine import BUILD_DIR
+
+if __name__ == '__main__':
+    main(BUILD_DIR)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成安装包发布目录 dist/releases.json
+每种下载类型（portable/setup/android/mac）的最新安装包：文件名、大小、SHA-256、CDN路径。
+下载服务（download.py / download-cdn.py / download-server.py）和 Operation/qiniu-upload.py 都读取这个文件。
+
+使用方法：
+   python3 release-catalog.py                       把新安装包放进 dist 后运行
+   python3 release-catalog.py /var/www/xintuxiangce/dist --by-mtime
+                                                    download-cdn.py 使用的目录（按修改时间选择最新文件）
+   python3 release-catalog.py --check               只检查发布目录是否需要更新
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from download_service import catalog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成安装包发布目录 dist/releases.json')
+    parser.add_argument('dist', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dist'),
+                        help='安装包目录（默认 website/dist）')
+    parser.add_argument('--by-mtime', action='store_true',
+                        help='按修改时间选择最新文件（默认优先按文件名中的日期）')
+    parser.add_argument('--check', action='store_true', help='只检查，不写入')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dist):
+        print(f"错误: 目录不存在: {args.dist}")
+        sys.exit(1)
+    by_date = not args.by_mtime
+
+    if args.check:
+        if catalog.is_stale(args.dist, catalog.load_catalog(args.dist), by_date):
+            print(f"⚠ 发布目录需要更新: {os.path.join(args.dist, catalog.CATALOG_FILE)}")
+            sys.exit(1)
+        print("✓ 发布目录是最新的")
+        return
+
+    result = catalog.publish(args.dist, by_date)
+    print(f"✓ 已生成: {os.path.join(args.dist, catalog.CATALOG_FILE)}")
+    for file_type in catalog.FILE_DIRS:
+        release = result['releases'].get(file_type)
+        if release:
+            print(f"   {file_type:<9}{release['path']} ({release['size'] / 1024 / 1024:.2f} MB)  "
+                  f"sha256 {release['sha256'][:12]}")
+        else:
+            print(f"   {file_type:<9}（没有安装包）")
+
+
+if __name__ == '__main__':
+    main()
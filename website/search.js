@@ -0,0 +1,145 @@
+/**
+ * 站内全文搜索
+ * 索引由构建脚本生成（见 sitebuild/search.py）：search/meta.json 是文章列表和分片文件名，
+ * 每个分片保存一部分词的倒排表。查询时只下载查询词所在的分片，已下载的分片在页面内缓存。
+ *
+ * 使用方法：
+ *   XintuSearch.search('照片分类', { collection: 'guides' }).then(results => ...)
+ *   results: [{ collection, id, title, url, score }]，按相关度降序
+ */
+
+(function() {
+    'use strict';
+
+    const INDEX_DIR = '/search/';
+
+    // 与 sitebuild/related.py 的分词规则一致：中文相邻两字（单字成段时保留单字）、英文/数字单词
+    const CJK_RUN = /[一-鿿]+/g;
+    const WORD = /[a-z0-9][a-z0-9.+#-]*[a-z0-9+#]|[a-z0-9]/g;
+
+    let metaPromise = null;
+    const shardPromises = new Map();
+
+    function loadMeta() {
+        if (!metaPromise) {
+            metaPromise = fetch(INDEX_DIR + 'meta.json')
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP error! status: ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .catch(error => {
+                    // 失败后允许下次重试
+                    metaPromise = null;
+                    throw error;
+                });
+        }
+        return metaPromise;
+    }
+
+    function loadShard(meta, index) {
+        const name = meta.shards[index];
+        if (!shardPromises.has(name)) {
+            const promise = fetch(INDEX_DIR + name)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP error! status: ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .catch(error => {
+                    shardPromises.delete(name);
+                    throw error;
+                });
+            shardPromises.set(name, promise);
+        }
+        return shardPromises.get(name);
+    }
+
+    // FNV-1a（32位），与 sitebuild/search.py 的 term_hash 一致
+    function termHash(term) {
+        let h = 0x811c9dc5;
+        for (let i = 0; i < term.length; i++) {
+            h ^= term.charCodeAt(i);
+            h = Math.imul(h, 0x01000193) >>> 0;
+        }
+        return h;
+    }
+
+    function tokenize(text, stopTerms) {
+        const terms = [];
+        for (const run of text.match(CJK_RUN) || []) {
+            if (run.length === 1) {
+                terms.push(run);
+                continue;
+            }
+            for (let i = 0; i < run.length - 1; i++) {
+                terms.push(run.slice(i, i + 2));
+            }
+        }
+        for (const word of text.toLowerCase().match(WORD) || []) {
+            terms.push(word);
+        }
+        return [...new Set(terms)].filter(term => !stopTerms.has(term));
+    }
+
+    async function search(query, options = {}) {
+        const meta = await loadMeta();
+        const terms = tokenize(query || '', new Set(meta.stop));
+        if (terms.length === 0) {
+            return [];
+        }
+
+        const shardCount = meta.shards.length;
+        const shardIndexes = [...new Set(terms.map(term => termHash(term) % shardCount))];
+        const loaded = await Promise.all(shardIndexes.map(index => loadShard(meta, index)));
+        const shards = new Map(shardIndexes.map((index, i) => [index, loaded[i]]));
+
+        // 累加每篇文章的得分：(1 + log 词频) * IDF，同时记录命中的查询词数
+        const docCount = meta.docs.length;
+        const scores = new Map();
+        const hits = new Map();
+        for (const term of terms) {
+            const postings = shards.get(termHash(term) % shardCount)[term];
+            if (!postings) {
+                continue;
+            }
+            const idf = Math.log(1 + docCount / (postings.length / 2));
+            let doc = 0;
+            for (let i = 0; i < postings.length; i += 2) {
+                doc += postings[i];
+                scores.set(doc, (scores.get(doc) || 0) + (1 + Math.log(postings[i + 1])) * idf);
+                hits.set(doc, (hits.get(doc) || 0) + 1);
+            }
+        }
+
+        // 有文章包含全部查询词时只返回这些文章，否则返回至少命中一半查询词的文章
+        let minHits = Math.ceil(terms.length / 2);
+        for (const count of hits.values()) {
+            if (count === terms.length) {
+                minHits = terms.length;
+                break;
+            }
+        }
+
+        const results = [];
+        for (const [doc, score] of scores) {
+            const [collection, id, title, url] = meta.docs[doc];
+            if (hits.get(doc) < minHits || (options.collection && options.collection !== collection)) {
+                continue;
+            }
+            results.push({ collection, id, title, url, score, hits: hits.get(doc) });
+        }
+        results.sort((a, b) => b.hits - a.hits || b.score - a.score);
+        return results;
+    }
+
+    window.XintuSearch = {
+        search: search,
+        // 输入框获得焦点时预先加载文章列表，第一次查询只需要再下载分片
+        prefetch: function() {
+            loadMeta().catch(error => console.error('加载搜索索引失败:', error));
+        }
+    };
+})();
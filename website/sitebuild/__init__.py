@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+网站构建公共模块
+供 update-guides.py / update-diary.py 共用
+"""
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""
+构建性能基准
+按固定随机种子生成合成的指南/日记语料（Markdown 含中文段落、多级标题、列表、表格、图片、代码块、
+粗体和链接，日记中约 15% 是视频），在临时目录中测量：
+  - 各阶段：markdown_to_html、generate_article_page、minify_html、update_sitemap、搜索索引、列表数据
+    （在当前进程中重复 --repeat 次，记录最小值和中位数）
+  - 完整构建（子进程运行 build-site.py）：首次构建、全量重建、无变化的增量构建、修改一篇文章后的增量构建
+结果写入 .build/benchmarks/<时间>-<提交>.json，用 --compare 与之前的结果对比（可以比较不同提交）。
+
+同一规模每次生成的语料完全相同；构建在临时目录中进行，不影响网站文件。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+RESULT_VERSION = 1
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_REPEAT = 3
+RESULTS_DIR = os.path.join('.build', 'benchmarks')
+SEED = 20250101
+
+# 合成正文引用的图片（所有文章共用，图片变体只需生成一次）
+IMAGE_DIR = os.path.join('assets', 'bench')
+IMAGE_COUNT = 6
+IMAGE_SIZE = (1280, 720)
+
+# 完整构建需要的网站文件（模板、列表页、公共组件、带指纹的静态资源）
+SITE_FILES = ('guides.html', 'diary.html', 'styles.css', 'script.js', 'components-loader.js', 'search.js',
+              'components/navbar.html', 'components/footer.html')
+
+WEBSITE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WORDS = ('照片', '相册', '分类', '整理', '大模型', '人脸识别', '截图', '二维码', '证件照', '旅行', '家人', '回忆',
+          '本地处理', '隐私', '智能', '时间线', '地点', '城市', '标签', '重复照片', '相似照片', '备份', '存储空间',
+          '手机', '电脑', '导入', '扫描', '缓存', '索引', '性能', '架构', '模块', '接口', '数据库', '并发', '异步',
+          '用户', '体验', '版本', '发布', '功能', '设置', '文件夹', '格式', '清理', '效率', '工具', '方案')
+_CONNECTORS = ('，', '，', '、', '的', '和', '以及', '通过', '可以', '需要', '实现', '支持', '帮助')
+_ENGLISH = ('OCR', 'AI', 'LLM', 'WebP', 'JPEG', 'HEIC', 'Python', 'SQLite', 'DBSCAN', 'GPU', 'API', 'v2.0')
+_CATEGORIES = ('研发经验', '产品运营')
+_CODE = '''def classify(photos, model):
+    """按内容分类照片"""
+    results = {}
+    for photo in photos:
+        label = model.predict(photo.thumbnail())
+        results.setdefault(label, []).append(photo.path)
+    return results
+'''
+
+_EMPTY_SITEMAP = ('<?xml version="1.0" encoding="utf-8"?>\n'
+                  '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n</urlset>\n')
+
+
+# ---------------------------------------------------------------- 语料生成
+
+def _sentence(rng):
+    parts = []
+    for _ in range(rng.randint(6, 14)):
+        parts.append(rng.choice(_WORDS))
+        if rng.random() < 0.15:
+            parts.append(f' {rng.choice(_ENGLISH)} ')
+        parts.append(rng.choice(_CONNECTORS))
+    return ''.join(parts[:-1]) + '。'
+
+
+def _paragraph(rng):
+    text = ''.join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+    if rng.random() < 0.3:
+        text += f'详见**{rng.choice(_WORDS)}**一节，或使用 `{rng.choice(_ENGLISH)}` 接口。'
+    if rng.random() < 0.2:
+        text += '更多内容请访问[芯图相册官网](https://www.xintuxiangce.top/)。'
+    return text
+
+
+def _table(rng):
+    columns = rng.randint(3, 5)
+    rows = [[rng.choice(_WORDS) for _ in range(columns)] for _ in range(rng.randint(3, 8))]
+    lines = ['| ' + ' | '.join(f'{rng.choice(_WORDS)}{i + 1}' for i in range(columns)) + ' |',
+             '|' + '------|' * columns]
+    lines.extend('| ' + ' | '.join(row) + ' |' for row in rows)
+    return '\n'.join(lines)
+
+
+def synthetic_markdown(rng, title, size):
+    """一篇合成文章（size: 小节数）"""
+    blocks = [f'# {title}', _paragraph(rng)]
+    for section in range(size):
+        blocks.append(f'## {section + 1}. {rng.choice(_WORDS)}{rng.choice(_WORDS)}')
+        for _ in range(rng.randint(1, 3)):
+            blocks.append(_paragraph(rng))
+        roll = rng.random()
+        if roll < 0.3:
+            blocks.append('\n'.join(f'- **{rng.choice(_WORDS)}**：{_sentence(rng)}' for _ in range(rng.randint(3, 6))))
+        elif roll < 0.5:
+            blocks.append(_table(rng))
+        elif roll < 0.7:
+            image = f'/{IMAGE_DIR}/image-{rng.randrange(IMAGE_COUNT)}.png'.replace(os.sep, '/')
+            blocks.append(f'![{rng.choice(_WORDS)}示意图]({image})')
+        elif roll < 0.8:
+            blocks.append(f'```python\n{_CODE}```')
+        if rng.random() < 0.3:
+            blocks.append(f'### {rng.choice(_WORDS)}')
+            blocks.append(_paragraph(rng))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def _png(width, height, seed):
+    """简单的彩色条纹PNG（只用标准库生成，每行是同一行像素错位）"""
+    pattern = bytes((x * 7 + seed * 40) % 256 for x in range(width * 3)) * 2
+    rows = []
+    for y in range(height):
+        offset = (y * 3 * (seed + 1)) % (width * 3)
+        rows.append(b'\x00' + pattern[offset:offset + width * 3])
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(b''.join(rows), 6)) + chunk(b'IEND', b''))
+
+
+def generate_corpus(root, count, seed=SEED):
+    """在 root 中生成 count 篇文章（指南和日记各一半）、数据文件、图片和构建需要的网站文件，返回Markdown总字节数"""
+    rng = random.Random(f'{seed}-{count}')
+    for name in SITE_FILES:
+        target = os.path.join(root, name)
+        os.makedirs(os.path.dirname(target) or root, exist_ok=True)
+        shutil.copyfile(os.path.join(WEBSITE_DIR, name), target)
+    with open(os.path.join(root, 'sitemap.xml'), 'w', encoding='utf-8') as f:
+        f.write(_EMPTY_SITEMAP)
+
+    os.makedirs(os.path.join(root, IMAGE_DIR), exist_ok=True)
+    for index in range(IMAGE_COUNT):
+        with open(os.path.join(root, IMAGE_DIR, f'image-{index}.png'), 'wb') as f:
+            f.write(_png(*IMAGE_SIZE, index))
+
+    from sitebuild.collection import COLLECTIONS
+    markdown_bytes = 0
+    counts = {'guides': count // 2, 'diary': count - count // 2}
+    for name, total in counts.items():
+        collection = COLLECTIONS[name]
+        os.makedirs(os.path.join(root, collection.output_dir), exist_ok=True)
+        shutil.copyfile(os.path.join(WEBSITE_DIR, collection.template_path), os.path.join(root, collection.template_path))
+        ids = [f'bench-{name}-{index:05d}' for index in range(total)]
+        articles = []
+        for index, article_id in enumerate(ids):
+            title = f'{rng.choice(_WORDS)}{rng.choice(_WORDS)}指南 {index + 1}'
+            article = {
+                'id': article_id,
+                'title': title,
+                'description': _sentence(rng),
+                'date': f'20{rng.randint(23, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                'author': '芯图团队',
+                'category': rng.choice(_CATEGORIES),
+                'tags': rng.sample(_WORDS, 4),
+                'cover': f'/{IMAGE_DIR}/image-{rng.randrange(IMAGE_COUNT)}.png'.replace(os.sep, '/'),
+                'readTime': f'{rng.randint(3, 30)}分钟',
+                'type': 'article',
+            }
+            if name == 'diary':
+                article['related'] = rng.sample(ids, min(3, len(ids)))
+                if rng.random() < 0.15:
+                    article.update(type='video', videoPlatform='bilibili',
+                                   videoUrl=f'https://www.bilibili.com/video/BV1bench{index:05d}', duration='12:34')
+                    articles.append(article)
+                    continue
+            content_file = f'{collection.output_dir}/{article_id}.md'
+            text = synthetic_markdown(rng, title, rng.randint(3, 12))
+            with open(os.path.join(root, content_file), 'w', encoding='utf-8') as f:
+                f.write(text)
+            markdown_bytes += len(text.encode('utf-8'))
+            article['content'] = content_file
+            articles.append(article)
+        with open(os.path.join(root, collection.data_file), 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'total': len(articles)}, 'articles': articles}, f, ensure_ascii=False, indent=2)
+    return markdown_bytes
+
+
+# ---------------------------------------------------------------- 测量
+
+def _timed(func, repeat):
+    """重复执行，返回 {min, median, runs}（秒）"""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+
+def _run_build(root, *args):
+    """在 root 中运行一次完整构建，返回耗时（秒）"""
+    command = [sys.executable, os.path.join(WEBSITE_DIR, 'build-site.py'), *args]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        output = result.stdout.decode('utf-8', 'replace')
+        raise RuntimeError(f"构建失败（{' '.join(args) or '增量'}）:\n{output[-2000:]}")
+    return elapsed
+
+
+def measure_builds(root):
+    """完整构建的耗时：首次构建（含图片变体）、全量重建、无变化的增量构建、修改一篇文章后的增量构建"""
+    builds = {
+        'first_build': _run_build(root, '--full'),
+        'full_rebuild': _run_build(root, '--full'),
+        'noop_incremental': _run_build(root),
+    }
+    from sitebuild.collection import COLLECTIONS
+    data_file = os.path.join(root, COLLECTIONS['guides'].data_file)
+    with open(data_file, 'r', encoding='utf-8') as f:
+        article = json.load(f)['articles'][0]
+    with open(os.path.join(root, article['content']), 'a', encoding='utf-8') as f:
+        f.write('\n补充说明：本段由基准测试追加。\n')
+    builds['one_change_incremental'] = _run_build(root)
+    return builds
+
+
+def measure_stages(root, repeat):
+    """在当前进程中分别测量各阶段（需要先完成一次构建：图片记录已生成）"""
+    from sitebuild import collection as collection_module
+    from sitebuild.collection import BASE_URL, COLLECTIONS
+    from sitebuild.common import load_json
+    from sitebuild.images import ImageCatalog
+    from sitebuild.listdata import build_list_data
+    from sitebuild.minify import minify_html
+    from sitebuild.related import RelatedIndex
+    from sitebuild.search import build_search_index
+    from sitebuild.sitemap import update_sitemap
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        build_dir = '.build'
+        collections = list(COLLECTIONS.values())
+        articles = {c.name: load_json(c.data_file)['articles'] for c in collections}
+        templates = {c.name: c.load_template() for c in collections}
+        related = {c.name: RelatedIndex(articles[c.name]) for c in collections}
+        images = ImageCatalog(build_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            images.update([path for c in collections for path in c.content_files(articles[c.name])], jobs=1)
+
+        sources = []
+        for c in collections:
+            for article in articles[c.name]:
+                if article.get('content'):
+                    with open(article['content'], 'r', encoding='utf-8') as f:
+                        sources.append((c, f.read()))
+
+        def markdown():
+            for c, text in sources:
+                c.markdown_to_html(text, images)
+
+        pages = []
+
+        def generate():
+            # 清空Markdown片段缓存，测量的是完整的页面生成
+            collection_module._content_cache.clear()
+            pages.clear()
+            for c in collections:
+                for article in articles[c.name]:
+                    pages.append(c.generate_article_page(article, templates[c.name],
+                                                         related=related[c.name].related(article), images=images))
+
+        def minify():
+            for page in pages:
+                minify_html(page)
+
+        def sitemap():
+            with open('sitemap.xml', 'w', encoding='utf-8') as f:
+                f.write(_EMPTY_SITEMAP)
+            index_path = os.path.join(build_dir, 'bench-sitemap-index.json')
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            entries = [entry for c in collections for entry in c.sitemap_entries(articles[c.name], lambda path: None)]
+            update_sitemap('sitemap.xml', entries, index_path, BASE_URL)
+
+        def search_index():
+            cache_path = os.path.join(build_dir, 'search-cache.json')
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            build_search_index(build_dir, [(c, articles[c.name]) for c in collections])
+
+        def list_data():
+            shutil.rmtree('data', ignore_errors=True)
+            for c in collections:
+                build_list_data(build_dir, c, articles[c.name])
+
+        stages = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, func in (('markdown_to_html', markdown), ('generate_article_page', generate),
+                               ('minify_html', minify), ('update_sitemap', sitemap),
+                               ('search_index', search_index), ('list_data', list_data)):
+                stages[name] = _timed(func, repeat)
+        return stages
+    finally:
+        os.chdir(cwd)
+
+
+def _git(*args):
+    try:
+        result = subprocess.run(['git', *args], cwd=WEBSITE_DIR, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, check=True)
+        return result.stdout.decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes, repeat, keep=False):
+    """运行所有规模的基准，返回结果（可直接写入JSON）"""
+    try:
+        from PIL import Image  # noqa: F401
+        pillow = True
+    except ImportError:
+        pillow = False
+    result = {
+        'version': RESULT_VERSION,
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--', '.')),
+        'date': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pillow': pillow,
+        'repeat': repeat,
+        'sizes': {},
+    }
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix=f'xintu-bench-{size}-')
+        try:
+            print(f"\n规模 {size} 篇: 生成语料 {root}")
+            started = time.perf_counter()
+            markdown_bytes = generate_corpus(root, size)
+            print(f"   语料: Markdown {markdown_bytes / 1024:.0f} KB（{time.perf_counter() - started:.1f} 秒）")
+            print("   完整构建...")
+            builds = measure_builds(root)
+            for name, seconds in builds.items():
+                print(f"     {name:<24}{seconds:>9.3f} 秒")
+            print(f"   各阶段（重复 {repeat} 次）...")
+            stages = measure_stages(root, repeat)
+            for name, timing in stages.items():
+                print(f"     {name:<24}{timing['min']:>9.3f} 秒（中位数 {timing['median']:.3f}）")
+            result['sizes'][str(size)] = {'articles': size, 'markdown_bytes': markdown_bytes,
+                                          'builds': builds, 'stages': stages}
+        finally:
+            if keep:
+                print(f"   保留临时目录: {root}")
+            else:
+                shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+# ---------------------------------------------------------------- 对比
+
+def _flatten(result):
+    """结果 -> {(规模, 项目): 秒}（阶段取最小值）"""
+    values = {}
+    for size, entry in result.get('sizes', {}).items():
+        for name, seconds in entry.get('builds', {}).items():
+            values[(size, name)] = seconds
+        for name, timing in entry.get('stages', {}).items():
+            values[(size, name)] = timing['min']
+    return values
+
+
+def compare(base, current):
+    """打印两次结果的对比（变化超过 ±5% 的项目标出）"""
+    base_values = _flatten(base)
+    current_values = _flatten(current)
+    print(f"\n对比: {base.get('commit') or '?'}（{base.get('date', '')}） → "
+          f"{current.get('commit') or '?'}{'（有未提交的修改）' if current.get('dirty') else ''}")
+    common = sorted(set(base_values) & set(current_values), key=lambda k: (int(k[0]), k[1]))
+    if not common:
+        print("   没有可对比的项目（两次结果的规模不同）")
+    for key in common:
+        old, new = base_values[key], current_values[key]
+        change = (new - old) * 100 / old if old else 0
+        mark = '  ↑变慢' if change > 5 else '  ↓变快' if change < -5 else ''
+        print(f"   {key[0]:>6} 篇  {key[1]:<24}{old:>9.3f} → {new:>9.3f} 秒  {change:>+7.1f}%{mark}")
+
+
+def _load_result(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='网站构建性能基准（合成语料）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), metavar='N',
+                        help=f"语料规模（文章数，默认 {' '.join(map(str, DEFAULT_SIZES))}）")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'各阶段重复测量的次数（默认{DEFAULT_REPEAT}，记录最小值和中位数）')
+    parser.add_argument('--output', metavar='文件',
+                        help=f'结果文件（默认 {RESULTS_DIR}/<时间>-<提交>.json）')
+    parser.add_argument('--compare', nargs='+', metavar='结果文件',
+                        help='与之前的结果对比；给出两个文件时只对比这两个文件，不运行基准')
+    parser.add_argument('--keep', action='store_true', help='保留生成的临时目录（便于检查输出）')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare 最多指定两个结果文件')
+    if args.compare and len(args.compare) == 2:
+        compare(_load_result(args.compare[0]), _load_result(args.compare[1]))
+        return
+
+    print("=" * 50)
+    print("网站构建性能基准")
+    print("=" * 50)
+    result = run_benchmark(args.sizes, args.repeat, keep=args.keep)
+
+    output = args.output
+    if not output:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(WEBSITE_DIR, RESULTS_DIR, f"{stamp}-{result['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 结果已保存: {output}")
+
+    if args.compare:
+        compare(_load_result(args.compare[0]), result)
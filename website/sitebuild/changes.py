@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+内容变更记录
+每次构建把内容真正发生变化的页面（URL -> lastmod，与 sitemap 中的 lastmod 一致）合并到 .build/changes.json，
+供 website/Operation 中的搜索引擎提交脚本使用：提交脚本用 pending_urls() 取出自上次提交以来又变化过的URL，
+提交成功后用 mark_submitted() 记录，各提交脚本（百度、IndexNow……）分别记录，互不影响。
+
+实际写入磁盘的文件（相对 website 目录的路径，每行一个）追加到 .build/changed-files.txt，
+供上传、CDN刷新等后续步骤使用；使用方处理完后调用 clear_changed_files()（或删除该文件），
+之后的构建重新开始记录。
+"""
+
+import json
+import os
+
+CHANGES_FILE = 'changes.json'
+CHANGED_FILES_FILE = 'changed-files.txt'
+
+
+def _load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"警告: 无法读取 {path}: {e}")
+        return {}
+
+
+def _save(path, data):
+    """先写临时文件再替换，避免构建和提交脚本同时运行时读到半个文件"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _submitted_path(build_dir, consumer):
+    return os.path.join(build_dir, f'submitted-{consumer}.json')
+
+
+def record_changes(build_dir, changes):
+    """合并本次构建的变更 {URL: lastmod}"""
+    if not changes:
+        return
+    path = os.path.join(build_dir, CHANGES_FILE)
+    data = _load(path)
+    data.update(changes)
+    _save(path, data)
+
+
+def record_changed_files(build_dir, paths):
+    """追加本次写入的文件（已记录的不重复记录）"""
+    paths = [path.replace(os.sep, '/') for path in paths]
+    if not paths:
+        return
+    existing = load_changed_files(build_dir)
+    new_paths = [path for path in dict.fromkeys(paths) if path not in existing]
+    if not new_paths:
+        return
+    path = os.path.join(build_dir, CHANGED_FILES_FILE)
+    os.makedirs(build_dir, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in new_paths)
+
+
+def load_changed_files(build_dir):
+    """上次清空以来写入过的文件列表（按写入顺序）"""
+    try:
+        with open(os.path.join(build_dir, CHANGED_FILES_FILE), 'r', encoding='utf-8') as f:
+            return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    except FileNotFoundError:
+        return []
+
+
+def clear_changed_files(build_dir):
+    """后续步骤处理完变更文件后清空列表"""
+    try:
+        os.remove(os.path.join(build_dir, CHANGED_FILES_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def load_changes(build_dir):
+    """所有记录过的变更 {URL: 最后变化时间}"""
+    return _load(os.path.join(build_dir, CHANGES_FILE))
+
+
+def pending_urls(build_dir, consumer):
+    """
+    consumer 尚未提交的变更URL（从未提交过，或提交后内容又变化过），按变化时间排序
+    没有变更记录（尚未运行构建脚本）时返回空列表
+    """
+    changes = load_changes(build_dir)
+    submitted = _load(_submitted_path(build_dir, consumer))
+    pending = [(lastmod, url) for url, lastmod in changes.items() if submitted.get(url) != lastmod]
+    return [url for _, url in sorted(pending)]
+
+
+def mark_submitted(build_dir, consumer, urls):
+    """记录 consumer 已成功提交的URL（记下提交时对应的变化时间）"""
+    changes = load_changes(build_dir)
+    path = _submitted_path(build_dir, consumer)
+    submitted = _load(path)
+    for url in urls:
+        if url in changes:
+            submitted[url] = changes[url]
+    _save(path, submitted)
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+内容集合
+每个集合（使用指南、芯图日记……）对应一个数据文件、一个输出目录、一个详情页模板和sitemap中的一组URL。
+集合之间只有少量差异（标签/封面的渲染方式、图片路径模式），由子类覆盖对应方法实现。
+新增集合：定义 Collection 子类并加入 COLLECTIONS。
+"""
+
+import os
+import re
+from datetime import datetime
+
+from sitebuild import profiler
+from sitebuild.common import escape_html, escape_json_string, format_date
+from sitebuild.manifest import file_hash, json_hash
+from sitebuild.markdown import markdown_to_html
+from sitebuild.overrides import apply_title, extract_seo_meta, unescape_fully
+from sitebuild.template import load_template
+
+BASE_URL = 'https://www.xintuxiangce.top'
+
+# 已渲染的Markdown片段：(集合名, 文件路径) -> (源文本, 图片记录哈希, HTML)，源文件和图片都未变化时直接复用（监听模式下常驻内存）
+_content_cache = {}
+
+
+class Collection:
+    """内容集合基类"""
+
+    name = ''            # 集合标识，也用于构建清单文件名
+    label = ''           # 显示名称
+    data_file = ''       # 数据文件，如 guides-data.json
+    output_dir = ''      # 详情页输出目录（也是模板所在目录）
+    template_file = ''   # 详情页模板文件名
+    template_aliases = None
+    list_page = ''       # 列表页，如 guides.html
+    overrides_file = ''  # 手动调整的SEO信息，如 guides-seo-overrides.json（见 sitebuild.overrides）
+    # 图片路径模式：'relative' 用于本地预览，'absolute' 用于服务器部署
+    image_path_mode = 'absolute'
+
+    @property
+    def template_path(self):
+        return os.path.join(self.output_dir, self.template_file)
+
+    def output_path(self, article_id):
+        return os.path.join(self.output_dir, f"{article_id}.html")
+
+    def page_url(self, article_id):
+        return f"{BASE_URL}/{self.output_dir}/{article_id}.html"
+
+    @property
+    def list_url(self):
+        return f"{BASE_URL}/{self.list_page}"
+
+    def load_template(self):
+        """读取并编译详情页模板（按修改时间缓存）"""
+        return load_template(self.template_path, self.template_aliases)
+
+    def markdown_to_html(self, markdown_text, images=None):
+        """Markdown到HTML转换（HTML文件在输出目录下，relative 模式据此计算图片的 ../ 前缀）"""
+        return markdown_to_html(markdown_text, html_relative_path=self.output_dir + '/',
+                                image_path_mode=self.image_path_mode, images=images)
+
+    def render_content_file(self, content_file, images=None):
+        """读取Markdown文件并转换为HTML（结果按源文本和图片记录缓存）"""
+        with open(content_file, 'r', encoding='utf-8') as f:
+            source = f.read()
+        key = (self.name, content_file)
+        images_hash = images.hash if images else None
+        cached = _content_cache.get(key)
+        if cached and cached[0] == source and cached[1] == images_hash:
+            return cached[2]
+
+        # 移除第一个h1标题（因为header中已经有标题了）
+        content = re.sub(r'^#\s+.*?\n', '', source, count=1, flags=re.MULTILINE)
+        with profiler.stage('Markdown'):
+            content = self.markdown_to_html(content, images)
+        _content_cache[key] = (source, images_hash, content)
+        return content
+
+    def render_tags(self, tags, values, sections):
+        """处理标签：{{#TAGS}}...{{/TAGS}} 整体替换为标签HTML"""
+        sections['TAGS'] = ''.join([f'<span class="article-tag">{tag}</span>' for tag in tags])
+
+    def cover_html(self, article):
+        """封面图片HTML（替换 {{#COVER}}...{{/COVER}} 条件块），不显示封面时返回None"""
+        if not article.get('cover'):
+            return None
+        return f'<img src="{article["cover"]}" alt="{article["title"]}" class="article-cover">'
+
+    def generate_article_page(self, article, template, related=None, overrides=None, images=None):
+        """
+        生成文章详情页
+        template: 已编译的模板（见 sitebuild.template）
+        related: 已解析的相关文章 [(ID, 文章或None)]（见 sitebuild.related.RelatedIndex）
+        overrides: 手动调整的SEO信息 {'title', 'description', 'keywords'}（见 sitebuild.overrides）
+        images: 正文图片的尺寸和响应式变体（见 sitebuild.images.ImageCatalog）
+        """
+        if template is None:
+            return None
+
+        # 手动调整过的description优先于JSON中的description
+        overrides = overrides or {}
+        description = overrides.get('description', article.get('description', ''))
+        keywords = overrides.get('keywords')
+
+        # 占位符的值（HTML中的标题和描述需要转义HTML特殊字符，JSON-LD单独处理）
+        values = {
+            'TITLE': escape_html(article.get('title', '')),
+            'DESCRIPTION': escape_html(description),  # 使用可能被手动调整过的description
+            'TAGS': escape_html(keywords) if keywords is not None else ', '.join(article.get('tags', [])),
+            'COVER': str(article.get('cover', '/icons/imageclassify.png')),
+            'ID': str(article.get('id', '')),
+            'DATE': format_date(article.get('date', '')),
+            'AUTHOR': str(article.get('author', '芯图团队')),
+            'READTIME': str(article.get('readTime', article.get('duration', ''))),
+        }
+
+        # 处理内容
+        content = ''
+        if article.get('type') == 'article':
+            # 如果是文章，尝试读取Markdown文件
+            content_file = article.get('content', '')
+            if content_file and os.path.exists(content_file):
+                content = self.render_content_file(content_file, images)
+            else:
+                content = article.get('description', '')
+        elif article.get('type') == 'video':
+            # 视频页面特殊处理
+            content = generate_video_content(article)
+
+        values['CONTENT'] = str(content)
+        sections = {}
+
+        # 处理标签
+        tags = article.get('tags', [])
+        if tags:
+            self.render_tags(tags, values, sections)
+
+        # 处理封面图片
+        cover = self.cover_html(article)
+        if cover:
+            sections['COVER'] = cover
+
+        # 处理相关文章：生成相关文章卡片（ID不存在的跳过）
+        if related:
+            related_items = []
+            for related_id, related_article in related:
+                if related_article is not None:
+                    related_items.append(f'''
+                <a href="{related_id}.html" class="related-article-card">
+                    <h3>{related_article.get('title', '')}</h3>
+                    <p>{related_article.get('description', '')}</p>
+                </a>''')
+
+            if related_items:
+                # 保留 {{#RELATED}} 块结构，只替换 {{RELATED_ITEMS}}
+                values['RELATED_ITEMS'] = ''.join(related_items)
+                sections['RELATED'] = True
+
+        # JSON-LD脚本块中的占位符需要做JSON转义
+        # JSON-LD中使用手动调整过的description（如果存在），封面保持原始路径
+        json_values = {
+            'TITLE': escape_json_string(article.get('title', '')),
+            'DESCRIPTION': escape_json_string(description),
+            'COVER': article.get('cover', '/icons/imageclassify.png'),
+            'DATE': format_date(article.get('date', '')),
+            'ID': article.get('id', ''),
+        }
+
+        with profiler.stage('模板渲染'):
+            html = template.render(values, sections, json_values)
+        if 'title' in overrides:
+            html = apply_title(html, escape_html(overrides['title']))
+        return html
+
+    def detect_overrides(self, article, template, related, output_path, overrides):
+        """
+        对比磁盘上的现有页面和按当前数据生成的页面，找出手动调整过的SEO信息
+        overrides: 已记录的手动调整；返回现有页面中与生成结果不同的字段 {字段: 未转义的文本}
+        """
+        try:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                existing = extract_seo_meta(f.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"警告: 无法读取现有文件 {output_path}: {e}")
+            return {}
+
+        generated = self.generate_article_page(article, template, related, overrides)
+        if generated is None:
+            return {}
+        generated = extract_seo_meta(generated)
+        # 比较还原转义后的文本，旧版本重复转义造成的差异不算手动调整
+        return {field: unescape_fully(value) for field, value in existing.items()
+                if field in generated and unescape_fully(value) != unescape_fully(generated[field])}
+
+    def page_dependencies(self, article, related, template, generator, overrides=None, images=None):
+        """
+        计算详情页的依赖哈希（用于增量构建）
+        包括：JSON条目、Markdown源文件、模板、嵌入的相关文章（含自动推荐）的标题和描述、
+        手动调整的SEO信息、正文图片（尺寸和变体）、生成器代码
+        """
+        related_hashes = {}
+        for related_id, related_article in related:
+            related_hashes[related_id] = json_hash({
+                'title': related_article.get('title', ''),
+                'description': related_article.get('description', ''),
+            }) if related_article else None
+
+        content_file = self.content_file(article)
+        return {
+            'entry': json_hash(article),
+            'source': file_hash(content_file) if content_file else None,
+            'template': template.hash,
+            'related': related_hashes,
+            'overrides': json_hash(overrides or {}),
+            'images': images.dependency_hash(content_file) if images and content_file else None,
+            'generator': generator,
+        }
+
+    def content_file(self, article):
+        """文章引用的Markdown源文件（视频等没有源文件时返回空字符串）"""
+        return article.get('content', '') if article.get('type') == 'article' else ''
+
+    def content_files(self, articles):
+        """所有文章引用的Markdown源文件（监听模式使用）"""
+        return [path for path in map(self.content_file, articles) if path]
+
+    def sitemap_entries(self, articles, lastmod):
+        """
+        本集合在sitemap中的URL：列表页 + 每篇详情页
+        lastmod: 函数，输出文件路径 -> 内容最后一次变化的时间（未知时返回None）
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        entries = [{
+            'loc': self.list_url,
+            'lastmod': lastmod(self.list_page),
+            'default_lastmod': today,
+            'changefreq': 'weekly',
+            'priority': '0.9',
+        }]
+        for article in articles:
+            article_id = article.get('id', '')
+            if not article_id:
+                continue
+            entries.append({
+                'loc': self.page_url(article_id),
+                'lastmod': lastmod(self.output_path(article_id)),
+                'default_lastmod': article.get('date', today),
+                'changefreq': 'monthly',
+                'priority': '0.8',
+            })
+        return entries
+
+
+class GuidesCollection(Collection):
+    """使用指南"""
+
+    name = 'guides'
+    label = '指南'
+    data_file = 'guides-data.json'
+    overrides_file = 'guides-seo-overrides.json'
+    output_dir = 'guides'
+    template_file = 'guide-template.html'
+    # 模板中标签占位注释，编译时转换为 {{TAGS_HTML}} 占位符
+    template_aliases = {'<!-- 标签会在这里自动生成 -->': 'TAGS_HTML'}
+    list_page = 'guides.html'
+
+    def render_tags(self, tags, values, sections):
+        """处理标签：保留 {{#TAGS}} 块结构，标签HTML填入占位注释的位置"""
+        values['TAGS_HTML'] = ''.join([f'<span class="article-tag">{tag}</span>' for tag in tags])
+        sections['TAGS'] = True
+
+
+class DiaryCollection(Collection):
+    """芯图日记"""
+
+    name = 'diary'
+    label = '日记'
+    data_file = 'diary-data.json'
+    overrides_file = 'diary-seo-overrides.json'
+    output_dir = 'diary'
+    template_file = 'article-template.html'
+    list_page = 'diary.html'
+    image_path_mode = 'absolute'  # 可选值：'relative' 或 'absolute'
+
+    def cover_html(self, article):
+        # 视频页面不显示封面图片（因为已经有视频播放器了）
+        if article.get('type') == 'video' or not article.get('cover'):
+            return None
+
+        # 根据图片路径模式决定封面图片路径
+        cover_path = article["cover"]
+        if self.image_path_mode == 'relative':
+            # 相对路径模式：用于本地预览
+            if cover_path.startswith('/'):
+                cover_path = '../' + cover_path[1:]  # /assets/ -> ../assets/
+        else:
+            # 绝对路径模式：用于服务器部署（默认）
+            # 确保路径以 / 开头
+            if not cover_path.startswith('/') and not cover_path.startswith('http'):
+                cover_path = '/' + cover_path
+        return f'<img src="{cover_path}" alt="{article["title"]}" class="article-cover">'
+
+
+# 所有集合（按构建顺序）
+COLLECTIONS = {collection.name: collection for collection in (GuidesCollection(), DiaryCollection())}
+
+
+def generate_video_content(article):
+    """生成视频页面内容"""
+    video_url = article.get('videoUrl', '')
+    platform = article.get('videoPlatform', 'bilibili')
+
+    # 根据平台生成嵌入代码
+    if platform == 'bilibili':
+        # 从B站URL提取BV号
+        bv_match = re.search(r'BV[\w]+', video_url)
+        if bv_match:
+            bv = bv_match.group()
+            embed_code = f'''
+            <div class="video-embed">
+                <iframe src="//player.bilibili.com/player.html?bvid={bv}&page=1" 
+                        scrolling="no" border="0" frameborder="no" framespacing="0" 
+                        allowfullscreen="true">
+                </iframe>
+            </div>
+            '''
+        else:
+            embed_code = f'<p><a href="{video_url}" target="_blank">观看视频</a></p>'
+    else:
+        embed_code = f'<p><a href="{video_url}" target="_blank">观看视频</a></p>'
+
+    content = f'''
+    <div class="video-container">
+        {embed_code}
+        <h2>视频简介</h2>
+        <p>{article.get('description', '')}</p>
+    </div>
+    '''
+
+    if article.get('transcript'):
+        content += f'''
+        <h2>文字稿</h2>
+        <div class="transcript">
+            {article.get('transcript')}
+        </div>
+        '''
+
+    return content
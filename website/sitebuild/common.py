@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+公共工具函数（读写文件、日期格式化、HTML/JSON转义）
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+def load_json(filepath):
+    """加载JSON文件"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"错误: 找不到文件 {filepath}")
+        return None
+    except json.JSONDecodeError as e:
+        print(f"错误: JSON解析失败 {e}")
+        return None
+
+
+def _same_content(filepath, data):
+    """现有文件的内容是否与 data 完全相同（先比较大小，大小相同才读取）"""
+    try:
+        if os.path.getsize(filepath) != len(data):
+            return False
+        with open(filepath, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def save_bytes(filepath, data):
+    """
+    保存二进制内容，返回是否写入
+    内容与现有文件相同时不写入（修改时间不变，服务器ETag、浏览器缓存和CDN都不会失效），
+    否则先写临时文件再替换，中断时不会留下半个文件
+    """
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    if _same_content(filepath, data):
+        return False
+    # 临时文件名带进程号：多个工作进程可能同时写同一个文件（如内容相同的两张图片的变体）
+    tmp_path = f'{filepath}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+    return True
+
+
+def save_file(filepath, content):
+    """保存文本文件（内容未变化时不写入），返回是否写入"""
+    # 与文本模式写入的字节一致（Windows 下换行符为 \r\n）
+    if not save_bytes(filepath, content.replace('\n', os.linesep).encode('utf-8')):
+        return False
+    print(f"✓ 已生成: {filepath}")
+    return True
+
+
+def format_date(date_str):
+    """格式化日期"""
+    try:
+        date = datetime.strptime(date_str, '%Y-%m-%d')
+        return date.strftime('%Y年%m月%d日')
+    except (TypeError, ValueError):
+        return date_str
+
+
+def escape_json_string(text):
+    """
+    转义JSON字符串中的特殊字符
+    只转义JSON规范要求的特殊字符，中文引号等Unicode字符不需要转义
+    """
+    if not text:
+        return ''
+
+    # 将文本转换为字符串
+    text = str(text)
+
+    # 转义反斜杠（必须在其他转义之前）
+    text = text.replace('\\', '\\\\')
+
+    # 只转义英文双引号（中文引号是普通Unicode字符，不需要转义）
+    text = text.replace('"', '\\"')
+
+    # 转义其他JSON特殊字符
+    text = text.replace('\n', '\\n')
+    text = text.replace('\r', '\\r')
+    text = text.replace('\t', '\\t')
+
+    return text
+
+
+def escape_html(text):
+    """转义HTML属性/文本中的特殊字符"""
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
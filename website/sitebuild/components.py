@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+公共组件内联
+导航栏和页脚（components/navbar.html、components/footer.html）原来由 components-loader.js 在每次打开页面时
+请求加载，首屏要多等两个请求，导航栏出现时页面还会跳动。构建时把组件HTML直接写入引用了
+components-loader.js 的页面（手工维护的页面和详情页模板，详情页由模板生成时自然包含）：
+    <!-- component:navbar -->...<!-- /component:navbar -->
+标记之间的内容每次构建都按组件文件重新替换；components-loader.js 发现组件已在页面中时不再请求，
+只在页面没有内联组件时（如未重新构建的旧页面）作为后备加载。
+"""
+
+import os
+import re
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.fingerprint import find_html
+
+COMPONENTS_DIR = 'components'
+# 组件名 -> 插入位置（与 components-loader.js 一致：导航栏在 <body> 开头，页脚在 </body> 之前）
+COMPONENTS = {'navbar': 'afterbegin', 'footer': 'beforeend'}
+
+_LOADER_REF = re.compile(r'components-loader(?:\.[0-9a-f]{8})?\.js')
+_BODY_OPEN = re.compile(r'<body\b[^>]*>', re.IGNORECASE)
+_BODY_CLOSE = re.compile(r'</body\s*>', re.IGNORECASE)
+
+
+def _block_pattern(name):
+    return re.compile(r'<!-- component:%s -->.*?<!-- /component:%s -->' % (name, name), re.DOTALL)
+
+
+def load_components(root='.'):
+    """读取组件文件：组件名 -> HTML（文件不存在的组件跳过）"""
+    components = {}
+    for name in COMPONENTS:
+        path = os.path.join(root, COMPONENTS_DIR, f'{name}.html')
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                components[name] = f.read().strip()
+        except FileNotFoundError:
+            print(f"警告: 组件文件不存在，跳过 {path}")
+    return components
+
+
+def inline_components(html, components):
+    """把组件写入页面（已有标记时替换标记之间的内容），不是完整页面时原样返回"""
+    newline = '\r\n' if '\r\n' in html else '\n'
+    for name, markup in components.items():
+        block = f'<!-- component:{name} -->{newline}{markup}{newline}<!-- /component:{name} -->'
+        pattern = _block_pattern(name)
+        if pattern.search(html):
+            html = pattern.sub(lambda _: block, html, count=1)
+            continue
+        if COMPONENTS[name] == 'afterbegin':
+            match = _BODY_OPEN.search(html)
+            if match:
+                html = f'{html[:match.end()]}{newline}{block}{html[match.end():]}'
+        else:
+            matches = list(_BODY_CLOSE.finditer(html))
+            if matches:
+                html = f'{html[:matches[-1].start()]}{block}{newline}{html[matches[-1].start():]}'
+    return html
+
+
+def inline_all(build_dir, exclude=(), root='.'):
+    """
+    把组件写入所有引用了 components-loader.js 的页面，写入的文件追加到 .build/changed-files.txt
+    exclude: 跳过的页面（由模板生成的详情页：内容以模板为准，重新生成时自然包含组件）
+    返回更新的页面数
+    """
+    components = load_components(root)
+    if not components:
+        return 0
+    exclude = {os.path.normpath(path) for path in exclude}
+    updated = []
+    for path in find_html(root):
+        if path in exclude or path.startswith(COMPONENTS_DIR + os.sep):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            html = data.decode('utf-8')
+        except UnicodeDecodeError:
+            continue
+        if not _LOADER_REF.search(html):
+            continue
+        if save_bytes(path, inline_components(html, components).encode('utf-8')):
+            updated.append(path)
+
+    record_changed_files(build_dir, updated)
+    print(f"   公共组件: {', '.join(components)} 已内联，更新 {len(updated)} 个页面")
+    return len(updated)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+静态文件预压缩
+为网站中的文本文件（HTML、CSS、JS、JSON、XML……）生成最高压缩级别的 .gz 和 .br 副本，
+服务器直接发送预压缩的文件（如 nginx 的 gzip_static / brotli_static），每个请求不再消耗压缩CPU。
+brotli 是可选依赖（pip install brotli），未安装时只生成 .gz。
+
+每个文件的签名（修改时间+大小）、内容哈希和生成的副本记录在 .build/compress-manifest.json，
+未变化的文件直接跳过；需要压缩的文件分发到进程池并行处理。
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.manifest import content_hash
+from sitebuild.parallel import default_jobs, run_ordered, worker_count
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'compress-manifest.json'
+
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+# 不部署的目录和文件（与 deploy.ps1 的排除规则一致）
+EXCLUDE_DIRS = {'Operation', '__pycache__', 'node_modules'}
+EXCLUDE_SUFFIXES = ('-seo-overrides.json',)
+# 太小的文件压缩后反而更大（或几乎没有收益）
+MIN_SIZE = 256
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ALL_SUFFIXES = ('.gz', '.br')
+
+
+def enabled_suffixes():
+    """当前可以生成的副本类型"""
+    return ['.gz', '.br'] if brotli else ['.gz']
+
+
+def find_assets(root='.'):
+    """需要预压缩的文件（按路径排序）"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in EXCLUDE_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(COMPRESS_EXTENSIONS) and not filename.endswith(EXCLUDE_SUFFIXES):
+                yield os.path.normpath(os.path.join(dirpath, filename))
+
+
+def gzip_bytes(data, filename):
+    """gzip压缩（mtime=0：内容相同时压缩结果也相同，与 sitemap.xml.gz 的写法一致）"""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename=filename, mode='wb', fileobj=buffer, mtime=0, compresslevel=GZIP_LEVEL) as gz:
+        gz.write(data)
+    return buffer.getvalue()
+
+
+def _compress(suffix, data, path):
+    if suffix == '.gz':
+        return gzip_bytes(data, os.path.basename(path))
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+
+
+def compress_file(task):
+    """
+    生成单个文件的压缩副本（可在工作进程中执行）
+    task: (路径, 上次记录的内容哈希, 上次生成的副本)
+    返回 (内容哈希, 原始大小, {副本后缀: 压缩后大小}（内容未变化时为None）, 写入的文件列表)
+    """
+    path, previous_hash, previous_outputs = task
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    # 只是修改时间变了（如重新检出），内容和副本都没变
+    if digest == previous_hash and all(os.path.exists(path + suffix) for suffix in previous_outputs):
+        return digest, len(data), None, []
+
+    suffixes = enabled_suffixes()
+    sizes = {}
+    written = []
+    for suffix in ALL_SUFFIXES:
+        sibling = path + suffix
+        compressed = None
+        if suffix in suffixes and len(data) >= MIN_SIZE:
+            compressed = _compress(suffix, data, path)
+        if compressed is None or len(compressed) >= len(data):
+            # 未启用的格式、文件太小或压缩后没有变小：删除旧副本（避免服务器发送过期内容），直接发送原文件
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        sizes[suffix] = len(compressed)
+        if save_bytes(sibling, compressed):
+            written.append(sibling)
+    return digest, len(data), sizes, written
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            return data.get('files', {})
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"警告: 预压缩记录无法读取，将重新检查所有文件 {path}: {e}")
+    return {}
+
+
+def _save_manifest(path, files):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(path, record, stat, suffixes):
+    """文件签名和启用的格式都与上次相同，且副本都还在"""
+    return (record is not None and record.get('stat') == stat and record.get('formats') == suffixes
+            and all(os.path.exists(path + suffix) for suffix in record.get('outputs', [])))
+
+
+def precompress(build_dir, jobs, root='.'):
+    """
+    生成所有文本文件的压缩副本，写入的副本追加到 .build/changed-files.txt
+    返回 (压缩的文件数, 跳过的文件数)
+    """
+    manifest_path = os.path.join(build_dir, MANIFEST_FILE)
+    records = _load_manifest(manifest_path)
+    suffixes = enabled_suffixes()
+    start_time = time.perf_counter()
+
+    paths = []
+    stats = {}
+    tasks = []
+    for path in find_assets(root):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        paths.append(path)
+        stats[path] = [st.st_mtime_ns, st.st_size]
+        record = records.get(path)
+        if not _is_fresh(path, record, stats[path], suffixes):
+            previous = record if record and record.get('formats') == suffixes else {}
+            tasks.append((path, previous.get('hash'), previous.get('outputs', [])))
+
+    # 源文件已删除：同时删除它的压缩副本
+    for path in set(records) - set(paths):
+        for suffix in records[path].get('outputs', []):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        del records[path]
+
+    compressed_count = 0
+    original_total = 0
+    compressed_totals = dict.fromkeys(suffixes, 0)
+    written = []
+    results = run_ordered(compress_file, tasks, jobs)
+    for (path, _, _), ((digest, size, sizes, files), _) in zip(tasks, results):
+        record = records.get(path, {})
+        if sizes is not None:
+            record = {'hash': digest, 'outputs': sorted(sizes)}
+            compressed_count += 1
+            original_total += size
+            for suffix, compressed_size in sizes.items():
+                compressed_totals[suffix] += compressed_size
+            written.extend(files)
+        record['stat'] = stats[path]
+        record['formats'] = suffixes
+        records[path] = record
+
+    _save_manifest(manifest_path, records)
+    record_changed_files(build_dir, written)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"   压缩: {compressed_count} 个文件，跳过 {len(paths) - compressed_count} 个未变化的文件"
+          f"（{worker_count(jobs, len(tasks))} 个进程，耗时 {elapsed:.2f} 秒）")
+    if original_total:
+        sizes_text = ' / '.join(f"{suffix[1:]} {total / 1024:.0f} KB" for suffix, total in compressed_totals.items())
+        print(f"   体积: {original_total / 1024:.0f} KB → {sizes_text}")
+    if brotli is None:
+        print("   提示: 未安装 brotli（pip install brotli），只生成 .gz 副本")
+    return compressed_count, len(paths) - compressed_count
+
+
+def main(build_dir):
+    """命令行入口：单独运行预压缩"""
+    parser = argparse.ArgumentParser(description='静态文件预压缩')
+    parser.add_argument('--jobs', '-j', type=int, default=default_jobs(),
+                        help='并行压缩的进程数（默认: CPU核心数）')
+    args = parser.parse_args()
+
+    print("预压缩静态文件（.gz" + ("/.br" if brotli else "") + "）...")
+    precompress(build_dir, args.jobs)
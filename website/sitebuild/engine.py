@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+网站构建引擎
+在一个进程中加载所有集合（使用指南、芯图日记……）的数据和模板，
+共用一个进程池渲染所有详情页，共用Markdown片段缓存，最后一次性更新sitemap。
+update-guides.py / update-diary.py / build-site.py 都只是调用 main() 的入口。
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+from sitebuild import profiler
+from sitebuild.collection import BASE_URL, COLLECTIONS
+from sitebuild.changes import CHANGED_FILES_FILE, record_changed_files, record_changes
+from sitebuild.common import load_json, save_file
+from sitebuild.components import inline_all
+from sitebuild.compress import precompress
+from sitebuild.fingerprint import fingerprint_assets
+from sitebuild.images import ImageCatalog
+from sitebuild.listdata import build_list_data
+from sitebuild.manifest import BuildManifest, content_hash, generator_hash, json_hash, text_file_hash
+from sitebuild.minify import minify_html
+from sitebuild.overrides import SeoOverrides
+from sitebuild.parallel import default_jobs, run_ordered, worker_count
+from sitebuild.related import RelatedIndex, suggest_related
+from sitebuild.search import build_search_index
+from sitebuild.sitemap import update_sitemap
+from sitebuild.watch import watch_files
+
+SITEMAP_FILE = 'sitemap.xml'
+BUILD_DIR = '.build'
+SITEMAP_INDEX_FILE = os.path.join(BUILD_DIR, 'sitemap-index.json')
+
+# 渲染工作进程的共享数据：集合名 -> (集合, 已编译的模板, 全部文章, 相关文章索引, SEO覆盖)，由 init_render_worker 在每个进程中设置一次
+_render_state = {}
+# 渲染选项（minify: 是否精简输出的HTML；images: 正文图片记录）
+_render_options = {}
+
+
+def init_render_worker(state, options):
+    """初始化渲染工作进程"""
+    _render_state.clear()
+    _render_state.update(state)
+    _render_options.clear()
+    _render_options.update(options)
+
+
+def render_page(task):
+    """渲染单个详情页（可在工作进程中执行），返回 (HTML, 精简前的字节数)"""
+    name, index = task
+    collection, template, articles, related_index, overrides = _render_state[name]
+    article = articles[index]
+    with profiler.page(collection.output_path(article.get('id'))):
+        return _render_article(collection, template, article, related_index, overrides)
+
+
+def _render_article(collection, template, article, related_index, overrides):
+    with profiler.stage('相关文章'):
+        related = related_index.related(article)
+    html = collection.generate_article_page(article, template, related=related,
+                                            overrides=overrides.get(article.get('id')),
+                                            images=_render_options.get('images'))
+    if html is None:
+        return None, 0
+    original_size = len(html.encode('utf-8'))
+    if _render_options.get('minify'):
+        with profiler.stage('精简HTML'):
+            html = minify_html(html)
+        size = len(html.encode('utf-8'))
+        print(f"  ✂ 精简: {collection.output_path(article.get('id'))} {original_size} → {size} 字节"
+              f"（-{(original_size - size) * 100 / original_size:.1f}%）")
+    return html, original_size
+
+
+class SiteBuilder:
+    """一次构建（监听模式下常驻内存）：各集合的文章数据、已编译的模板、相关文章索引、SEO覆盖、正文图片和构建清单"""
+
+    def __init__(self, collections, jobs, auto_related=0, minify=True, avif=False, precompress=True):
+        self.collections = collections
+        self.jobs = jobs
+        # 监听模式下重新生成后是否更新预压缩副本（--no-precompress 时不生成）
+        self.precompress = precompress
+        # 自动推荐的相关文章数（0 表示只使用JSON中手动填写的 related）
+        self.auto_related = auto_related
+        # 是否精简输出的HTML（删除注释和多余空白）
+        self.minify = minify
+        # 生成器代码（sitebuild 模块）或生成选项变化时所有页面都需要重新生成
+        self.generator = json_hash({'code': generator_hash(), 'minify': minify})
+        self.articles = {}
+        self.templates = {}
+        self.related = {}
+        self.overrides = {}
+        self.manifests = {}
+        # 正文引用的图片（尺寸和 WebP/AVIF 变体），所有集合共用
+        self.images = ImageCatalog(BUILD_DIR, avif=avif)
+
+    def load(self):
+        """加载所有集合的数据和模板，失败时返回False"""
+        for collection in self.collections:
+            with profiler.stage('读取JSON'):
+                data = load_json(collection.data_file)
+            if not data:
+                return False
+            self.articles[collection.name] = data.get('articles', [])
+            print(f"   {collection.label}: 找到 {len(self.articles[collection.name])} 篇")
+            with profiler.stage('相关文章索引'):
+                self.index_related(collection)
+
+            if not os.path.exists(collection.template_path):
+                print(f"错误: 模板文件不存在 {collection.template_path}")
+                return False
+            # 模板只编译一次，同一集合的所有详情页共用
+            with profiler.stage('编译模板'):
+                self.templates[collection.name] = collection.load_template()
+
+            # 手动调整的SEO信息：每次构建读取一次
+            self.overrides[collection.name] = SeoOverrides(collection.overrides_file)
+
+            # 构建清单：记录每个页面的依赖哈希，增量模式据此判断是否需要重新生成
+            self.manifests[collection.name] = BuildManifest(
+                os.path.join(BUILD_DIR, f'{collection.name}-manifest.json'))
+            os.makedirs(collection.output_dir, exist_ok=True)
+        with profiler.stage('正文图片'):
+            self.update_images()
+        return True
+
+    def update_images(self):
+        """读取正文引用的图片（签名未变化的跳过），补齐缺少的响应式变体"""
+        content_files = [path for collection in self.collections
+                         for path in collection.content_files(self.articles[collection.name])]
+        self.images.update(content_files, self.jobs)
+
+    def index_related(self, collection):
+        """建立相关文章索引（每次加载数据后建立一次，所有详情页共用）"""
+        articles = self.articles[collection.name]
+        suggestions = {}
+        if self.auto_related:
+            content_files = {article.get('id'): collection.content_file(article) for article in articles}
+            cache_path = os.path.join(BUILD_DIR, f'{collection.name}-related.json')
+            suggestions, computed = suggest_related(articles, content_files, self.auto_related, cache_path)
+            filled = sum(1 for article in articles if not article.get('related') and suggestions.get(article.get('id')))
+            print(f"   {collection.label}: 自动推荐相关文章 {filled} 篇（重新分词 {computed} 篇）")
+        self.related[collection.name] = RelatedIndex(articles, suggestions)
+
+    def generate_pages(self, incremental, jobs=None, verbose=True):
+        """
+        生成所有集合的详情页并更新构建清单
+        verbose 为 False 时不打印跳过的页面（监听模式）
+        内容真正变化的页面（含列表页）记入 .build/changes.json，供搜索引擎提交脚本使用；
+        内容与现有文件相同的页面不写入，实际写入的文件追加到 .build/changed-files.txt
+        返回 (生成数, 跳过数, 进程数, {内容变化的URL: 变化时间}, 写入的文件列表)
+        """
+        jobs = self.jobs if jobs is None else jobs
+        # 本次构建的时间，作为内容变化页面的 lastmod（W3C 日期时间格式，带时区）
+        timestamp = datetime.now().astimezone().isoformat(timespec='seconds')
+        generated_count = 0
+        skipped_count = 0
+        output_paths = {}
+        pending = []
+        changes = {}
+        written = []
+
+        for collection in self.collections:
+            name = collection.name
+            articles = self.articles[name]
+            template = self.templates[name]
+            manifest = self.manifests[name]
+            related_index = self.related[name]
+            overrides = self.overrides[name]
+            output_paths[name] = []
+
+            for index, article in enumerate(articles):
+                article_id = article.get('id', '')
+                if not article_id:
+                    continue
+
+                output_path = collection.output_path(article_id)
+                output_paths[name].append(output_path)
+                with profiler.stage('相关文章'):
+                    related = related_index.related(article)
+
+                # 页面生成后被手动修改过（文件签名变化）时检查一次SEO信息，手动调整的部分记录到覆盖文件
+                if manifest.modified_externally(output_path):
+                    detected = collection.detect_overrides(article, template, related, output_path,
+                                                           overrides.get(article_id))
+                    captured = overrides.capture(article_id, detected)
+                    if captured:
+                        print(f"  检测到手动调整的SEO信息（{', '.join(captured)}），"
+                              f"已保存到 {overrides.path}: {output_path}")
+                    manifest.record_stat(output_path)
+
+                with profiler.stage('依赖哈希'):
+                    dependencies = collection.page_dependencies(article, related, template, self.generator,
+                                                                overrides.get(article_id), self.images)
+                    reason = manifest.dirty_reason(output_path, dependencies) if incremental else None
+
+                # 增量模式：依赖（数据、Markdown、模板、相关文章）都未变化则跳过
+                if incremental:
+                    if reason is None:
+                        if verbose:
+                            print(f"  ⊘ 跳过（未变化）: {output_path}")
+                        skipped_count += 1
+                        continue
+                    print(f"  ↻ {reason}: {output_path}")
+
+                pending.append((name, index, output_path, dependencies))
+
+            # 列表页是手工维护的HTML，同样按内容哈希记录最后变化时间
+            output_paths[name].append(collection.list_page)
+            list_hash = text_file_hash(collection.list_page)
+            if list_hash and manifest.record_output(collection.list_page, list_hash, timestamp):
+                changes[collection.list_url] = timestamp
+
+        # 所有集合的页面共用一个进程池，结果按顺序返回后依次写入
+        tasks = [(name, index) for name, index, _, _ in pending]
+        state = {c.name: (c, self.templates[c.name], self.articles[c.name], self.related[c.name],
+                          self.overrides[c.name].articles)
+                 for c in self.collections}
+        results = run_ordered(render_page, tasks, jobs, initializer=init_render_worker,
+                              initargs=(state, {'minify': self.minify, 'images': self.images}))
+        collections = {c.name: c for c in self.collections}
+        original_total = 0
+        minified_total = 0
+        for (name, index, output_path, dependencies), ((html, original_size), output) in zip(pending, results):
+            if output:
+                print(output, end='')
+            if html:
+                original_total += original_size
+                minified_total += len(html.encode('utf-8'))
+                manifest = self.manifests[name]
+                # 依赖变化不代表页面内容变化，比较渲染结果的哈希才能得到准确的 lastmod
+                if manifest.record_output(output_path, content_hash(html), timestamp):
+                    changes[collections[name].page_url(self.articles[name][index]['id'])] = timestamp
+                with profiler.stage('写入文件'):
+                    if save_file(output_path, html):
+                        written.append(output_path)
+                manifest.record(output_path, dependencies)
+                manifest.record_stat(output_path)
+                generated_count += 1
+
+        if self.minify and original_total:
+            print(f"  精简合计: {original_total / 1024:.0f} KB → {minified_total / 1024:.0f} KB"
+                  f"（-{(original_total - minified_total) * 100 / original_total:.1f}%）")
+
+        with profiler.stage('构建清单'):
+            for name, manifest in self.manifests.items():
+                manifest.prune(output_paths[name])
+                manifest.save()
+                self.overrides[name].save()
+            record_changes(BUILD_DIR, changes)
+            record_changed_files(BUILD_DIR, written)
+        return generated_count, skipped_count, worker_count(jobs, len(tasks)), changes, written
+
+    def update_sitemap(self):
+        """把所有集合的URL合并到sitemap（一次构建只合并、写入一次），lastmod 取页面内容最后变化的时间"""
+        entries = []
+        for collection in self.collections:
+            entries.extend(collection.sitemap_entries(self.articles[collection.name],
+                                                      self.manifests[collection.name].lastmod))
+        written = update_sitemap(SITEMAP_FILE, entries, SITEMAP_INDEX_FILE, BASE_URL)
+        record_changed_files(BUILD_DIR, written or [])
+        return written
+
+    def update_list_data(self):
+        """生成各集合列表页使用的数据分片（内容未变化的分片不重写）"""
+        written = []
+        for collection in self.collections:
+            written.extend(build_list_data(BUILD_DIR, collection, self.articles[collection.name]))
+        return written
+
+    def update_search_index(self):
+        """更新站内搜索索引（索引覆盖全站：未构建的集合从数据文件读取文章列表）"""
+        collections = []
+        for collection in COLLECTIONS.values():
+            articles = self.articles.get(collection.name)
+            if articles is None:
+                data = load_json(collection.data_file)
+                articles = data.get('articles', []) if data else []
+            collections.append((collection, articles))
+        return build_search_index(BUILD_DIR, collections)
+
+    def watched_paths(self):
+        """监听的文件：数据文件、SEO覆盖文件、模板、Markdown源文件、正文引用的图片"""
+        paths = []
+        for collection in self.collections:
+            paths.append(collection.data_file)
+            paths.append(collection.overrides_file)
+            paths.append(collection.template_path)
+            paths.extend(collection.content_files(self.articles[collection.name]))
+        paths.extend(self.images.paths())
+        return list(dict.fromkeys(paths))
+
+    def rebuild(self, changed):
+        """监听模式下文件变化后的重新生成"""
+        data_changed = False
+        for collection in self.collections:
+            if collection.data_file in changed:
+                data = load_json(collection.data_file)
+                if not data:
+                    return
+                self.articles[collection.name] = data.get('articles', [])
+                print(f"   重新加载{collection.label}数据: {len(self.articles[collection.name])} 篇")
+                data_changed = True
+                self.index_related(collection)
+            elif self.auto_related and set(changed).intersection(collection.content_files(self.articles[collection.name])):
+                # 正文变化会影响自动推荐（只有变化的文章需要重新分词）
+                self.index_related(collection)
+
+            if collection.overrides_file in changed:
+                self.overrides[collection.name] = SeoOverrides(collection.overrides_file)
+
+            # 模板按修改时间缓存，未变化时不会重新编译
+            template = collection.load_template()
+            if template is None:
+                return
+            self.templates[collection.name] = template
+
+        # 正文新引用的图片或替换过的图片（其余图片只检查签名）
+        self.update_images()
+
+        # 页面数量少，在当前进程中渲染（省去启动进程池的开销，Markdown片段缓存也能命中）
+        generated_count, _, _, changes, _ = self.generate_pages(incremental=True, jobs=1, verbose=False)
+        if generated_count == 0:
+            print("  没有需要重新生成的页面")
+
+        # 列表卡片只取自数据文件
+        if data_changed:
+            self.update_list_data()
+
+        # 新增文章或页面内容变化（lastmod）时更新sitemap和搜索索引
+        if data_changed or changes:
+            self.update_sitemap()
+            self.update_search_index()
+
+        # 重新生成的页面、列表数据和索引的 .gz/.br 副本（未变化的文件按清单跳过）
+        if self.precompress:
+            precompress(BUILD_DIR, 1)
+
+    def watch(self):
+        """
+        监听模式：数据、已编译的模板和已渲染的Markdown片段常驻内存，
+        数据文件、Markdown源文件或模板保存后只重新生成受影响的页面
+        """
+        watch_files(self.watched_paths, self.rebuild)
+
+
+def generated_pages():
+    """所有集合输出目录中由模板生成的详情页（不含模板本身）"""
+    pages = []
+    for collection in COLLECTIONS.values():
+        if not os.path.isdir(collection.output_dir):
+            continue
+        for filename in os.listdir(collection.output_dir):
+            path = os.path.join(collection.output_dir, filename)
+            if filename.endswith('.html') and path != collection.template_path:
+                pages.append(path)
+    return pages
+
+
+def main(names=None, title='网站构建脚本'):
+    """
+    命令行入口
+    names: 要构建的集合名列表；为空时构建命令行指定的集合，命令行也未指定时构建全部集合
+    """
+    parser = argparse.ArgumentParser(description=title)
+    if names is None:
+        parser.add_argument('collections', nargs='*', metavar='集合',
+                            help=f"要构建的集合（{' / '.join(COLLECTIONS)}，默认全部）")
+    parser.add_argument('--full', action='store_true',
+                        help='全量模式：重新生成所有文章（覆盖已存在的文件）')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：只重新生成内容有变化的文章（对比构建清单中记录的依赖哈希，默认）')
+    parser.add_argument('--jobs', '-j', type=int, default=default_jobs(),
+                        help='并行渲染的进程数（默认: CPU核心数，1 表示在当前进程中渲染）')
+    parser.add_argument('--auto-related', type=int, nargs='?', const=3, default=0, metavar='K',
+                        help='自动推荐相关文章：JSON中未填写 related 的文章，按内容相似度补充最相似的K篇（默认K=3）')
+    parser.add_argument('--no-minify', action='store_true',
+                        help='不精简生成的HTML（保留模板的缩进和注释，便于调试）')
+    parser.add_argument('--avif', action='store_true',
+                        help='正文图片除 WebP 外再生成 AVIF 变体（需要支持AVIF的Pillow，编码较慢）')
+    parser.add_argument('--no-inline-components', action='store_true',
+                        help='不把导航栏/页脚写入页面（只由 components-loader.js 在浏览器中加载）')
+    parser.add_argument('--no-fingerprint', action='store_true',
+                        help='不生成带内容哈希的 styles.css/script.js/components-loader.js 副本，HTML中的引用保持不变')
+    parser.add_argument('--no-precompress', action='store_true',
+                        help='不生成 .gz/.br 预压缩副本')
+    parser.add_argument('--profile', action='store_true',
+                        help='性能分析：统计各阶段和每个页面的耗时与内存分配，打印最慢的页面（报告写入 .build/profile.json）')
+    parser.add_argument('--profile-output', metavar='文件',
+                        help='性能分析时同时用 cProfile 记录函数级耗时并写入该文件（pstats 格式，可用 snakeviz/flameprof 查看）')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                        help='性能分析报告中列出的最慢页面数（默认10）')
+    parser.add_argument('--watch', action='store_true',
+                        help='监听模式：生成完成后继续监听数据、Markdown和模板，保存后自动重新生成受影响的页面')
+    args = parser.parse_args()
+
+    if names is None:
+        names = args.collections or list(COLLECTIONS)
+        unknown = [name for name in names if name not in COLLECTIONS]
+        if unknown:
+            parser.error(f"未知的集合: {', '.join(unknown)}")
+    collections = [COLLECTIONS[name] for name in names]
+
+    # 确定模式：默认是增量模式（跳过依赖未变化的页面）
+    incremental = not args.full
+
+    print("=" * 50)
+    print(title)
+    print("=" * 50)
+    print(f"模式: {'增量生成（只生成有变化的页面）' if incremental else '全量生成（重新生成所有）'}")
+    print()
+
+    # 性能分析：在当前进程中渲染和压缩，各阶段和每个页面的耗时、内存分配才能在一个进程中统计
+    profiling = args.profile or args.profile_output
+    if profiling:
+        args.jobs = 1
+        print(f"性能分析: 已启用（在当前进程中执行{'，cProfile 输出到 ' + args.profile_output if args.profile_output else ''}）")
+        print()
+        profiler.enable(cprofile=bool(args.profile_output))
+
+    # 1. 内联公共组件、更新静态资源指纹（在加载模板之前：模板内容可能被更新）
+    if not (args.no_inline_components and args.no_fingerprint):
+        print("1. 更新公共组件和静态资源指纹...")
+        with profiler.stage('公共组件和资源指纹'):
+            if not args.no_inline_components:
+                inline_all(BUILD_DIR, exclude=generated_pages())
+            if not args.no_fingerprint:
+                fingerprint_assets(BUILD_DIR)
+        print()
+
+    # 2. 加载数据
+    print(f"2. 加载{'、'.join(c.label for c in collections)}数据...")
+    builder = SiteBuilder(collections, args.jobs, auto_related=args.auto_related, minify=not args.no_minify,
+                          avif=args.avif, precompress=not args.no_precompress)
+    with profiler.stage('加载数据'):
+        loaded = builder.load()
+    if not loaded:
+        profiler.disable()
+        return
+
+    # 3. 生成详情页
+    print(f"\n3. 生成详情页（{'增量' if incremental else '全量'}模式）...")
+    start_time = time.perf_counter()
+    with profiler.stage('生成详情页'):
+        generated_count, skipped_count, workers, changes, written = builder.generate_pages(incremental)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\n   生成: {generated_count} 个文件（{workers} 个进程，耗时 {elapsed:.2f} 秒）")
+    print(f"   写入: {len(written)} 个文件（其余 {generated_count - len(written)} 个内容未变化，保持原文件）")
+    if incremental:
+        print(f"   跳过: {skipped_count} 个未变化的文件")
+    print(f"   内容变化: {len(changes)} 个页面（已记录到 {os.path.join(BUILD_DIR, 'changes.json')}）")
+
+    # 4. 生成列表页数据分片（第一页 + 按需加载的后续分页 + 单篇文章数据）
+    print("\n4. 更新列表页数据...")
+    with profiler.stage('列表页数据'):
+        builder.update_list_data()
+
+    # 5. 更新sitemap
+    print("\n5. 更新sitemap...")
+    with profiler.stage('sitemap'):
+        builder.update_sitemap()
+
+    # 6. 更新站内搜索索引（未变化的文章不重新分词，内容未变化的分片不重写）
+    print("\n6. 更新站内搜索索引...")
+    with profiler.stage('搜索索引'):
+        builder.update_search_index()
+
+    # 7. 预压缩静态文件（未变化的文件跳过，包括带哈希的资源副本、列表数据和搜索索引）
+    if not args.no_precompress:
+        print("\n7. 生成预压缩副本（.gz/.br）...")
+        with profiler.stage('预压缩'):
+            precompress(BUILD_DIR, args.jobs)
+
+    # 分析结果：各阶段汇总、最慢的页面（监听模式只分析第一次构建）
+    if profiling:
+        build_profile = profiler.disable()
+        build_profile.print_report(args.profile_top)
+        build_profile.save_report(BUILD_DIR)
+        if args.profile_output:
+            build_profile.dump_stats(args.profile_output)
+
+    changed_files_path = os.path.join(BUILD_DIR, CHANGED_FILES_FILE)
+    if os.path.exists(changed_files_path):
+        print(f"\n待上传/刷新CDN的文件列表: {changed_files_path}")
+
+    print("\n" + "=" * 50)
+    print("更新完成！")
+    print("=" * 50)
+    print("\n下一步:")
+    print("1. 检查生成的HTML文件")
+    print("2. 上传到服务器")
+    print("3. 提交sitemap到搜索引擎（或运行 Operation/indexnow-submit.py --changed 只提交内容有变化的页面）")
+
+    # 8. 监听模式
+    if args.watch:
+        builder.watch()
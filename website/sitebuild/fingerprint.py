@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+静态资源指纹
+styles.css / script.js / components-loader.js / search.js 以固定文件名引用时，浏览器和CDN不能长期缓存，
+部署后访问者还可能拿到旧版本。构建时为每个资源生成带内容哈希的副本（如 styles.3f2a9c1b.css），
+并把所有HTML（手工维护的页面、详情页模板、生成的详情页）中的引用改为带哈希的文件名。
+带哈希的文件内容永远不变，服务器和七牛CDN可以设置一年的 immutable 缓存（见 Operation/xintuxiangce-cache.conf）。
+
+源文件仍是固定文件名，修改 styles.css 等文件后重新运行构建即可，带哈希的副本只由构建生成。
+文件名映射写入 .build/asset-manifest.json；每个资源额外保留最近 KEEP_VERSIONS 个旧版本，
+缓存了旧HTML的访问者仍能加载到对应的资源。
+"""
+
+import json
+import os
+import re
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.compress import EXCLUDE_DIRS
+from sitebuild.manifest import content_hash
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'asset-manifest.json'
+
+ASSETS = ('styles.css', 'script.js', 'components-loader.js', 'search.js')
+HASH_LENGTH = 8
+KEEP_VERSIONS = 2
+
+# 文件名中的哈希部分（styles.3f2a9c1b.css -> styles.css）
+_HASH_PART = re.compile(r'\.[0-9a-f]{%d}(?=\.\w+$)' % HASH_LENGTH)
+
+
+def _reference_pattern(names):
+    """HTML属性中对资源的引用（带或不带哈希、查询参数），前面必须是引号或 /（不匹配 mystyles.css）"""
+    alternatives = '|'.join(re.escape(stem) + r'(?:\.[0-9a-f]{%d})?' % HASH_LENGTH + re.escape(ext)
+                            for stem, ext in map(os.path.splitext, names))
+    return re.compile(r'(?<=["\'/])(' + alternatives + r')(?:\?[^"\'\s>]*)?(?=["\'])')
+
+
+def fingerprinted_name(name, digest):
+    """styles.css + 哈希 -> styles.<哈希>.css"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{digest[:HASH_LENGTH]}{ext}'
+
+
+def find_html(root='.'):
+    """需要更新引用的HTML文件（按路径排序，排除不部署的目录）"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in EXCLUDE_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith('.html'):
+                yield os.path.normpath(os.path.join(dirpath, filename))
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            return data.get('assets', {})
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"警告: 资源指纹记录无法读取 {path}: {e}")
+    return {}
+
+
+def _save_manifest(path, assets):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'assets': assets}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _remove_old_versions(name, keep, root):
+    """删除不再保留的旧版本副本（只删除 <名称>.<哈希>.<扩展名> 格式的文件）"""
+    stem, ext = os.path.splitext(name)
+    pattern = re.compile(re.escape(stem) + r'\.[0-9a-f]{%d}' % HASH_LENGTH + re.escape(ext) + '$')
+    for filename in os.listdir(root):
+        if pattern.match(filename) and filename not in keep:
+            os.remove(os.path.join(root, filename))
+
+
+def rewrite_references(html, mapping, pattern=None):
+    """把HTML中的资源引用替换为 mapping 中的文件名（资源名 -> 带哈希的文件名）"""
+    pattern = pattern or _reference_pattern(mapping)
+
+    def replace(match):
+        name = _HASH_PART.sub('', match.group(1))
+        return mapping.get(name, match.group(0))
+
+    return pattern.sub(replace, html)
+
+
+def fingerprint_assets(build_dir, root='.'):
+    """
+    生成带哈希的资源副本并更新所有HTML中的引用，写入的文件追加到 .build/changed-files.txt
+    返回 资源名 -> 带哈希的文件名；资源文件不存在时跳过该资源
+    """
+    manifest_path = os.path.join(build_dir, MANIFEST_FILE)
+    records = _load_manifest(manifest_path)
+    mapping = {}
+    written = []
+
+    for name in ASSETS:
+        path = os.path.join(root, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            print(f"警告: 资源文件不存在，跳过 {path}")
+            continue
+        target = fingerprinted_name(name, content_hash(data))
+        record = records.get(name, {})
+        previous = [old for old in [record.get('file')] + record.get('previous', []) if old and old != target]
+        records[name] = {'file': target, 'previous': previous[:KEEP_VERSIONS]}
+        mapping[name] = target
+
+        if save_bytes(os.path.join(root, target), data):
+            written.append(os.path.join(root, target))
+        _remove_old_versions(name, {target, *records[name]['previous']}, root)
+
+    # 引用只替换文件名部分，../styles.css、/styles.css 等路径前缀保持不变
+    pattern = _reference_pattern(ASSETS)
+    updated = []
+    for path in find_html(root):
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            html = data.decode('utf-8')
+        except UnicodeDecodeError:
+            print(f"警告: 不是UTF-8编码，跳过 {path}")
+            continue
+        if save_bytes(path, rewrite_references(html, mapping, pattern).encode('utf-8')):
+            updated.append(path)
+
+    _save_manifest(manifest_path, records)
+    record_changed_files(build_dir, written + updated)
+    print(f"   资源: {', '.join(f'{name} → {target}' for name, target in mapping.items())}")
+    print(f"   更新引用: {len(updated)} 个HTML文件")
+    return mapping
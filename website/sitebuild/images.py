@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+响应式图片
+Markdown正文引用的每张图片（如 /assets/Screenshots/PC/xxx.png）在构建时读取一次：
+  - 记录原图尺寸，<img> 输出 width/height（图片加载前就预留好位置，页面不再跳动）和 loading="lazy"
+  - 生成多个宽度的 WebP（可选 AVIF）变体，输出为 <picture> + srcset/sizes，手机只下载适合屏幕的小图
+
+变体按原图内容哈希和宽度命名（assets/responsive/<哈希>-<宽度>.webp），文件已存在时直接复用；
+原图内容变化后旧哈希的变体自动删除。每张原图的签名（修改时间+大小）、哈希、尺寸和变体记录在
+.build/images-manifest.json，签名未变化的原图不再读取。
+
+Pillow 是可选依赖（pip install Pillow），未安装时从文件头读取尺寸（PNG/GIF/WebP/JPEG），
+只输出 width/height 和 loading="lazy"，已生成的变体仍然使用。
+"""
+
+import io
+import json
+import os
+import re
+import struct
+from urllib.parse import unquote
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.manifest import content_hash, json_hash
+from sitebuild.parallel import run_ordered, worker_count
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'images-manifest.json'
+
+# 变体输出目录（相对网站根目录，随网站一起部署）
+VARIANT_DIR = 'assets/responsive'
+VARIANT_WIDTHS = (480, 960, 1440)
+# 正文区域最宽约800px，窄屏时占满屏幕
+IMAGE_SIZES = '(max-width: 900px) 100vw, 800px'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+# 变体格式（按 <source> 的优先顺序）-> (Pillow格式名, 编码参数)
+VARIANT_FORMATS = {
+    'avif': ('AVIF', {'quality': 60}),
+    'webp': ('WEBP', {'quality': 80}),
+}
+
+# Markdown中的图片引用（与 sitebuild.markdown 的行内图片语法一致）
+_IMAGE_REF = re.compile(r'!\[.*?\]\((.*?)\)')
+_VARIANT_NAME = re.compile(r'^([0-9a-f]{16})-\d+\.(?:avif|webp)$')
+# JPEG中带尺寸的帧头（SOF0~SOF15，不含 DHT/JPG/DAC）
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def avif_supported():
+    """当前Pillow能否编码AVIF"""
+    return Image is not None and features.check('avif')
+
+
+def image_key(src):
+    """
+    图片引用 -> 站点内的文件路径（相对网站根目录，/ 分隔），外部图片或不支持的格式返回None
+    /assets/a.png、assets/a.png、../assets/a.png 都对应 assets/a.png
+    """
+    if src.startswith(('http://', 'https://', '//', 'data:')):
+        return None
+    path = unquote(src.split('#', 1)[0].split('?', 1)[0])
+    while path.startswith(('/', '../')):
+        path = path[1:] if path.startswith('/') else path[3:]
+    if not path.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def variant_path(digest, width, fmt):
+    """变体文件路径（相对网站根目录）"""
+    return f'{VARIANT_DIR}/{digest}-{width}.{fmt}'
+
+
+def variant_widths(width):
+    """需要生成的变体宽度（不超过原图宽度）"""
+    return sorted({min(w, width) for w in VARIANT_WIDTHS})
+
+
+def _jpeg_size(f):
+    """逐段跳过JPEG的标记段，读取帧头中的尺寸"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker in _JPEG_SOF:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(struct.unpack('>H', length)[0] - 2, os.SEEK_CUR)
+
+
+def image_size(path):
+    """
+    从文件头读取图片尺寸 (宽, 高)，无法识别时返回None（不需要Pillow）
+    注意：不处理JPEG的EXIF旋转，安装Pillow后以旋转后的尺寸为准
+    """
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+        if head[:2] == b'\xff\xd8':
+            return _jpeg_size(f)
+    return None
+
+
+def _open_image(data):
+    """用Pillow打开图片：按EXIF方向旋转（旋转后的尺寸才是浏览器显示的尺寸），转换为可编码的颜色模式"""
+    image = Image.open(io.BytesIO(data))
+    animated = getattr(image, 'is_animated', False)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    image.info['animated'] = animated
+    return image
+
+
+def _encode_variant(image, width, fmt):
+    """把原图缩放到指定宽度并编码"""
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+    pillow_format, params = VARIANT_FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **params)
+    return buffer.getvalue()
+
+
+def process_image(task):
+    """
+    读取一张原图，补齐缺少的变体（可在工作进程中执行）
+    task: (图片路径, 上次的记录或None, 变体格式列表)
+    返回 (新记录, 写入的文件列表)，图片无法识别时记录为None
+    """
+    path, previous, formats = task
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    written = []
+
+    image = None
+    if previous and previous.get('hash') == digest:
+        # 内容没变（只是修改时间变了），沿用记录的尺寸
+        size = (previous['width'], previous['height'])
+    elif Image is not None:
+        try:
+            image = _open_image(data)
+            size = image.size
+        except (OSError, ValueError) as e:
+            print(f"警告: 无法读取图片 {path}: {e}")
+            return None, written
+    else:
+        size = image_size(path)
+        if size is None:
+            print(f"警告: 无法识别图片尺寸 {path}")
+            return None, written
+
+    width, height = size
+    variants = {}
+    for fmt in formats:
+        widths = []
+        for variant_width in variant_widths(width):
+            variant = variant_path(digest, variant_width, fmt)
+            if not os.path.exists(variant):
+                if Image is None:
+                    # 没有Pillow时无法生成，只使用已有的变体
+                    continue
+                if image is None:
+                    image = _open_image(data)
+                if image.info.get('animated'):
+                    # 动图不生成静态变体
+                    continue
+                save_bytes(variant, _encode_variant(image, variant_width, fmt))
+                written.append(variant)
+            widths.append(variant_width)
+        if widths:
+            variants[fmt] = widths
+
+    if written:
+        print(f"  ✓ 图片变体: {path}（{width}×{height}，生成 {len(written)} 个）")
+    return {'hash': digest, 'width': width, 'height': height, 'variants': variants}, written
+
+
+class ImageCatalog:
+    """Markdown引用的图片：站点内路径 -> {hash, width, height, variants: {格式: [宽度]}}"""
+
+    def __init__(self, build_dir, avif=False):
+        self.build_dir = build_dir
+        self.manifest_path = os.path.join(build_dir, MANIFEST_FILE)
+        self.formats = ['webp']
+        if avif:
+            if avif_supported():
+                self.formats.insert(0, 'avif')
+            else:
+                print("警告: 当前Pillow不支持AVIF编码，只生成WebP变体")
+        self.records = {}
+        self.refs = {}        # Markdown源文件 -> 引用的图片路径列表
+        self.hash = None      # 所有记录的哈希（Markdown片段缓存的一部分）
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.records = data.get('images', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"警告: 图片记录无法读取，将重新读取所有图片 {self.manifest_path}: {e}")
+
+    def _options(self):
+        return {'formats': self.formats, 'pillow': Image is not None}
+
+    def _is_fresh(self, record, stat):
+        """原图签名和生成选项都与上次相同，且变体都还在"""
+        return (record is not None and record.get('stat') == stat and record.get('options') == self._options()
+                and all(os.path.exists(variant_path(record['hash'], width, fmt))
+                        for fmt, widths in record.get('variants', {}).items() for width in widths))
+
+    def scan(self, content_files):
+        """找出Markdown源文件引用的本地图片"""
+        self.refs = {}
+        for content_file in content_files:
+            try:
+                with open(content_file, 'r', encoding='utf-8') as f:
+                    sources = _IMAGE_REF.findall(f.read())
+            except (OSError, ValueError):
+                continue
+            keys = [key for key in map(image_key, sources) if key and os.path.isfile(key)]
+            self.refs[content_file] = list(dict.fromkeys(keys))
+
+    def update(self, content_files, jobs):
+        """读取变化的图片并补齐变体，返回写入的文件列表"""
+        self.scan(content_files)
+        paths = sorted({key for keys in self.refs.values() for key in keys})
+        stats = {}
+        tasks = []
+        for path in paths:
+            st = os.stat(path)
+            stats[path] = [st.st_mtime_ns, st.st_size]
+            record = self.records.get(path)
+            if not self._is_fresh(record, stats[path]):
+                previous = record if record and record.get('options') == self._options() else None
+                tasks.append((path, previous, self.formats))
+
+        written = []
+        processed = 0
+        for (path, _, _), ((record, files), output) in zip(tasks, run_ordered(process_image, tasks, jobs)):
+            if output:
+                print(output, end='')
+            written.extend(files)
+            if record is None:
+                self.records.pop(path, None)
+                continue
+            record['stat'] = stats[path]
+            record['options'] = self._options()
+            self.records[path] = record
+            processed += 1
+
+        # 原图已删除的记录；不再被任何记录引用的变体（原图内容变化前的旧哈希）
+        for path in [path for path in self.records if not os.path.isfile(path)]:
+            del self.records[path]
+        self._remove_stale_variants()
+
+        self.hash = json_hash({path: self._public(record) for path, record in self.records.items()})
+        self._save()
+        record_changed_files(self.build_dir, written)
+
+        variant_count = sum(len(widths) for path in paths if path in self.records
+                            for widths in self.records[path]['variants'].values())
+        print(f"   图片: {len(paths)} 张（读取 {processed} 张，{worker_count(jobs, len(tasks))} 个进程），"
+              f"变体 {variant_count} 个（本次生成 {len(written)} 个）")
+        if Image is None:
+            print("   提示: 未安装 Pillow（pip install Pillow），只输出图片尺寸，不生成 WebP 变体")
+        return written
+
+    def _remove_stale_variants(self):
+        if not os.path.isdir(VARIANT_DIR):
+            return
+        digests = {record['hash'] for record in self.records.values()}
+        for filename in os.listdir(VARIANT_DIR):
+            match = _VARIANT_NAME.match(filename)
+            if match and match.group(1) not in digests:
+                os.remove(os.path.join(VARIANT_DIR, filename))
+
+    @staticmethod
+    def _public(record):
+        """影响页面输出的字段（不含签名）"""
+        return {key: record[key] for key in ('hash', 'width', 'height', 'variants')}
+
+    def get(self, src):
+        """Markdown中的图片引用 -> 图片记录，不是本地图片或未记录时返回None"""
+        key = image_key(src)
+        return self.records.get(key) if key else None
+
+    def paths(self):
+        """引用的图片文件（监听模式使用）"""
+        return sorted({key for keys in self.refs.values() for key in keys})
+
+    def dependency_hash(self, content_file):
+        """Markdown源文件引用的图片的哈希（页面依赖）"""
+        keys = self.refs.get(content_file, [])
+        return json_hash({key: self._public(self.records[key]) for key in keys if key in self.records})
+
+    def _save(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'images': self.records}, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+列表页数据分片
+guides.html / diary.html 原来每次访问都带时间戳请求完整的 guides-data.json / diary-data.json，
+响应不能被缓存，体积还随文章数线性增长。构建时为每个集合生成：
+    data/<集合>/index.json                  第一页卡片、文章总数和后续分页的文件名（体积小，每次向服务器确认）
+    data/<集合>/page-<n>.<哈希>.json        第n页卡片（n 从 2 开始），列表滚动到底部时再加载
+    data/<集合>/articles/<ID>.<哈希>.json   单篇文章的完整数据（卡片的 detail 字段是它的文件名）
+卡片只保留列表需要的字段（CARD_FIELDS），按日期倒序排列（与列表页原来在浏览器中的排序一致）。
+带哈希的文件内容永远不变，可以长期缓存；内容未变化的文件不重写，不再引用的旧文件删除。
+"""
+
+import json
+import os
+import re
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.manifest import content_hash
+
+INDEX_VERSION = 1
+DATA_DIR = 'data'
+INDEX_FILE = 'index.json'
+ARTICLES_DIR = 'articles'
+PAGE_SIZE = 12
+
+# 列表卡片用到的字段（其余字段只在单篇文章数据中）
+CARD_FIELDS = ('id', 'title', 'description', 'cover', 'date', 'type', 'category', 'tags', 'readTime', 'duration')
+
+_PAGE_NAME = re.compile(r'^page-\d+\.[0-9a-f]{8}\.json$')
+_DETAIL_NAME = re.compile(r'^.+\.[0-9a-f]{8}\.json$')
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _hashed_name(stem, data):
+    return f'{stem}.{content_hash(data)[:8]}.json'
+
+
+def sort_articles(articles):
+    """按日期倒序（最新的在前），日期相同时保持数据文件中的顺序"""
+    return sorted(articles, key=lambda article: article.get('date') or '', reverse=True)
+
+
+def card(article, detail):
+    """文章 -> 列表卡片（只含 CARD_FIELDS 中存在的字段）"""
+    entry = {field: article[field] for field in CARD_FIELDS if field in article}
+    entry['detail'] = detail
+    return entry
+
+
+def _remove_stale(directory, pattern, keep):
+    for filename in os.listdir(directory):
+        if pattern.match(filename) and filename not in keep:
+            os.remove(os.path.join(directory, filename))
+
+
+def build_list_data(build_dir, collection, articles, root='.'):
+    """
+    生成一个集合的列表数据分片，写入的文件追加到 .build/changed-files.txt
+    返回写入的文件列表
+    """
+    output_dir = os.path.join(root, DATA_DIR, collection.name)
+    articles_dir = os.path.join(output_dir, ARTICLES_DIR)
+    written = []
+
+    def save(path, data):
+        if save_bytes(path, data):
+            written.append(path)
+
+    cards = []
+    details = set()
+    for article in sort_articles(articles):
+        if not article.get('id'):
+            continue
+        data = _dumps(article)
+        name = _hashed_name(article['id'], data)
+        details.add(name)
+        save(os.path.join(articles_dir, name), data)
+        cards.append(card(article, f'{ARTICLES_DIR}/{name}'))
+
+    pages = []
+    for start in range(PAGE_SIZE, len(cards), PAGE_SIZE):
+        data = _dumps({'articles': cards[start:start + PAGE_SIZE]})
+        name = _hashed_name(f'page-{len(pages) + 2}', data)
+        pages.append(name)
+        save(os.path.join(output_dir, name), data)
+
+    index = {'version': INDEX_VERSION, 'total': len(cards), 'pageSize': PAGE_SIZE,
+             'articles': cards[:PAGE_SIZE], 'pages': pages}
+    save(os.path.join(output_dir, INDEX_FILE), _dumps(index))
+
+    os.makedirs(articles_dir, exist_ok=True)
+    _remove_stale(output_dir, _PAGE_NAME, set(pages))
+    _remove_stale(articles_dir, _DETAIL_NAME, details)
+
+    record_changed_files(build_dir, written)
+    print(f"   {collection.label}: {len(cards)} 篇，{len(pages) + 1} 页（每页 {PAGE_SIZE} 篇），写入 {len(written)} 个文件")
+    return written
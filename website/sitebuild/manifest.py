@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+构建清单（增量构建依赖记录）
+为每个输出页面记录其依赖内容的哈希：JSON条目、Markdown源文件、模板、嵌入的相关文章、正文图片、生成器代码。
+再次构建时只有依赖哈希发生变化（或输出文件丢失）的页面才需要重新生成。
+
+同时记录每个输出页面的内容哈希和内容最后一次真正变化的时间（sitemap 的 lastmod），
+以及写入后的文件签名（修改时间+大小），用于发现生成后被手动修改过的页面。
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+# 依赖项名称 -> 变更原因说明
+DEPENDENCY_LABELS = {
+    'entry': '数据条目变更',
+    'source': 'Markdown变更',
+    'template': '模板变更',
+    'related': '相关文章变更',
+    'overrides': 'SEO信息变更',
+    'images': '图片变更',
+    'generator': '生成器或生成选项变更',
+}
+
+
+def content_hash(data):
+    """计算内容哈希（字符串按UTF-8编码）"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def json_hash(obj):
+    """计算JSON对象的哈希（键排序，保证与字段顺序无关）"""
+    return content_hash(json.dumps(obj, sort_keys=True, ensure_ascii=False))
+
+
+def file_hash(filepath):
+    """计算文件内容哈希，文件不存在时返回None"""
+    try:
+        with open(filepath, 'rb') as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
+
+
+def text_file_hash(filepath):
+    """按文本读取文件并计算哈希（与写入前的字符串哈希一致，不受换行符转换影响），文件不存在时返回None"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return content_hash(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def generator_hash(*paths):
+    """计算生成器代码的哈希（脚本本身及 sitebuild 模块），代码变化时所有页面都需要重新生成"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    files = list(paths) + sorted(
+        os.path.join(package_dir, name) for name in os.listdir(package_dir) if name.endswith('.py')
+    )
+    return json_hash([file_hash(path) for path in files])
+
+
+class BuildManifest:
+    """构建清单：输出页面路径 -> 依赖哈希；输出页面路径 -> 内容哈希和最后变化时间"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.outputs = {}
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.pages = data.get('pages', {})
+                self.outputs = data.get('outputs', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"警告: 构建清单无法读取，将重新生成所有页面 {path}: {e}")
+
+    def dirty_reason(self, output_path, dependencies):
+        """
+        判断页面是否需要重新生成
+        返回变更原因（字符串），无需重新生成时返回None
+        """
+        if not os.path.exists(output_path):
+            return '输出文件不存在'
+        recorded = self.pages.get(output_path)
+        if recorded is None:
+            return '无构建记录'
+        for key, value in dependencies.items():
+            if recorded.get(key) != value:
+                return DEPENDENCY_LABELS.get(key, f'{key}变更')
+        return None
+
+    def record(self, output_path, dependencies):
+        """记录页面本次生成时的依赖哈希"""
+        if self.pages.get(output_path) != dependencies:
+            self.pages[output_path] = dependencies
+            self._dirty = True
+
+    def record_output(self, output_path, digest, timestamp):
+        """
+        记录输出内容的哈希，内容与上次不同时把最后变化时间设为 timestamp
+        没有记录时与磁盘上的现有文件比较（现有文件内容相同则最后变化时间未知，记为None）
+        返回内容是否发生变化
+        """
+        previous = self.outputs.get(output_path)
+        if previous is None:
+            previous = {'hash': text_file_hash(output_path), 'lastmod': None}
+        if previous['hash'] == digest:
+            if output_path not in self.outputs:
+                self.outputs[output_path] = previous
+                self._dirty = True
+            return False
+        self.outputs[output_path] = {'hash': digest, 'lastmod': timestamp}
+        self._dirty = True
+        return True
+
+    def modified_externally(self, output_path):
+        """输出文件是否在上次生成后被修改过（没有记录签名时也视为修改过，需要检查一次）"""
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return False
+        return self.outputs.get(output_path, {}).get('stat') != [st.st_mtime_ns, st.st_size]
+
+    def record_stat(self, output_path):
+        """记录输出文件当前的签名（写入或检查之后调用）"""
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return
+        record = self.outputs.get(output_path)
+        if record is None:
+            record = self.outputs[output_path] = {'hash': text_file_hash(output_path), 'lastmod': None}
+        if record.get('stat') != [st.st_mtime_ns, st.st_size]:
+            record['stat'] = [st.st_mtime_ns, st.st_size]
+            self._dirty = True
+
+    def lastmod(self, output_path):
+        """输出内容最后一次变化的时间，未知时返回None"""
+        return self.outputs.get(output_path, {}).get('lastmod')
+
+    def prune(self, output_paths):
+        """移除不再生成的页面记录"""
+        keep = set(output_paths)
+        for records in (self.pages, self.outputs):
+            for path in list(records):
+                if path not in keep:
+                    del records[path]
+                    self._dirty = True
+
+    def save(self):
+        """保存构建清单（先写临时文件再替换，避免中断时留下半个文件）"""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'pages': self.pages, 'outputs': self.outputs},
+                      f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
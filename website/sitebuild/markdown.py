@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+单遍扫描的 Markdown 转换器
+输出与旧版 markdown_to_html（多轮 re.sub + 占位符 + 逐行表格处理）保持一致，
+但整篇文档只从头到尾扫描一次：
+  1. 块级：按行推进，依次识别代码块、表格、列表、标题、引用、段落
+  2. 行内：每行用一个组合正则从左到右识别粗体、行内代码、图片、链接
+
+与旧版的差异：代码块内容会被转义后输出（旧版恢复占位符时丢失了代码内容，只输出空的 <pre><code></code></pre>）
+"""
+
+import html
+import re
+
+from sitebuild.images import IMAGE_SIZES, VARIANT_FORMATS, variant_path
+
+# 代码块：```语言\n ... ```（与旧版一致，不要求独占一行）
+_FENCE_PATTERN = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+
+# 表格：表头行、分隔行、至少一行数据行，支持引用块内的表格（每行可能以 > 开头）
+_TABLE_PATTERN = re.compile(
+    r'(?:^> )?\|.+\|\s*\n(?:^> )?\|[:\-| ]+\|\s*\n(?:(?:^> )?\|.+\|\s*\n?)+',
+    re.MULTILINE
+)
+
+# 行内元素：代码块引用 | 粗体 | 行内代码 | 图片 | 链接
+_INLINE_PATTERN = re.compile(
+    r'\x00(\d+)\x00'
+    r'|\*\*(.*?)\*\*'
+    r'|`(.*?)`'
+    r'|!\[(.*?)\]\((.*?)\)'
+    r'|\[(.*?)\]\((.*?)\)'
+)
+
+# 行内元素可能的起始字符，不含这些字符的文本无需扫描
+_INLINE_TRIGGER = re.compile(r'[*`\[\x00]')
+
+_HEADINGS = (('### ', 'h3'), ('## ', 'h2'), ('# ', 'h1'))
+
+# 表格和图片的样式在详情页模板的 <style> 中定义（.md-table / .md-img），
+# 不再在每个单元格和图片上重复内联样式
+TABLE_CLASS = 'md-table'
+IMAGE_CLASS = 'md-img'
+
+
+def _split_cells(line):
+    """提取单元格（| col1 | col2 |，分割后过滤空字符串）"""
+    return [cell for cell in (c.strip() for c in line.split('|')) if cell]
+
+
+def _is_table_line(line_stripped):
+    """逐行表格识别：去掉引用前缀后以 | 开头且至少两个 |"""
+    if line_stripped.startswith('> '):
+        line_stripped = line_stripped[2:].strip()
+    return line_stripped.startswith('|') and line_stripped.count('|') >= 2
+
+
+class MarkdownRenderer:
+    """
+    Markdown 渲染器
+    image_path_mode: 'absolute'（服务器部署，图片路径补全为 / 开头）或 'relative'（本地预览）
+    html_relative_path: HTML文件相对于网站根目录的路径（如 'diary/'），relative 模式下用于计算 ../ 前缀
+    images: 图片记录（sitebuild.images.ImageCatalog），有记录的图片输出尺寸、懒加载和响应式变体
+    """
+
+    def __init__(self, image_path_mode='absolute', html_relative_path='', images=None):
+        self.image_path_mode = image_path_mode
+        self.html_relative_path = html_relative_path
+        self.images = images
+
+    def render(self, markdown_text):
+        code_blocks = []
+        text = self._extract_code_blocks(markdown_text, code_blocks)
+        self._code_blocks = code_blocks
+
+        result = []
+        in_list = False
+        pos = 0
+        end = len(text)
+
+        while pos < end:
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = end
+            line = text[pos:line_end]
+            line_stripped = line.strip()
+
+            # 空行结束列表
+            if not line_stripped:
+                if in_list:
+                    result.append('</ul>')
+                    in_list = False
+                pos = line_end + 1
+                continue
+
+            # 完整表格（表头 + 分隔行 + 数据行）
+            table = self._match_table(text, pos, line)
+            if table:
+                if in_list:
+                    result.append('</ul>')
+                    in_list = False
+                prefix, table_html, pos = table
+                result.append(self._inline(prefix) + table_html)
+                continue
+
+            # 逐行表格（连续的 | 行，第二行视为分隔行）
+            if _is_table_line(line_stripped):
+                table_html, next_pos = self._collect_table_lines(text, pos)
+                if table_html:
+                    if in_list:
+                        result.append('</ul>')
+                        in_list = False
+                    result.append(table_html)
+                    pos = next_pos
+                    continue
+
+            pos = line_end + 1
+
+            # 列表项
+            if line_stripped.startswith('- '):
+                if not in_list:
+                    result.append('<ul>')
+                    in_list = True
+                result.append(f'<li>{self._inline(line_stripped[2:].strip())}</li>')
+                continue
+
+            if in_list:
+                result.append('</ul>')
+                in_list = False
+            result.append(self._render_line(line, line_stripped))
+
+        if in_list:
+            result.append('</ul>')
+
+        self._code_blocks = None
+        return '\n'.join(line for line in result if line is not None)
+
+    def _render_line(self, line, line_stripped):
+        """渲染单行块级元素（标题、引用、图片行、原样HTML、段落）"""
+        for marker, tag in _HEADINGS:
+            if line.startswith(marker):
+                return f'<{tag}>{self._inline(line[len(marker):])}</{tag}>'
+
+        if line.startswith('> '):
+            content = line[2:]
+            if not (content.strip().startswith('|') and '|' in content):
+                return f'<blockquote>{self._inline(content)}</blockquote>'
+
+        rendered, has_image = self._inline(line, with_flags=True)
+        if has_image:
+            # 含图片的行不包裹段落
+            return rendered
+
+        if (line_stripped.startswith('<pre>') or line_stripped.startswith('<blockquote>')
+                or line_stripped.startswith('<table>') or line_stripped.startswith('\x00')):
+            return rendered
+        if line_stripped.startswith('|'):
+            # 孤立的表格行，丢弃
+            return None
+        return f'<p>{rendered.strip()}</p>'
+
+    def _extract_code_blocks(self, text, code_blocks):
+        """把代码块替换为 \\x00序号\\x00 记号，代码内容单独保存"""
+        if '```' not in text:
+            return text
+        parts = []
+        pos = 0
+        for match in _FENCE_PATTERN.finditer(text):
+            parts.append(text[pos:match.start()])
+            parts.append(f'\x00{len(code_blocks)}\x00')
+            code_blocks.append(match.group(2))
+            pos = match.end()
+        parts.append(text[pos:])
+        return ''.join(parts)
+
+    def _match_table(self, text, pos, line):
+        """尝试从当前行匹配完整表格，返回(前缀, 表格HTML, 结束位置)"""
+        if line.startswith('> |'):
+            start = pos
+        else:
+            pipe = line.find('|')
+            if pipe == -1:
+                return None
+            start = pos + pipe
+        match = _TABLE_PATTERN.match(text, start)
+        if not match:
+            return None
+
+        rows = []
+        for row in match.group(0).split('\n'):
+            row = row.strip()
+            if not row:
+                continue
+            if row.startswith('> '):
+                row = row[2:].strip()
+            rows.append(row)
+
+        table_html = self._table_html(rows)
+        if table_html is None:
+            return None
+
+        # 表格末尾的空白（包括空行）一并被吞掉，从结束位置继续扫描
+        return text[pos:start], table_html, match.end()
+
+    def _collect_table_lines(self, text, pos):
+        """逐行收集连续的表格行，返回(表格HTML, 结束位置)"""
+        rows = []
+        end = len(text)
+        while pos < end:
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = end
+            line_stripped = text[pos:line_end].strip()
+            if not _is_table_line(line_stripped):
+                break
+            # 下一处完整表格优先
+            if rows and self._match_table(text, pos, text[pos:line_end]):
+                break
+            if line_stripped.startswith('> '):
+                line_stripped = line_stripped[2:].strip()
+            rows.append(line_stripped)
+            pos = line_end + 1
+
+        if len(rows) < 2:
+            return None, pos
+        return self._table_html(rows), pos
+
+    def _table_html(self, rows):
+        """根据表格行生成HTML（第一行表头，第二行分隔符跳过）"""
+        header_cells = _split_cells(rows[0])
+        if not header_cells:
+            return None
+
+        inline = self._inline
+        parts = [f'<table class="{TABLE_CLASS}"><thead><tr>']
+        for cell in header_cells:
+            parts.append(f'<th>{inline(cell)}</th>')
+        parts.append('</tr></thead><tbody>')
+
+        column_count = len(header_cells)
+        for row in rows[2:]:
+            cells = _split_cells(row)
+            if not cells:
+                continue
+            # 如果列数不匹配，补齐或截断
+            cells = (cells + [''] * column_count)[:column_count]
+            parts.append('<tr>')
+            for cell in cells:
+                parts.append(f'<td>{inline(cell)}</td>')
+            parts.append('</tr>')
+        parts.append('</tbody></table>')
+        return ''.join(parts)
+
+    def _image_path(self, img_path):
+        """根据图片路径模式转换图片路径"""
+        if self.image_path_mode == 'relative' and self.html_relative_path:
+            # 相对路径模式：用于本地预览
+            if img_path.startswith('/'):
+                depth = self.html_relative_path.count('/') + self.html_relative_path.count('\\')
+                if depth > 0:
+                    img_path = '../' * depth + img_path[1:]
+        elif not img_path.startswith('/') and not img_path.startswith('http'):
+            # 绝对路径模式：用于服务器部署（默认），确保路径以 / 开头
+            img_path = '/' + img_path
+        return img_path
+
+    def _image_html(self, src, alt):
+        """
+        图片HTML：有图片记录时补充 width/height 和懒加载，
+        有WebP/AVIF变体时包裹为 <picture>（不支持的浏览器使用原图）
+        """
+        img = f'<img src="{self._image_path(src)}" alt="{alt}" class="{IMAGE_CLASS}"'
+        record = self.images.get(src) if self.images else None
+        if record is None:
+            return img + '>'
+
+        img += f' width="{record["width"]}" height="{record["height"]}" loading="lazy" decoding="async">'
+        sources = []
+        for fmt in VARIANT_FORMATS:
+            widths = record['variants'].get(fmt)
+            if widths:
+                srcset = ', '.join(f'{self._image_path("/" + variant_path(record["hash"], width, fmt))} {width}w'
+                                   for width in widths)
+                sources.append(f'<source type="image/{fmt}" srcset="{srcset}" sizes="{IMAGE_SIZES}">')
+        if not sources:
+            return img
+        return f'<picture>{"".join(sources)}{img}</picture>'
+
+    def _inline(self, text, with_flags=False):
+        """行内元素渲染（单次从左到右扫描）"""
+        has_image = False
+        if not text or not _INLINE_TRIGGER.search(text):
+            return (text, False) if with_flags else text
+
+        out = []
+        pos = 0
+        for match in _INLINE_PATTERN.finditer(text):
+            out.append(text[pos:match.start()])
+            pos = match.end()
+            code_index, bold, code, alt, src, link_text, href = match.groups()
+            if code_index is not None:
+                body = self._code_blocks[int(code_index)].rstrip()
+                out.append(f'<pre><code>{html.escape(body, quote=False)}</code></pre>')
+            elif bold is not None:
+                out.append(f'<strong>{self._inline(bold)}</strong>')
+            elif code is not None:
+                out.append(f'<code>{code}</code>')
+            elif alt is not None:
+                has_image = True
+                out.append(self._image_html(src, self._inline(alt)))
+            else:
+                out.append(f'<a href="{href}">{self._inline(link_text)}</a>')
+        out.append(text[pos:])
+        rendered = ''.join(out)
+        return (rendered, has_image) if with_flags else rendered
+
+
+def markdown_to_html(markdown_text, html_relative_path='', image_path_mode='absolute', images=None):
+    """Markdown到HTML转换（单遍扫描版）"""
+    return MarkdownRenderer(image_path_mode, html_relative_path, images).render(markdown_text)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+生成页面的精简（HTML / 内联CSS / JSON-LD）
+- HTML：删除注释（条件注释除外），把连续空白合并为一个空格，块级元素之间的空白直接删除
+- <style>：删除注释和多余空白
+- <script type="application/ld+json">：重新输出为紧凑的JSON
+- <pre> / <textarea> 原样保留，其他 <script> 只精简标签本身
+只依赖标准库，规则保守：精简前后页面的渲染结果相同。
+"""
+
+import json
+import re
+
+# 标签（属性值中可能含有 >）、注释，以及需要整体处理的原始文本元素
+_TAG = r'<[!/]?[a-zA-Z](?:"[^"]*"|\'[^\']*\'|[^\'">])*>'
+_TOKEN = re.compile(r'<!--.*?-->|<(pre|textarea|script|style)\b(?:"[^"]*"|\'[^\']*\'|[^\'">])*>.*?</\1\s*>|' + _TAG,
+                    re.IGNORECASE | re.DOTALL)
+_TAG_NAME = re.compile(r'<[!/]?([a-zA-Z0-9]+)')
+_RAW_PARTS = re.compile(r'^(<[^>]*>)(.*)(</[^>]*>)$', re.DOTALL)
+_ATTRIBUTE_TOKEN = re.compile(r'"[^"]*"|\'[^\']*\'|\s+|[^\s"\']+', re.ASCII)
+# 只合并ASCII空白（&nbsp; 和全角空格是内容的一部分）
+_WHITESPACE = re.compile(r'[ \t\n\r\f]+')
+
+# 前后的空白不影响显示的元素（块级元素和 head 中的元素）
+_BLOCK_TAGS = frozenset([
+    'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style', 'noscript', 'doctype',
+    'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption', 'colgroup', 'col',
+    'section', 'article', 'header', 'footer', 'nav', 'main', 'aside', 'figure', 'figcaption',
+    'blockquote', 'pre', 'hr', 'br', 'form', 'fieldset', 'option', 'details', 'summary',
+])
+
+_CSS_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|\s+|[^"\'/\s]+|/', re.DOTALL | re.ASCII)
+# 这些字符两侧的空白可以删除（冒号只删后面的空白：选择器中 "a :hover" 与 "a:hover" 含义不同）
+_CSS_NO_SPACE_BEFORE = '{};,>'
+_CSS_NO_SPACE_AFTER = '{};,>:'
+
+
+def minify_css(css):
+    """精简CSS：删除注释和多余空白（字符串原样保留）"""
+    out = []
+    pending_space = False
+    for token in _CSS_TOKEN.findall(css):
+        if token.startswith('/*'):
+            pending_space = pending_space or bool(out)
+            continue
+        if token.isspace():
+            pending_space = bool(out)
+            continue
+        if pending_space and out[-1][-1] not in _CSS_NO_SPACE_AFTER and token[0] not in _CSS_NO_SPACE_BEFORE:
+            out.append(' ')
+        pending_space = False
+        if token[0] == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(token)
+    return ''.join(out)
+
+
+def _minify_json_ld(content):
+    """JSON-LD重新输出为紧凑格式，无法解析时只去掉首尾空白"""
+    try:
+        compact = json.dumps(json.loads(content), ensure_ascii=False, separators=(',', ':'))
+    except ValueError:
+        return content.strip()
+    # 字符串中还原出的 </ 会提前结束 <script>，这种情况保留原文
+    return content.strip() if '</' in compact else compact
+
+
+def _minify_tag(tag):
+    """合并标签内属性之间的空白（属性值原样保留）"""
+    parts = [' ' if token.isspace() else token for token in _ATTRIBUTE_TOKEN.findall(tag[1:-1])]
+    inner = ''.join(parts).strip()
+    if inner.endswith(' /'):
+        inner = inner[:-2] + '/'
+    return f'<{inner}>'
+
+
+def _minify_raw(name, element):
+    """<pre>/<textarea>/<script>/<style> 元素：只按类型处理内容"""
+    match = _RAW_PARTS.match(element)
+    if not match:
+        return element
+    open_tag, content, close_tag = match.groups()
+    open_tag = _minify_tag(open_tag)
+    if name == 'style':
+        content = minify_css(content)
+    elif name == 'script':
+        if 'application/ld+json' in open_tag.lower():
+            content = _minify_json_ld(content)
+        elif not content.strip():
+            content = ''
+    return open_tag + content + close_tag
+
+
+def _tag_name(token):
+    match = _TAG_NAME.match(token)
+    return match.group(1).lower() if match else ''
+
+
+def minify_html(html):
+    """精简HTML页面"""
+    # 切分为 文本 / 标签 两类片段，删除的注释两侧的文本合并为一段
+    tokens = []
+    pos = 0
+
+    def add_text(text):
+        if tokens and tokens[-1][0] == 'text':
+            tokens[-1] = ('text', tokens[-1][1] + text)
+        else:
+            tokens.append(('text', text))
+
+    for match in _TOKEN.finditer(html):
+        add_text(html[pos:match.start()])
+        token = match.group(0)
+        pos = match.end()
+        if token.startswith('<!--'):
+            if token.startswith('<!--[if'):
+                tokens.append(('tag', token))
+            continue
+        if match.group(1):
+            tokens.append(('tag', _minify_raw(match.group(1).lower(), token)))
+        else:
+            tokens.append(('tag', _minify_tag(token)))
+    add_text(html[pos:])
+
+    out = []
+    for index, (kind, token) in enumerate(tokens):
+        if kind == 'tag':
+            out.append(token)
+            continue
+        text = _WHITESPACE.sub(' ', token)
+        # 紧挨块级元素（或页面开头/结尾）的空白不影响显示
+        before = tokens[index - 1][1] if index > 0 else None
+        after = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        if before is None or _tag_name(before) in _BLOCK_TAGS:
+            text = text.lstrip(' ')
+        if after is None or _tag_name(after) in _BLOCK_TAGS:
+            text = text.rstrip(' ')
+        out.append(text)
+    return ''.join(out)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+手动调整的SEO信息（title / description / keywords）
+直接在生成的HTML中修改过的SEO信息，第一次被发现时记录到集合的覆盖文件（如 guides-seo-overrides.json），
+以后每次构建只读取一次覆盖文件，生成页面时不再解析上一次生成的HTML。
+
+覆盖文件格式（保存的是未转义的纯文本）：
+    {"articles": {"文章ID": {"title": "<title>标签的完整文本", "description": "...", "keywords": "..."}}}
+删除某篇文章的条目（或某个字段）即可恢复使用JSON数据中的值。
+"""
+
+import html
+import json
+import os
+import re
+
+SEO_FIELDS = ('title', 'description', 'keywords')
+
+_TITLE = re.compile(r'<title>(.*?)</title>', re.DOTALL)
+_META = {
+    'description': re.compile(r'<meta\s+name=(["\'])description\1\s+content=(["\'])(.*?)\2'),
+    'keywords': re.compile(r'<meta\s+name=(["\'])keywords\1\s+content=(["\'])(.*?)\2'),
+}
+
+
+def extract_seo_meta(content):
+    """从HTML中提取 title / description / keywords（保持HTML转义后的原文），不存在的字段不返回"""
+    meta = {}
+    match = _TITLE.search(content)
+    if match:
+        meta['title'] = match.group(1)
+    for field, pattern in _META.items():
+        match = pattern.search(content)
+        if match:
+            meta[field] = match.group(3)
+    return meta
+
+
+def unescape_fully(text):
+    """
+    还原HTML转义
+    旧版本生成脚本每次构建都会把已转义的description再转义一次（&quot; -> &amp;quot; -> ...），
+    反复还原直到不再变化，才能得到原始文本
+    """
+    while True:
+        unescaped = html.unescape(text)
+        if unescaped == text:
+            return text
+        text = unescaped
+
+
+def apply_title(content, title):
+    """把页面的 <title> 替换为手动调整的标题"""
+    return _TITLE.sub(lambda _: f'<title>{title}</title>', content, count=1)
+
+
+class SeoOverrides:
+    """一个集合的SEO覆盖文件：文章ID -> {字段: 文本}"""
+
+    def __init__(self, path):
+        self.path = path
+        self.articles = {}
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.articles = json.load(f).get('articles', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"警告: SEO覆盖文件无法读取 {path}: {e}")
+
+    def get(self, article_id):
+        return self.articles.get(article_id, {})
+
+    def capture(self, article_id, detected):
+        """记录检测到的手动调整（与已记录的值相同的字段忽略），返回新记录的字段列表"""
+        current = self.articles.setdefault(article_id, {})
+        captured = [field for field in SEO_FIELDS if field in detected and current.get(field) != detected[field]]
+        for field in captured:
+            current[field] = detected[field]
+        if not current:
+            del self.articles[article_id]
+        if captured:
+            self._dirty = True
+        return captured
+
+    def save(self):
+        """保存覆盖文件（没有变化时不写入，没有任何覆盖时不创建文件）"""
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'articles': self.articles}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+多进程页面渲染
+把页面渲染分发到进程池，结果按提交顺序返回，保证输出文件和日志顺序与单进程一致。
+工作进程中的 print 输出会被收集，随结果一起交给主进程按顺序打印。
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 每个进程至少分到的任务数；页面很少时启动进程的开销比渲染本身还大
+MIN_TASKS_PER_WORKER = 8
+
+
+def default_jobs():
+    """默认并行数：CPU核心数"""
+    return os.cpu_count() or 1
+
+
+def worker_count(jobs, task_count):
+    """实际使用的进程数（1 表示在当前进程中执行）"""
+    by_tasks = (task_count + MIN_TASKS_PER_WORKER - 1) // MIN_TASKS_PER_WORKER
+    return max(1, min(jobs, by_tasks))
+
+
+def _call_captured(func, task):
+    """执行任务并收集其标准输出，返回(结果, 输出文本)"""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = func(task)
+    return result, buffer.getvalue()
+
+
+def run_ordered(func, tasks, jobs, initializer=None, initargs=()):
+    """
+    并行执行 func(task)，按 tasks 的顺序逐个返回 (结果, 输出文本)
+    func 和 initializer 必须是模块顶层函数（需要能被子进程导入）
+    jobs <= 1 或任务太少时直接在当前进程中执行
+    """
+    tasks = list(tasks)
+    workers = worker_count(jobs, len(tasks))
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        for task in tasks:
+            yield _call_captured(func, task)
+        return
+
+    # 每个进程一次领取多个任务，减少进程间通信次数
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        yield from executor.map(_call_captured, [func] * len(tasks), tasks, chunksize=chunksize)
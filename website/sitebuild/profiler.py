@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+构建性能分析（--profile）
+记录构建各阶段（读取JSON、编译模板、相关文章、Markdown、模板渲染、写入文件、sitemap……）
+和每个详情页的耗时与内存分配（tracemalloc），构建结束后打印各阶段汇总和最慢的页面，
+报告同时写入 .build/profile.json，便于比较不同版本的构建。
+指定 --profile-output 时再用 cProfile 记录函数级耗时，输出 pstats 文件：
+    python -m pstats profile.prof                 命令行查看
+    snakeviz profile.prof                         浏览器中查看（pip install snakeviz）
+    flameprof profile.prof > flame.svg            生成火焰图（pip install flameprof）
+
+代码中用 stage()/page() 标记要统计的范围；未启用分析时两者都是空操作，不影响正常构建。
+阶段可以嵌套，报告中按嵌套关系缩进显示。
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+import unicodedata
+
+REPORT_FILE = 'profile.json'
+
+# 当前的分析器（未启用时为 None）
+_profiler = None
+_NULL = contextlib.nullcontext()
+
+
+class BuildProfiler:
+    """一次构建的各阶段、各页面耗时和内存分配"""
+
+    def __init__(self, cprofile=False):
+        self.stages = {}
+        self.pages = []
+        self.total_seconds = 0.0
+        self.peak_bytes = 0
+        self._stack = []
+        # 每层正在统计的范围内观察到的内存峰值（tracemalloc 只有一个全局峰值，嵌套时逐层合并）
+        self._peaks = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started = None
+
+    def start(self):
+        tracemalloc.start()
+        # 最外层：整个构建期间的内存峰值
+        self._peaks = [0]
+        self._started = time.perf_counter()
+        if self._cprofile:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile:
+            self._cprofile.disable()
+        self.total_seconds = time.perf_counter() - self._started
+        self.peak_bytes = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def _measure(self):
+        """统计范围内的耗时、净分配（结束时比开始时多占用的内存）和峰值分配（相对开始时）"""
+        result = {}
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(current)
+        started = time.perf_counter()
+        try:
+            yield result
+        finally:
+            result['seconds'] = time.perf_counter() - started
+            end, peak = tracemalloc.get_traced_memory()
+            own_peak = max(self._peaks.pop(), peak)
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], own_peak)
+            tracemalloc.reset_peak()
+            result['net_bytes'] = end - current
+            result['peak_bytes'] = own_peak - current
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self._stack.append(name)
+        # 进入时登记，报告中外层阶段排在它包含的阶段之前
+        record = self.stages.setdefault(tuple(self._stack),
+                                        {'calls': 0, 'seconds': 0.0, 'net_bytes': 0, 'peak_bytes': 0})
+        try:
+            with self._measure() as result:
+                yield
+        finally:
+            self._stack.pop()
+            record['calls'] += 1
+            record['seconds'] += result['seconds']
+            record['net_bytes'] += result['net_bytes']
+            record['peak_bytes'] = max(record['peak_bytes'], result['peak_bytes'])
+
+    @contextlib.contextmanager
+    def page(self, path):
+        with self._measure() as result:
+            yield
+        self.pages.append(dict(result, path=path))
+
+    def print_report(self, top=10):
+        print(f"\n性能分析（总耗时 {self.total_seconds:.2f} 秒，内存峰值 {_format_bytes(self.peak_bytes)}）")
+        print(f"   {_ljust('阶段', 24)}{_rjust('次数', 6)}{_rjust('耗时(秒)', 10)}{_rjust('占比', 8)}"
+              f"{_rjust('净分配', 12)}{_rjust('峰值', 12)}")
+        for key, record in self.stages.items():
+            label = '  ' * (len(key) - 1) + key[-1]
+            share = record['seconds'] * 100 / self.total_seconds if self.total_seconds else 0
+            print(f"   {_ljust(label, 24)}{record['calls']:>6}{record['seconds']:>10.3f}{share:>7.1f}%"
+                  f"{_format_bytes(record['net_bytes']):>12}{_format_bytes(record['peak_bytes']):>12}")
+
+        if self.pages:
+            slowest = sorted(self.pages, key=lambda page: page['seconds'], reverse=True)[:top]
+            print(f"\n   最慢的 {len(slowest)} 个页面（共 {len(self.pages)} 个）:")
+            for page in slowest:
+                print(f"   {page['seconds'] * 1000:>9.1f} ms  峰值 {_format_bytes(page['peak_bytes']):>9}  {page['path']}")
+
+    def report(self):
+        return {
+            'total_seconds': self.total_seconds,
+            'peak_bytes': self.peak_bytes,
+            'stages': [dict(record, stage='/'.join(key)) for key, record in self.stages.items()],
+            'pages': self.pages,
+        }
+
+    def save_report(self, build_dir):
+        path = os.path.join(build_dir, REPORT_FILE)
+        os.makedirs(build_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        print(f"\n   分析报告: {path}")
+        return path
+
+    def dump_stats(self, path):
+        if self._cprofile:
+            self._cprofile.dump_stats(path)
+            print(f"   cProfile: {path}（python -m pstats {path}，或用 snakeviz/flameprof 查看）")
+
+
+def _width(text):
+    """终端中的显示宽度（中文占两列）"""
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+
+def _ljust(text, width):
+    return text + ' ' * max(0, width - _width(text))
+
+
+def _rjust(text, width):
+    return ' ' * max(0, width - _width(text)) + text
+
+
+def _format_bytes(size):
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    if size >= 1024 * 1024:
+        return f"{sign}{size / 1024 / 1024:.1f} MB"
+    return f"{sign}{size / 1024:.1f} KB"
+
+
+def enable(cprofile=False):
+    """启用分析并开始计时，返回分析器"""
+    global _profiler
+    _profiler = BuildProfiler(cprofile)
+    _profiler.start()
+    return _profiler
+
+
+def disable():
+    """停止分析，返回分析器（未启用时返回 None）"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler:
+        profiler.stop()
+    return profiler
+
+
+def stage(name):
+    """统计一个构建阶段（同名阶段累加）"""
+    return _profiler.stage(name) if _profiler else _NULL
+
+
+def page(path):
+    """统计一个详情页的渲染"""
+    return _profiler.page(path) if _profiler else _NULL
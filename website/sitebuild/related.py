@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+相关文章索引
+每次构建为每个集合建立一次：文章ID -> 文章的映射，详情页解析相关文章时直接查表。
+
+可选的自动推荐（--auto-related）：对标题、标签、描述和Markdown正文做TF-IDF，
+中文按相邻两字切分（二元组），英文/数字按单词切分，用余弦相似度为每篇文章选出最相似的K篇。
+JSON中手动填写的 related 优先，只有未填写的文章才使用自动推荐。
+每篇文章的词频按内容哈希缓存在 .build 目录，只有内容变化的文章才需要重新分词。
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from sitebuild.manifest import file_hash, json_hash
+
+CACHE_VERSION = 1
+
+# 各字段的权重（标题和标签最能代表主题）
+FIELD_WEIGHTS = (('title', 3), ('tags', 3), ('description', 2), ('body', 1))
+# 每篇文章只保留权重最高的若干词参与相似度计算，控制计算量
+MAX_TERMS_PER_ARTICLE = 64
+# 相似度低于该值的不推荐
+MIN_SIMILARITY = 0.05
+# 超过该比例的文章都包含的词几乎没有区分度，不参与计算（文章数较多时才生效）
+MAX_DOCUMENT_RATIO = 0.5
+MIN_ARTICLES_FOR_RATIO = 20
+# 每个词的倒排表只保留权重最高的若干篇，文章很多时避免常见词（如标签）的倒排表过长
+MAX_POSTINGS_PER_TERM = 256
+
+_CJK_RUN = re.compile(r'[一-鿿]+')
+_WORD = re.compile(r'[a-z0-9][a-z0-9.+#-]*[a-z0-9+#]|[a-z0-9]')
+# Markdown 中与主题无关的部分：代码块、图片、链接地址、HTML标签
+_MARKDOWN_NOISE = re.compile(r'```.*?```|!\[[^\]]*\]\([^)]*\)|\]\([^)]*\)|<[^>]+>', re.DOTALL)
+
+# 常见但没有区分度的二元组/单词
+STOP_TERMS = frozenset([
+    '我们', '你的', '我的', '可以', '一个', '这个', '进行', '没有', '什么', '如果', '因为', '所以',
+    '就是', '以及', '或者', '还是', '需要', '通过', '使用', '自己', '他们', '这些', '那些', '已经',
+    'the', 'and', 'for', 'with', 'to', 'of', 'in', 'a', 'is', 'on', 'by', 'md', 'html',
+])
+
+
+def tokenize(text):
+    """分词：中文二元组（单字成段时保留单字）+ 英文/数字单词，返回词频"""
+    terms = Counter()
+    if not text:
+        return terms
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            terms[run] += 1
+            continue
+        for i in range(len(run) - 1):
+            terms[run[i:i + 2]] += 1
+    for word in _WORD.findall(text.lower()):
+        terms[word] += 1
+    for term in STOP_TERMS.intersection(terms):
+        del terms[term]
+    return terms
+
+
+def article_terms(article, body):
+    """文章的加权词频（各字段词频乘以字段权重）"""
+    fields = {
+        'title': article.get('title', ''),
+        'tags': ' '.join(article.get('tags', [])),
+        'description': article.get('description', ''),
+        'body': _MARKDOWN_NOISE.sub(' ', body),
+    }
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term, count in tokenize(fields[field]).items():
+            terms[term] += count * weight
+    # 标签整体也作为一个词，完全相同的标签比共享二元组更有说服力
+    for tag in article.get('tags', []):
+        terms['#' + tag.lower()] += FIELD_WEIGHTS[1][1]
+    return terms
+
+
+class RelatedIndex:
+    """相关文章索引：文章ID -> 文章，以及自动推荐结果（文章ID -> 相关ID列表）"""
+
+    def __init__(self, articles, suggestions=None):
+        self.by_id = {article.get('id'): article for article in articles}
+        self.suggestions = suggestions or {}
+
+    def related_ids(self, article):
+        """文章的相关ID：手动填写的优先，未填写时使用自动推荐"""
+        return article.get('related') or self.suggestions.get(article.get('id'), [])
+
+    def related(self, article):
+        """解析相关文章，返回 [(ID, 文章或None)]（ID不存在时为None）"""
+        return [(related_id, self.by_id.get(related_id)) for related_id in self.related_ids(article)]
+
+
+def _load_cache(cache_path):
+    """读取缓存：{'articles': {ID: {'hash', 'terms'}}, 'corpus': 语料哈希, 'suggestions': 推荐结果}"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            return data
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"警告: 相关文章缓存无法读取，将重新计算 {cache_path}: {e}")
+    return {}
+
+
+def _save_cache(cache_path, data):
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(data, version=CACHE_VERSION), f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def term_vectors(articles, content_files, cache):
+    """计算每篇文章的词频（按内容哈希复用缓存），返回 ({ID: 缓存条目}, 重新分词的文章数)"""
+    cache = cache.get('articles', {})
+    entries = {}
+    computed = 0
+    for article in articles:
+        article_id = article.get('id')
+        if not article_id:
+            continue
+        content_file = content_files.get(article_id)
+        key = json_hash([article.get('title', ''), article.get('tags', []), article.get('description', ''),
+                         file_hash(content_file) if content_file else None])
+        cached = cache.get(article_id)
+        if cached and cached.get('hash') == key:
+            terms = cached['terms']
+        else:
+            body = ''
+            if content_file:
+                try:
+                    with open(content_file, 'r', encoding='utf-8') as f:
+                        body = f.read()
+                except OSError:
+                    pass
+            terms = dict(article_terms(article, body))
+            computed += 1
+        entries[article_id] = {'hash': key, 'terms': terms}
+    return entries, computed
+
+
+def suggest_related(articles, content_files, top_k, cache_path):
+    """
+    自动推荐相关文章
+    content_files: 文章ID -> Markdown源文件
+    返回 ({文章ID: [相关ID，按相似度降序]}, 重新分词的文章数)
+    """
+    cache = _load_cache(cache_path)
+    entries, computed = term_vectors(articles, content_files, cache)
+
+    # 所有文章都没有变化时直接复用上次的推荐结果
+    corpus = json_hash([top_k, sorted((article_id, entry['hash']) for article_id, entry in entries.items())])
+    if cache.get('corpus') == corpus:
+        return cache.get('suggestions', {}), computed
+
+    suggestions = _rank(entries, top_k)
+    _save_cache(cache_path, {'articles': entries, 'corpus': corpus, 'suggestions': suggestions})
+    return suggestions, computed
+
+
+def _rank(entries, top_k):
+    """TF-IDF + 余弦相似度，为每篇文章选出最相似的 top_k 篇"""
+    vectors = {article_id: entry['terms'] for article_id, entry in entries.items()}
+    count = len(vectors)
+    if count < 2:
+        return {}
+
+    # 文档频率 -> IDF
+    document_frequency = Counter()
+    for terms in vectors.values():
+        document_frequency.update(terms.keys())
+    idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+    max_df = count * MAX_DOCUMENT_RATIO if count >= MIN_ARTICLES_FOR_RATIO else count
+
+    # TF-IDF（词频取对数），只保留权重最高的词，再做L2归一化
+    # 只出现在一篇文章中的词对相似度没有贡献，先排除，否则会挤掉真正能匹配的词；太常见的词同样排除
+    weighted = {}
+    for article_id, terms in vectors.items():
+        weights = {term: (1 + math.log(tf)) * idf[term] for term, tf in terms.items()
+                   if 1 < document_frequency[term] <= max_df}
+        if len(weights) > MAX_TERMS_PER_ARTICLE:
+            weights = dict(sorted(weights.items(), key=lambda item: -item[1])[:MAX_TERMS_PER_ARTICLE])
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        weighted[article_id] = {term: w / norm for term, w in weights.items()}
+
+    # 倒排表：词 -> [(文章ID, 权重)]，余弦相似度只需累加共享词
+    postings = {}
+    for article_id, weights in weighted.items():
+        for term, w in weights.items():
+            postings.setdefault(term, []).append((article_id, w))
+    for term_postings in postings.values():
+        if len(term_postings) > MAX_POSTINGS_PER_TERM:
+            term_postings.sort(key=lambda item: -item[1])
+            del term_postings[MAX_POSTINGS_PER_TERM:]
+
+    suggestions = {}
+    for article_id, weights in weighted.items():
+        scores = Counter()
+        for term, w in weights.items():
+            for other_id, other_w in postings[term]:
+                if other_id != article_id:
+                    scores[other_id] += w * other_w
+        # 相似度相同时按ID排序，保证结果稳定
+        ranked = sorted((item for item in scores.items() if item[1] >= MIN_SIMILARITY),
+                        key=lambda item: (-round(item[1], 9), item[0]))
+        suggestions[article_id] = [other_id for other_id, _ in ranked[:top_k]]
+    return suggestions
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+站内全文搜索索引
+构建时为所有集合的文章（标题、标签、描述、Markdown正文）生成倒排索引，浏览器中由 search.js 查询，不需要后端。
+分词与相关文章推荐相同（sitebuild.related.tokenize：中文相邻两字、英文/数字单词），
+每篇文章的加权词频按内容哈希缓存在 .build/search-cache.json，只有内容变化的文章才重新分词。
+
+输出到 search/ 目录：
+    meta.json            文章列表 [[集合, ID, 标题, 路径]]、分片文件名、停用词（每次搜索先读取，体积很小）
+    index-<k>.<哈希>.json 第k个分片：{词: [文章序号差值, 权重, 文章序号差值, 权重, ...]}
+词按 FNV-1a 哈希分配到分片（search.js 中有相同的实现），查询只下载查询词所在的分片；
+倒排表按文章序号升序，只保存与前一项的差值，文件名带内容哈希，内容不变的分片不会重写，可以长期缓存。
+"""
+
+import json
+import math
+import os
+import re
+
+from sitebuild.changes import record_changed_files
+from sitebuild.common import save_bytes
+from sitebuild.manifest import content_hash
+from sitebuild.related import STOP_TERMS, term_vectors
+
+CACHE_VERSION = 1
+INDEX_VERSION = 1
+CACHE_FILE = 'search-cache.json'
+SEARCH_DIR = 'search'
+META_FILE = 'meta.json'
+
+# 每个分片的目标大小，分片数取2的幂（查询时按哈希取模）
+SHARD_TARGET_BYTES = 32 * 1024
+
+_SHARD_NAME = re.compile(r'^index-\d+\.[0-9a-f]{8}\.json$')
+
+
+def term_hash(term):
+    """FNV-1a（32位），与 search.js 中的 termHash 一致（词只含基本多文种平面的字符）"""
+    h = 0x811C9DC5
+    for ch in term:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def encode_postings(postings):
+    """[(文章序号, 权重)]（序号升序）-> [差值, 权重, 差值, 权重, ...]"""
+    encoded = []
+    previous = 0
+    for doc, weight in postings:
+        encoded.extend((doc - previous, weight))
+        previous = doc
+    return encoded
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def _load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            return data.get('collections', {})
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"警告: 搜索索引缓存无法读取，将重新分词 {path}: {e}")
+    return {}
+
+
+def _save_cache(path, collections):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'collections': collections}, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_search_index(build_dir, collections, root='.'):
+    """
+    生成搜索索引，写入的文件追加到 .build/changed-files.txt
+    collections: [(集合, 文章列表)]（应包含所有集合，只构建部分集合时索引也要覆盖全站）
+    返回写入的文件列表
+    """
+    cache_path = os.path.join(build_dir, CACHE_FILE)
+    cache = _load_cache(cache_path)
+    docs = []
+    postings = {}
+    computed = 0
+    for collection, articles in collections:
+        content_files = {article.get('id'): collection.content_file(article) for article in articles}
+        entries, count = term_vectors(articles, content_files, cache.get(collection.name, {}))
+        cache[collection.name] = {'articles': entries}
+        computed += count
+        for article in articles:
+            entry = entries.get(article.get('id'))
+            if entry is None:
+                continue
+            doc = len(docs)
+            docs.append([collection.name, article['id'], article.get('title', ''),
+                         f"/{collection.output_dir}/{article['id']}.html"])
+            for term, weight in entry['terms'].items():
+                # '#标签' 是相关文章推荐用的整体标签词，查询中不会出现
+                if not term.startswith('#'):
+                    postings.setdefault(term, []).append((doc, weight))
+    _save_cache(cache_path, cache)
+
+    # 按估算的总大小确定分片数
+    encoded = {term: encode_postings(items) for term, items in postings.items()}
+    total_bytes = sum(len(_dumps(term)) + len(_dumps(items)) + 2 for term, items in encoded.items())
+    shard_count = 1
+    while shard_count * SHARD_TARGET_BYTES < total_bytes:
+        shard_count *= 2
+    shards = [{} for _ in range(shard_count)]
+    for term, items in encoded.items():
+        shards[term_hash(term) % shard_count][term] = items
+
+    search_dir = os.path.join(root, SEARCH_DIR)
+    written = []
+    names = []
+    for k, shard in enumerate(shards):
+        data = _dumps(shard).encode('utf-8')
+        name = f'index-{k}.{content_hash(data)[:8]}.json'
+        names.append(name)
+        path = os.path.join(search_dir, name)
+        if save_bytes(path, data):
+            written.append(path)
+
+    meta = {'version': INDEX_VERSION, 'docs': docs, 'shards': names, 'stop': sorted(STOP_TERMS)}
+    meta_path = os.path.join(search_dir, META_FILE)
+    if save_bytes(meta_path, _dumps(meta).encode('utf-8')):
+        written.append(meta_path)
+
+    # 分片数或内容变化后，旧分片不再被 meta.json 引用
+    for filename in os.listdir(search_dir):
+        if _SHARD_NAME.match(filename) and filename not in names:
+            os.remove(os.path.join(search_dir, filename))
+
+    record_changed_files(build_dir, written)
+    average = math.ceil(total_bytes / shard_count / 1024)
+    print(f"   搜索索引: {len(docs)} 篇文章，{len(encoded)} 个词，{shard_count} 个分片（平均 {average} KB），"
+          f"重新分词 {computed} 篇，写入 {len(written)} 个文件")
+    return written
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+sitemap 维护（所有集合共用）
+URL -> (lastmod, changefreq, priority) 的索引保存在 .build 目录，每次构建只把变化的条目合并进索引，
+没有变化时不读写 sitemap.xml。需要输出时逐条流式写入临时文件再替换，同时生成 .gz 压缩版本。
+URL 超过 50000 条或文件超过 50MB（搜索引擎的上限）时自动拆分为 sitemap-1.xml、sitemap-2.xml……，
+sitemap.xml 改为引用各分片的 sitemap 索引文件；内容未变化的分片不会重写。
+
+sitemap.xml 被手动修改过（修改时间或大小与上次写入时不同）时，以文件内容为准重新建立索引。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+INDEX_VERSION = 1
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# 单个sitemap文件的上限（sitemaps.org 协议）
+MAX_URLS_PER_FILE = 50000
+MAX_BYTES_PER_FILE = 50 * 1024 * 1024
+
+_URLSET_HEADER = f'<?xml version="1.0" encoding="utf-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+_URLSET_FOOTER = '</urlset>\n'
+_INDEX_HEADER = f'<?xml version="1.0" encoding="utf-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+_INDEX_FOOTER = '</sitemapindex>\n'
+
+
+def _file_signature(path):
+    """文件签名（修改时间+大小），用于发现手动修改；文件不存在时返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_sitemap(sitemap_path):
+    """
+    流式解析sitemap（iterparse，逐条释放元素），返回 {URL: [lastmod, changefreq, priority]}
+    如果是sitemap索引文件，依次读取其引用的本地分片
+    """
+    urls = {}
+    base_dir = os.path.dirname(sitemap_path)
+    for _, elem in ET.iterparse(sitemap_path, events=('end',)):
+        name = _local_name(elem.tag)
+        if name not in ('url', 'sitemap'):
+            continue
+        fields = {_local_name(child.tag): (child.text or '').strip() for child in elem}
+        elem.clear()
+        loc = fields.get('loc')
+        if not loc:
+            continue
+        if name == 'url':
+            urls[loc] = [fields.get('lastmod'), fields.get('changefreq'), fields.get('priority')]
+        else:
+            part_path = os.path.join(base_dir, loc.rsplit('/', 1)[-1])
+            if os.path.exists(part_path):
+                urls.update(read_sitemap(part_path))
+    return urls
+
+
+def _url_block(loc, lastmod, changefreq, priority):
+    """单个 <url> 条目（与原有格式一致：4空格缩进）"""
+    lines = ['    <url>\n', f'        <loc>{escape(loc)}</loc>\n']
+    if lastmod:
+        lines.append(f'        <lastmod>{escape(lastmod)}</lastmod>\n')
+    if changefreq:
+        lines.append(f'        <changefreq>{escape(changefreq)}</changefreq>\n')
+    if priority:
+        lines.append(f'        <priority>{escape(priority)}</priority>\n')
+    lines.append('    </url>\n')
+    return ''.join(lines)
+
+
+def _write_if_changed(path, chunks, previous_hash):
+    """
+    把文本块流式写入临时文件（同时写 .gz），内容哈希与上次相同且文件仍在时丢弃临时文件
+    返回 (内容哈希, 是否写入)
+    """
+    tmp_path = path + '.tmp'
+    tmp_gz_path = path + '.gz.tmp'
+    digest = hashlib.sha256()
+    with open(tmp_path, 'wb') as f, open(tmp_gz_path, 'wb') as raw_gz:
+        # mtime=0：内容相同时压缩结果也相同
+        with gzip.GzipFile(filename=os.path.basename(path), mode='wb', fileobj=raw_gz, mtime=0) as gz:
+            for chunk in chunks:
+                data = chunk.encode('utf-8')
+                digest.update(data)
+                f.write(data)
+                gz.write(data)
+    content_hash = digest.hexdigest()[:16]
+
+    if content_hash == previous_hash and os.path.exists(path) and os.path.exists(path + '.gz'):
+        os.remove(tmp_path)
+        os.remove(tmp_gz_path)
+        return content_hash, False
+    os.replace(tmp_gz_path, path + '.gz')
+    os.replace(tmp_path, path)
+    return content_hash, True
+
+
+class SitemapIndex:
+    """sitemap 的磁盘索引：URL -> [lastmod, changefreq, priority]，以及上次写入的文件信息"""
+
+    def __init__(self, sitemap_path, index_path, base_url):
+        self.sitemap_path = sitemap_path
+        self.index_path = index_path
+        self.base_url = base_url
+        self.urls = {}
+        self.files = {}       # 输出文件 -> 内容哈希
+        self.signature = None
+        self.changed = False
+        self._load()
+
+    def _load(self):
+        data = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"警告: sitemap索引无法读取，将从 {self.sitemap_path} 重新建立: {e}")
+
+        signature = _file_signature(self.sitemap_path)
+        if data.get('version') == INDEX_VERSION and data.get('signature') == signature:
+            self.urls = data.get('urls', {})
+            self.files = data.get('files', {})
+            self.signature = signature
+            return
+
+        # 首次运行或 sitemap.xml 被手动修改过：以文件内容为准重新建立索引
+        if signature is not None:
+            self.urls = read_sitemap(self.sitemap_path)
+            self.changed = True
+
+    def merge(self, entries):
+        """
+        合并URL条目，返回 (新增URL列表, 更新lastmod的数量)
+        entries: [{'loc', 'lastmod', 'default_lastmod', 'changefreq', 'priority'}]
+          lastmod 是页面内容最后一次变化的时间，为None表示未知：
+          新URL使用 default_lastmod，已有URL保留原来的 lastmod
+        """
+        new_urls = []
+        updated_count = 0
+        for entry in entries:
+            url = entry['loc']
+            current = self.urls.get(url)
+            if current is None:
+                self.urls[url] = [entry['lastmod'] or entry['default_lastmod'], entry['changefreq'], entry['priority']]
+                new_urls.append(url)
+            elif entry['lastmod'] and current[0] != entry['lastmod']:
+                current[0] = entry['lastmod']
+                updated_count += 1
+        if new_urls or updated_count:
+            self.changed = True
+        return new_urls, updated_count
+
+    def _parts(self):
+        """按 URL 数和字节数上限把URL分组，返回 [(URL块列表, 分片内最新的lastmod), ...]"""
+        overhead = len(_URLSET_HEADER.encode('utf-8')) + len(_URLSET_FOOTER.encode('utf-8'))
+        parts = [([], '')]
+        size = overhead
+        for loc, (lastmod, changefreq, priority) in self.urls.items():
+            block = _url_block(loc, lastmod, changefreq, priority)
+            block_size = len(block.encode('utf-8'))
+            blocks = parts[-1][0]
+            if blocks and (len(blocks) >= MAX_URLS_PER_FILE or size + block_size > MAX_BYTES_PER_FILE):
+                parts.append(([], ''))
+                size = overhead
+            blocks, newest = parts[-1]
+            blocks.append(block)
+            parts[-1] = (blocks, max(newest, lastmod or ''))
+            size += block_size
+        return parts
+
+    def write(self):
+        """输出sitemap（只重写内容变化的文件），返回写入的文件列表"""
+        parts = self._parts()
+        directory = os.path.dirname(self.sitemap_path)
+        stem, ext = os.path.splitext(os.path.basename(self.sitemap_path))
+        files = {}
+        written = []
+
+        if len(parts) == 1:
+            chunks = [_URLSET_HEADER, *parts[0][0], _URLSET_FOOTER]
+            files[self.sitemap_path], changed = _write_if_changed(
+                self.sitemap_path, chunks, self.files.get(self.sitemap_path))
+            if changed:
+                written.append(self.sitemap_path)
+        else:
+            index_chunks = [_INDEX_HEADER]
+            for number, (blocks, newest) in enumerate(parts, 1):
+                part_name = f'{stem}-{number}{ext}'
+                part_path = os.path.join(directory, part_name)
+                files[part_path], changed = _write_if_changed(
+                    part_path, [_URLSET_HEADER, *blocks, _URLSET_FOOTER], self.files.get(part_path))
+                if changed:
+                    written.append(part_path)
+                # 分片的lastmod取其中最新的URL，分片内容不变时索引文件也不变
+                lastmod = f'        <lastmod>{escape(newest)}</lastmod>\n' if newest else ''
+                index_chunks.append(f'    <sitemap>\n        <loc>{escape(self.base_url)}/{part_name}</loc>\n'
+                                    f'{lastmod}    </sitemap>\n')
+            index_chunks.append(_INDEX_FOOTER)
+            files[self.sitemap_path], changed = _write_if_changed(
+                self.sitemap_path, index_chunks, self.files.get(self.sitemap_path))
+            if changed:
+                written.append(self.sitemap_path)
+
+        # 分片减少后删除多余的旧分片
+        for path in set(self.files) - set(files):
+            for stale in (path, path + '.gz'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+        self.files = files
+        self.signature = _file_signature(self.sitemap_path)
+        self._save()
+        self.changed = False
+        return written
+
+    def _save(self):
+        """保存索引（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'signature': self.signature,
+                       'files': self.files, 'urls': self.urls}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+
+def update_sitemap(sitemap_path, entries, index_path, base_url):
+    """
+    把URL条目合并到sitemap（索引未变化且文件都在时不读写sitemap）
+    返回写入的文件列表（含 .gz），出错时返回None
+    """
+    if not os.path.exists(sitemap_path):
+        print(f"错误: sitemap文件不存在 {sitemap_path}")
+        return None
+
+    try:
+        index = SitemapIndex(sitemap_path, index_path, base_url)
+        new_urls, updated_count = index.merge(entries)
+        missing_gz = not os.path.exists(sitemap_path + '.gz')
+        if not index.changed and not missing_gz:
+            print("✓ sitemap无需更新")
+            return []
+
+        written = index.write()
+
+        if new_urls:
+            print(f"✓ 已添加 {len(new_urls)} 个新URL到sitemap:")
+            for url in new_urls[:10]:  # 只显示前10个
+                print(f"  - {url}")
+            if len(new_urls) > 10:
+                print(f"  ... 还有 {len(new_urls) - 10} 个URL")
+
+        if updated_count:
+            print(f"✓ 已更新 {updated_count} 个现有URL的lastmod")
+
+        if written:
+            print(f"✓ 已写入: {', '.join(written)}（共 {len(index.urls)} 个URL，含 .gz 压缩版本）")
+        return [name for path in written for name in (path, path + '.gz')]
+
+    except (OSError, ET.ParseError) as e:
+        print(f"错误: 更新sitemap失败: {e}")
+        return None
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+编译型页面模板
+模板在每次构建中只解析一次，拆分为：字面量片段、占位符、条件块、JSON-LD 插槽，
+之后每篇文章只需线性拼接一次即可得到完整页面。
+
+支持的模板语法：
+  {{KEY}}              占位符，值从 values 中取；未提供的占位符原样保留
+  {{#NAME}}...{{/NAME}} 条件块，由 sections 决定删除/保留/整体替换
+  <script type="application/ld+json">...</script>
+                       JSON-LD 插槽，其中的占位符优先使用 json_values（已做JSON转义）
+"""
+
+import os
+import re
+
+from sitebuild.manifest import content_hash
+
+# 占位符、条件块开始/结束标记
+_TAG_PATTERN = re.compile(r'\{\{(#|/)?([A-Z_]+|\.)\}\}')
+# JSON-LD 脚本块（与旧版正则保持一致：首尾空白不计入内容）
+_JSON_LD_PATTERN = re.compile(r'<script type="application/ld\+json">\s*(.*?)\s*</script>', re.DOTALL)
+
+_TEXT = 0
+_VAR = 1
+_SECTION = 2
+_JSON_LD = 3
+
+
+class TemplateError(ValueError):
+    """模板语法错误（条件块未闭合等）"""
+
+
+def _parse(source, aliases):
+    """把模板源码解析为节点列表"""
+    root = []
+    stack = [(None, root)]
+
+    def add_text(text):
+        if not text:
+            return
+        # 把别名字面量（例如占位注释）转换为占位符
+        for literal, key in aliases.items():
+            if literal in text:
+                before, _, after = text.partition(literal)
+                add_text(before)
+                stack[-1][1].append((_VAR, key))
+                add_text(after)
+                return
+        nodes = stack[-1][1]
+        if nodes and nodes[-1][0] == _TEXT:
+            nodes[-1] = (_TEXT, nodes[-1][1] + text)
+        else:
+            nodes.append((_TEXT, text))
+
+    pos = 0
+    for match in _TAG_PATTERN.finditer(source):
+        add_text(source[pos:match.start()])
+        pos = match.end()
+        kind, name = match.group(1), match.group(2)
+        if kind == '#':
+            children = []
+            stack[-1][1].append((_SECTION, name, children))
+            stack.append((name, children))
+        elif kind == '/':
+            if stack[-1][0] != name:
+                raise TemplateError(f"条件块结束标记不匹配: {{{{/{name}}}}}")
+            stack.pop()
+        else:
+            stack[-1][1].append((_VAR, name))
+    add_text(source[pos:])
+
+    if len(stack) > 1:
+        raise TemplateError(f"条件块未闭合: {{{{#{stack[-1][0]}}}}}")
+    return root
+
+
+class CompiledTemplate:
+    """已编译的页面模板"""
+
+    def __init__(self, source, aliases=None):
+        self.source = source
+        self.hash = content_hash(source)
+        aliases = aliases or {}
+        self.nodes = []
+        pos = 0
+        for match in _JSON_LD_PATTERN.finditer(source):
+            self.nodes.extend(_parse(source[pos:match.start()], aliases))
+            self.nodes.append((_JSON_LD, _parse(match.group(1), aliases)))
+            pos = match.end()
+        self.nodes.extend(_parse(source[pos:], aliases))
+
+    def render(self, values, sections=None, json_values=None):
+        """
+        渲染页面
+        values: 占位符名 -> 字符串
+        sections: 条件块名 -> True（保留内容，去掉标记）/ 字符串（整体替换）/ 假值（删除）
+        json_values: JSON-LD 插槽中优先使用的占位符值
+        """
+        out = []
+        self._render_nodes(self.nodes, values, sections or {}, json_values or {}, out, False)
+        return ''.join(out)
+
+    def _render_nodes(self, nodes, values, sections, json_values, out, in_json):
+        for node in nodes:
+            kind = node[0]
+            if kind == _TEXT:
+                out.append(node[1])
+            elif kind == _VAR:
+                name = node[1]
+                if in_json and name in json_values:
+                    out.append(json_values[name])
+                elif name in values:
+                    out.append(values[name])
+                else:
+                    out.append(f'{{{{{name}}}}}')
+            elif kind == _SECTION:
+                state = sections.get(node[1])
+                if state is True:
+                    self._render_nodes(node[2], values, sections, json_values, out, in_json)
+                elif state:
+                    out.append(state)
+            else:
+                out.append('<script type="application/ld+json">\n    ')
+                self._render_nodes(node[1], values, sections, json_values, out, True)
+                out.append('\n    </script>')
+
+
+_cache = {}
+
+
+def load_template(template_path, aliases=None):
+    """
+    读取并编译模板（按路径和修改时间缓存，同一次构建只解析一次）
+    模板文件不存在时返回None
+    """
+    try:
+        mtime = os.path.getmtime(template_path)
+    except OSError:
+        print(f"警告: 模板文件不存在 {template_path}")
+        return None
+
+    key = (os.path.abspath(template_path), tuple(sorted((aliases or {}).items())))
+    cached = _cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = CompiledTemplate(f.read(), aliases)
+    _cache[key] = (mtime, template)
+    return template
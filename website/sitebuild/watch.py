@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+文件监听（监听模式使用）
+不依赖第三方库：定时检查被监听文件的修改时间和大小，发现变化后回调重新生成。
+"""
+
+import os
+import time
+
+# 轮询间隔（秒）
+POLL_INTERVAL = 0.2
+# 发现变化后再等待一小段时间，合并编辑器保存时的多次写入
+DEBOUNCE_INTERVAL = 0.05
+
+
+def _stat(path):
+    """文件状态签名，文件不存在时返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileWatcher:
+    """轮询式文件监听器"""
+
+    def __init__(self, paths=()):
+        self.snapshot = {}
+        self.set_paths(paths)
+
+    def set_paths(self, paths):
+        """更新监听的文件列表（已监听文件保留原状态，新文件记录当前状态）"""
+        snapshot = {}
+        for path in paths:
+            snapshot[path] = self.snapshot[path] if path in self.snapshot else _stat(path)
+        self.snapshot = snapshot
+
+    def poll(self):
+        """返回自上次检查以来发生变化的文件列表"""
+        changed = []
+        for path, old in self.snapshot.items():
+            new = _stat(path)
+            if new != old:
+                self.snapshot[path] = new
+                changed.append(path)
+        return changed
+
+
+def watch_files(get_paths, on_change, interval=POLL_INTERVAL):
+    """
+    持续监听文件变化，直到 Ctrl+C
+    get_paths: 返回需要监听的文件列表（每次重新生成后重新获取，新增的Markdown会自动加入）
+    on_change: 回调，参数为变化的文件列表
+    """
+    watcher = FileWatcher(get_paths())
+    print(f"\n监听中（{len(watcher.snapshot)} 个文件），保存后自动重新生成，按 Ctrl+C 退出...")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            time.sleep(DEBOUNCE_INTERVAL)
+            changed.extend(path for path in watcher.poll() if path not in changed)
+
+            start = time.perf_counter()
+            print(f"\n检测到变化: {', '.join(changed)}")
+            try:
+                on_change(changed)
+            except Exception as e:
+                # 监听模式下单次失败（如JSON写到一半）不退出，等待下一次保存
+                print(f"错误: 重新生成失败: {e}")
+            print(f"✓ 完成，耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+            watcher.set_paths(get_paths())
+    except KeyboardInterrupt:
+        print("\n已退出监听模式")